@@ -0,0 +1,19 @@
+# Generated by Django 3.2.12 on 2026-10-18 20:13
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='currency',
+            field=models.CharField(default='PLN', max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}\\Z', 'Enter a three-letter ISO 4217 currency code.')], verbose_name='currency'),
+        ),
+    ]
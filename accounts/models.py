@@ -1,8 +1,10 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from .managers import CustomUserManager
+from .validators import validate_currency
 
 
 class CustomUser(AbstractBaseUser, PermissionsMixin):
@@ -14,6 +16,10 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     last_name = models.CharField(_('last name'), max_length=30, blank=True)
     is_active = models.BooleanField(default=False)
     date_joined = models.DateTimeField(auto_now_add=True)
+    # currency expense totals are converted to
+    currency = models.CharField(_('currency'), max_length=3,
+                                default=settings.EXPENSE_CURRENCY,
+                                validators=[validate_currency])
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
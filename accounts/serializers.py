@@ -20,10 +20,10 @@ class CustomUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['id', 'email', 'date_joined',
-                  'first_name', 'last_name']
+                  'first_name', 'last_name', 'currency']
 
 
 class CustomUserProfileUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
-        fields = ['first_name', 'last_name']
+        fields = ['first_name', 'last_name', 'currency']
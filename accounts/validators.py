@@ -1,5 +1,10 @@
 from django.core.exceptions import ValidationError
-from django.utils.translation import ngettext
+from django.core.validators import RegexValidator
+from django.utils.translation import gettext_lazy as _, ngettext
+
+validate_currency = RegexValidator(
+    r'^[A-Z]{3}\Z', _('Enter a three-letter ISO 4217 currency code.')
+)
 
 
 class MinimumDigitsNumberValidator:
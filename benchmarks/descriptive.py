@@ -0,0 +1,133 @@
+"""
+Compare the NumPy descriptive statistics with a pure Python baseline, and
+measure the time and peak memory of the whole calculation, with loading
+the columns, on a test database
+
+    python benchmarks/descriptive.py
+"""
+import os
+import random
+import statistics
+import sys
+import timeit
+import tracemalloc
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expenses.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from expense.descriptive import (  # noqa: E402
+    MOVING_AVERAGE_WINDOWS, describe, get_descriptive_statistics
+)
+
+SIZES = (10000, 100000, 500000)
+START, END = date(2025, 1, 1), date(2026, 12, 31)
+
+
+def make_rows(size):
+    random.seed(size)
+    days = (END - START).days
+    return [
+        (START + timedelta(days=random.randrange(days + 1)),
+         round(random.lognormvariate(3, 1), 2), random.randrange(20))
+        for _ in range(size)
+    ]
+
+
+def describe_python(rows, start, end):
+    prices = sorted(price for _, price, _ in rows)
+    cut_points = statistics.quantiles(prices, n=10, method='inclusive')
+    result = {'median': statistics.median(prices), 'p90': cut_points[8],
+              'mean': statistics.fmean(prices),
+              'std': statistics.pstdev(prices)}
+
+    length = (end - start).days + 1
+    spend = [0.0] * length
+    for day, price, _ in rows:
+        spend[(day - start).days] += price
+    for window in MOVING_AVERAGE_WINDOWS:
+        result[f'ma{window}'] = [
+            sum(spend[max(i - window + 1, 0):i + 1]) /
+            (i + 1 - max(i - window + 1, 0))
+            for i in range(length)
+        ]
+
+    groups = defaultdict(list)
+    for _, price, category in rows:
+        groups[category].append(price)
+    result['categories'] = {
+        category: (len(prices), statistics.fmean(prices),
+                   statistics.pstdev(prices))
+        for category, prices in groups.items()
+    }
+    return result
+
+
+def measure(function, number=3):
+    return min(timeit.repeat(function, number=1, repeat=number))
+
+
+def compare_calculations():
+    print(f'{"rows":>8} {"python ms":>10} {"numpy ms":>9} {"speedup":>8}')
+    for size in SIZES:
+        rows = make_rows(size)
+        days, prices, categories = zip(*rows)
+        arrays = (np.array(days, dtype='datetime64[D]'),
+                  np.array(prices), np.array(categories))
+
+        python_time = measure(lambda: describe_python(rows, START, END))
+        numpy_time = measure(lambda: describe(*arrays, START, END))
+        print(f'{size:>8} {python_time * 1000:>10.1f} '
+              f'{numpy_time * 1000:>9.1f} '
+              f'{python_time / numpy_time:>7.1f}x')
+
+
+def measure_endpoint_calculation():
+    from django.contrib.auth import get_user_model
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment
+    )
+    from expense.duplicates import fingerprint
+    from expense.models import Expense
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user = get_user_model().objects.create(email='bench@bench.com')
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO expense_expense '
+                '(user_id, day, price, currency, place, fingerprint, '
+                'revision) VALUES (%s, %s, %s, %s, %s, %s, 1)',
+                [(user.pk, day.isoformat(), price, user.currency, 'Shop',
+                  fingerprint(user.pk, day, price, user.currency, 'Shop'))
+                 for day, price, _ in make_rows(max(SIZES))]
+            )
+
+        expenses = Expense.objects.filter(user=user)
+        date_range = [START.isoformat(), END.isoformat()]
+        total = measure(lambda: get_descriptive_statistics(
+            expenses, date_range, user.currency
+        ))
+        tracemalloc.start()
+        get_descriptive_statistics(expenses, date_range, user.currency)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'\nloading and calculating {max(SIZES)} rows from SQLite: '
+              f'{total * 1000:.1f} ms, peak {peak / 2 ** 20:.1f} MiB')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    compare_calculations()
+    measure_endpoint_calculation()
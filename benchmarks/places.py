@@ -0,0 +1,53 @@
+"""
+Measure place suggestions of a user with many distinct places
+
+    python benchmarks/places.py
+"""
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expenses.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from expense.places import PlaceIndex  # noqa: E402
+
+SIZES = (1000, 10000, 100000)
+PREFIXES = ('', 's', 'sh', 'sho', 'shop 1')
+
+
+def make_places(size):
+    random.seed(size)
+    words = [''.join(random.choices(string.ascii_lowercase, k=6))
+             for _ in range(size // 10)] + ['shop']
+    return {
+        f'{random.choice(words).title()} {i}': random.randint(1, 100)
+        for i in range(size)
+    }
+
+
+def main():
+    print(f'{"places":>8} {"build ms":>9} ' +
+          ' '.join(f'{repr(prefix):>10}' for prefix in PREFIXES))
+    for size in SIZES:
+        places = make_places(size)
+        build = min(timeit.repeat(lambda: PlaceIndex(1, places),
+                                  number=1, repeat=3))
+        index = PlaceIndex(1, places)
+        times = [
+            min(timeit.repeat(lambda: index.suggest(prefix, 10),
+                              number=10, repeat=3)) / 10
+            for prefix in PREFIXES
+        ]
+        print(f'{size:>8} {build * 1000:>9.2f} ' +
+              ' '.join(f'{time * 1000:>8.3f}ms' for time in times))
+
+
+if __name__ == '__main__':
+    main()
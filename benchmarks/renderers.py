@@ -0,0 +1,77 @@
+"""
+Compare the stock JSONRenderer with UJSONRenderer on expense list pages
+and period summaries
+
+    python benchmarks/renderers.py
+"""
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expenses.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from expense.models import Expense  # noqa: E402
+from expense.renderers import UJSONRenderer  # noqa: E402
+from expense.serializers import ExpenseSerializer  # noqa: E402
+
+SIZES = (100, 1000, 10000)
+
+
+def make_page(size):
+    start = date(2026, 1, 1)
+    expenses = [
+        Expense(id=i, user_id=1, day=start + timedelta(days=i % 365),
+                price=Decimal(i % 1000) / 4, place=f'Shop{i % 50}',
+                category_id=i % 7 or None, priority_id=i % 3 or None)
+        for i in range(1, size + 1)
+    ]
+    return {
+        'date_range': ['2026-01-01', '2026-12-31'],
+        'statistics': {'price__sum': 12345.67, 'place': 'Shop1',
+                       'place__count': 20},
+        'count': size,
+        'next': None,
+        'previous': None,
+        'results': ExpenseSerializer(expenses, many=True).data,
+    }
+
+
+def make_summary(size):
+    return {'week_summary': [
+        {'date': f'{2026 - i // 52}-W{i % 52 + 1}',
+         'sum_of_prices': Decimal(i) / 3}
+        for i in range(size)
+    ]}
+
+
+def measure(renderer, data, number):
+    return min(timeit.repeat(lambda: renderer.render(data),
+                             number=number, repeat=3)) / number
+
+
+def main():
+    print(f'{"payload":>14} {"json ms":>9} {"ujson ms":>9} {"speedup":>8}')
+    for name, make in (('page', make_page), ('summary', make_summary)):
+        for size in SIZES:
+            data = make(size)
+            number = max(1, 10000 // size)
+            assert UJSONRenderer().render(data) == JSONRenderer().render(data)
+
+            json_time = measure(JSONRenderer(), data, number)
+            ujson_time = measure(UJSONRenderer(), data, number)
+            print(f'{name + " " + str(size):>14} {json_time * 1000:>9.2f} '
+                  f'{ujson_time * 1000:>9.2f} '
+                  f'{json_time / ujson_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare ExpenseSerializer with the row fast path of the expense list
+
+Rows are built in memory, so only the serialization is measured:
+
+    python benchmarks/serialization.py
+"""
+import os
+import sys
+import timeit
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expenses.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from expense.models import Expense  # noqa: E402
+from expense.rows import ExpenseRowSerializer  # noqa: E402
+from expense.serializers import ExpenseSerializer  # noqa: E402
+
+SIZES = (100, 1000, 10000)
+
+
+def make_expenses(size):
+    start = date(2026, 1, 1)
+    return [
+        Expense(id=i, user_id=1, day=start + timedelta(days=i % 365),
+                price=Decimal(i % 1000) / 4, place=f'Shop{i % 50}',
+                category_id=i % 7 or None, priority_id=i % 3 or None)
+        for i in range(1, size + 1)
+    ]
+
+
+def make_rows(row_serializer, expenses):
+    Row = namedtuple('Row', row_serializer.columns)
+    return [
+        Row(*(getattr(expense, column) for column in row_serializer.columns))
+        for expense in expenses
+    ]
+
+
+def main():
+    row_serializer = ExpenseRowSerializer()
+    print(f'{"rows":>8} {"serializer ms":>14} {"rows ms":>10} {"speedup":>8}')
+    for size in SIZES:
+        expenses = make_expenses(size)
+        rows = make_rows(row_serializer, expenses)
+        number = max(1, 10000 // size)
+
+        serializer_time = min(timeit.repeat(
+            lambda: ExpenseSerializer(expenses, many=True).data,
+            number=number, repeat=3
+        )) / number
+        rows_time = min(timeit.repeat(
+            lambda: ExpenseRowSerializer().serialize(rows),
+            number=number, repeat=3
+        )) / number
+
+        print(f'{size:>8} {serializer_time * 1000:>14.2f} '
+              f'{rows_time * 1000:>10.2f} '
+              f'{serializer_time / rows_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+from datetime import date
+from django.db.models import Avg, Count, F, Max, Min, Sum
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+
+from .currency import converted, count_unconverted
+
+# dimension -> expression grouping expenses, or daily summaries
+GROUP_BY = {
+    'day': F('day'),
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+    'year': TruncYear('day'),
+    'category': F('category_id'),
+    'priority': F('priority_id'),
+    'place': F('place'),
+}
+# dimensions which are not in the daily summaries
+EXPENSE_ONLY_GROUP_BY = ('place',)
+
+# metric -> (aggregate of expenses, aggregate of daily summaries or None),
+# of the prices annotated as _price
+METRICS = {
+    'sum': (Sum('_price'), Sum('_price')),
+    'count': (Count('pk'), Sum('count')),
+    'avg': (Avg('_price'), None),
+    'min': (Min('_price'), None),
+    'max': (Max('_price'), None),
+}
+
+MAX_DIMENSIONS = 2
+# distinct keys of the rows and of the columns
+MAX_ROWS = 1000
+MAX_COLUMNS = 100
+# values of all metrics in the pivot
+MAX_CELLS = 100000
+
+
+class TooManyGroups(Exception):
+    pass
+
+
+def can_use_summaries(group_by, metrics):
+    return not any(name in EXPENSE_ONLY_GROUP_BY for name in group_by) and \
+        all(METRICS[name][1] is not None for name in metrics)
+
+
+def format_key(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def sort_keys(keys):
+    # missing categories and priorities go last
+    return sorted(keys, key=lambda key: (key is None, key))
+
+
+def pivot(expenses, summaries, group_by, metrics, currency=None):
+    """
+    Aggregate the metrics of the expenses grouped by one or two dimensions
+    with a single GROUP BY query, with prices converted into the currency
+    when given
+
+    Return row keys, column keys (None for one dimension), a dense matrix,
+    or list, of values for every metric and the number of expenses whose
+    prices are left out for lack of rates; the daily summaries are used
+    when they have everything needed. TooManyGroups is raised when the
+    result would be larger than the limits.
+    """
+    use_summaries = summaries is not None and \
+        can_use_summaries(group_by, metrics)
+    queryset = summaries if use_summaries else expenses
+    price = F('price_sum' if use_summaries else 'price')
+    if currency is not None:
+        price = converted(price.name, currency)
+    aggregates = {
+        f'_{name}': METRICS[name][1 if use_summaries else 0]
+        for name in metrics
+    }
+    aggregates['_unconverted'] = count_unconverted(
+        'count' if use_summaries else None
+    )
+    keys = [f'_key{i}' for i in range(len(group_by))]
+
+    # one row more than allowed tells there are too many groups
+    max_groups = MAX_ROWS * (MAX_COLUMNS if len(group_by) > 1 else 1)
+    groups = list(
+        queryset.order_by().annotate(_price=price).
+        annotate(**{key: GROUP_BY[name] for key, name in zip(keys, group_by)}).
+        values(*keys).annotate(**aggregates).
+        values_list(*keys, *aggregates)[:max_groups + 1]
+    )
+    if len(groups) > max_groups:
+        raise TooManyGroups()
+
+    rows = sort_keys({group[0] for group in groups})
+    columns = None
+    if len(group_by) > 1:
+        columns = sort_keys({group[1] for group in groups})
+    if len(rows) > MAX_ROWS or len(columns or ()) > MAX_COLUMNS or \
+            len(rows) * len(columns or [None]) * len(metrics) > MAX_CELLS:
+        raise TooManyGroups()
+
+    row_index = {key: i for i, key in enumerate(rows)}
+    values = {}
+    if columns is None:
+        for offset, name in enumerate(metrics, start=1):
+            values[name] = [None] * len(rows)
+            for group in groups:
+                values[name][row_index[group[0]]] = group[offset]
+    else:
+        column_index = {key: i for i, key in enumerate(columns)}
+        for offset, name in enumerate(metrics, start=2):
+            values[name] = [[None] * len(columns) for _ in rows]
+            for group in groups:
+                values[name][row_index[group[0]]][
+                    column_index[group[1]]] = group[offset]
+
+    return {
+        'group_by': list(group_by),
+        'rows': [format_key(key) for key in rows],
+        'columns': None if columns is None else
+        [format_key(key) for key in columns],
+        'values': values,
+        'unconverted': sum(group[-1] for group in groups),
+    }
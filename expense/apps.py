@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class ExpenseConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'expense'
+
+    def ready(self):
+        import expense.signals
+        from expense.search import restore_search_triggers
+        post_migrate.connect(restore_search_triggers, sender=self)
+        from expense.duplicates import register_fingerprint
+        connection_created.connect(register_fingerprint)
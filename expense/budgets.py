@@ -0,0 +1,55 @@
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+from django.db.models import (
+    DateField, DecimalField, F, OuterRef, Subquery, Sum, Value
+)
+from django.db.models.functions import Coalesce
+
+from .currency import converted, count_unconverted
+from .models import Budget, MonthlyCategoryTotal
+from .rollups import month_of
+
+
+def with_spending(budgets, month, currency):
+    """
+    Annotate the budgets with the month and the sum of prices of their
+    category's expenses in it in the currency, read from the monthly
+    category totals
+
+    Prices are converted with the latest rates by the end of the month;
+    expenses of currencies without a rate by then are left out and counted
+    as unconverted.
+    Every budget costs one range lookup of the unique (category, month,
+    currency) index, done in a subquery of the same statement; there is
+    one row per currency of the month's expenses.
+    """
+    totals = MonthlyCategoryTotal.objects.filter(
+        category=OuterRef('category'), month=month
+    ).order_by().annotate(
+        _price=converted('price_sum', currency,
+                         day=month + relativedelta(day=31))
+    ).values('category').annotate(
+        spent=Sum('_price'), unconverted=count_unconverted('count')
+    )
+    return budgets.annotate(
+        month=Value(month, output_field=DateField()),
+        spent=Coalesce(
+            Subquery(totals.values('spent')), Value(Decimal(0)),
+            output_field=DecimalField(max_digits=17, decimal_places=2)
+        ),
+        remaining=F('amount') - F('spent'),
+        unconverted=Coalesce(Subquery(totals.values('unconverted')),
+                             Value(0)),
+    )
+
+
+def get_budget_status(expense, currency):
+    """
+    Return the budget of the expense's category with its spending in the
+    month of the expense, or None if the category has no budget
+    """
+    if expense.category_id is None:
+        return None
+    budgets = Budget.objects.filter(user_id=expense.user_id,
+                                    category_id=expense.category_id)
+    return with_spending(budgets, month_of(expense.day), currency).first()
@@ -0,0 +1,175 @@
+from collections import Counter, defaultdict
+from django.db import connections, transaction
+from django.db.models import F, Q, Value
+
+from .cache import bump_data_version
+from .duplicates import FINGERPRINT_FIELDS, Fingerprint
+from .models import Expense, Tombstone
+from .places import places_changed
+from .rollups import (
+    KEY_FIELDS, add_expenses, add_queryset, apply_deltas, group_expenses,
+    new_deltas
+)
+
+BULK_BATCH_SIZE = 500
+
+
+def create_expenses(expenses):
+    """
+    Insert the expenses with batched INSERTs and update the data derived
+    from them in the same transaction
+
+    bulk_create() sends no signals, so everything the signal handlers do
+    for a single expense has to be repeated here.
+    """
+    with transaction.atomic():
+        revisions = {
+            user_id: bump_data_version(user_id)
+            for user_id in {expense.user_id for expense in expenses}
+        }
+        for expense in expenses:
+            expense.revision = revisions[expense.user_id]
+            expense.fingerprint = expense.get_fingerprint()
+        Expense.objects.bulk_create(expenses, batch_size=BULK_BATCH_SIZE)
+        if any(expense.pk is None for expense in expenses):
+            set_created_ids(expenses, revisions)
+        apply_deltas(add_expenses(new_deltas(), expenses))
+
+        places = defaultdict(Counter)
+        for expense in expenses:
+            places[expense.user_id][expense.place] += 1
+        for user_id, revision in revisions.items():
+            places_changed(user_id, revision, places[user_id])
+    return expenses
+
+
+def set_created_ids(expenses, revisions):
+    """
+    Set the ids of expenses inserted by bulk_create() on databases which
+    do not return them, reading them back with one query
+
+    The revision of the write is given to no other expenses of the user,
+    as bumping the data version locked it, and the ids grow in the order
+    of the inserts.
+    """
+    created = Q()
+    for user_id, revision in revisions.items():
+        created |= Q(user_id=user_id, revision=revision)
+    pks = defaultdict(list)
+    for user_id, pk in Expense.objects.filter(created).order_by('pk'). \
+            values_list('user_id', 'pk'):
+        pks[user_id].append(pk)
+    pks = {user_id: iter(user_pks) for user_id, user_pks in pks.items()}
+    for expense in expenses:
+        expense.pk = next(pks[expense.user_id])
+
+
+def lock_users(users):
+    """
+    Bump the data versions of the users, whose rows then lock out other
+    writers of their expenses until the transaction ends, and return the
+    new versions by user id
+    """
+    return {user_id: bump_data_version(user_id) for user_id in users}
+
+
+def update_expenses(expenses, values, users=()):
+    """
+    Set the values on all expenses of the queryset with one UPDATE and
+    return the number of updated expenses
+
+    The daily summaries are moved using one grouped query of the expenses
+    before the update; as every expense gets the same values, the groups
+    after the update follow from it. The users whose expenses are selected
+    are locked before the groups are read, so no expense of theirs can be
+    written in between.
+    """
+    with transaction.atomic():
+        revisions = lock_users(users)
+        groups = list(group_expenses(expenses))
+        changes = dict(values)
+        pks = None
+        if any(field in values for field in FINGERPRINT_FIELDS):
+            if connections[expenses.db].vendor == 'sqlite':
+                # the new values, as the columns still hold the old ones
+                changes['fingerprint'] = Fingerprint(*(
+                    Value(values[field]) if field in values else F(field)
+                    for field in ('user_id',) + FINGERPRINT_FIELDS
+                ))
+            else:
+                pks = list(expenses.values_list('pk', flat=True))
+        updated = 0
+        for user_id in {group['user_id'] for group in groups}:
+            revision = revisions.get(user_id) or bump_data_version(user_id)
+            updated += expenses.filter(user_id=user_id).update(
+                revision=revision, **changes
+            )
+            # the previous places are unknown, so the index is rebuilt
+            places_changed(user_id,
+                           None if 'place' in values else revision, {})
+
+        deltas = new_deltas()
+        for group in groups:
+            old_key = tuple(group[field] for field in KEY_FIELDS)
+            new_key = tuple(values.get(field, group[field])
+                            for field in KEY_FIELDS)
+            price_sum = group['price_sum']
+            if 'price' in values:
+                price_sum = values['price'] * group['count']
+            deltas[old_key][0] -= group['count']
+            deltas[old_key][1] -= group['price_sum']
+            deltas[new_key][0] += group['count']
+            deltas[new_key][1] += price_sum
+        apply_deltas(deltas)
+        if pks is not None:
+            update_fingerprints(pks)
+    return updated
+
+
+def update_fingerprints(pks):
+    """
+    Recompute the fingerprints of the expenses, for databases without
+    fingerprint() in SQL
+    """
+    for start in range(0, len(pks), BULK_BATCH_SIZE):
+        expenses = list(
+            Expense.objects.filter(pk__in=pks[start:start + BULK_BATCH_SIZE]).
+            only('pk', 'user', *FINGERPRINT_FIELDS)
+        )
+        for expense in expenses:
+            expense.fingerprint = expense.get_fingerprint()
+        Expense.objects.bulk_update(expenses, ['fingerprint'])
+
+
+def delete_expenses(expenses, users=()):
+    """
+    Delete all expenses of the queryset with one DELETE and return the
+    number of deleted expenses
+
+    Nothing references expenses, so the collector, which loads every
+    deleted row to send signals, is skipped. Only ids and places are
+    loaded for the tombstones and the place indexes. The users are locked
+    first, like in update_expenses().
+    """
+    with transaction.atomic():
+        revisions = lock_users(users)
+        deltas = add_queryset(new_deltas(), expenses, sign=-1)
+        revisions.update(lock_users(
+            {key[0] for key in deltas} - set(revisions)
+        ))
+        rows = list(expenses.values_list('user_id', 'pk', 'place'))
+        Tombstone.objects.bulk_create(
+            (Tombstone(user_id=user_id, model='expense', object_id=pk,
+                       revision=revisions[user_id])
+             for user_id, pk, _ in rows),
+            batch_size=BULK_BATCH_SIZE
+        )
+        deleted = expenses._raw_delete(expenses.db)
+        apply_deltas(deltas)
+
+        places = defaultdict(Counter)
+        for user_id, _, place in rows:
+            places[user_id][place] -= 1
+        for user_id, revision in revisions.items():
+            places_changed(user_id, revision, places[user_id])
+    return deleted
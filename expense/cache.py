@@ -0,0 +1,135 @@
+import hashlib
+import threading
+from datetime import date
+from functools import wraps
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import F
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .models import DataVersion
+
+CACHE_ALIAS = 'expense'
+
+_counters_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0}
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_data_version(user):
+    """
+    Return the current version of the user's data
+    """
+    version = DataVersion.objects.filter(user=user). \
+        values_list('version', flat=True).first()
+    return version or 0
+
+
+def bump_data_version(user_id, create=True):
+    """
+    Increase the version of the user's data so cached results are not used
+    and return the new version, or None if the user has no version
+
+    The counter is updated in the transaction of the write, so it can't be
+    seen before the written data, and concurrent writers of one user wait
+    for each other on its row. It is not created for deletes, which may be
+    a part of deleting the user.
+    """
+    versions = DataVersion.objects.filter(user_id=user_id)
+    if not versions.update(version=F('version') + 1):
+        if not create:
+            return None
+        DataVersion.objects.get_or_create(user_id=user_id)
+    return versions.values_list('version', flat=True).first()
+
+
+def make_key(kind, user, version, params):
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    return f'expense:{kind}:{user.pk}:{version}:{digest}'
+
+
+def count(counter):
+    with _counters_lock:
+        _counters[counter] += 1
+
+
+def cache_stats():
+    """
+    Return numbers of cache hits and misses of this process
+    """
+    with _counters_lock:
+        return dict(_counters)
+
+
+def reset_cache_stats():
+    with _counters_lock:
+        for counter in _counters:
+            _counters[counter] = 0
+
+
+def get_or_compute(kind, user, params, compute, version=None):
+    """
+    Return the cached result of compute for the user's data version and
+    the normalized params, calculating it on a miss
+
+    Inside a transaction the result may include uncommitted writes whose
+    version could be reused after a rollback, so the cache is skipped.
+    """
+    if connection.in_atomic_block:
+        return compute()
+
+    if version is None:
+        version = get_data_version(user)
+    cache = get_cache()
+    key = make_key(kind, user, version, params)
+    result = cache.get(key)
+    if result is not None:
+        count('hits')
+        return result
+
+    count('misses')
+    result = compute()
+    cache.set(key, result)
+    return result
+
+
+def make_etag(request, version):
+    # the default date range and summaries depend on the current day, and
+    # totals on the user's currency
+    digest = hashlib.md5(repr((
+        request.user.pk, request.get_full_path(),
+        request.META.get('HTTP_ACCEPT'), date.today(),
+        request.user.currency
+    )).encode()).hexdigest()
+    return quote_etag(f'{version}-{digest}')
+
+
+def conditional_get(method):
+    """
+    Decorate a GET handler of an APIView to answer If-None-Match requests
+    with 304 when the user's data has not changed since the ETag was sent
+
+    The ETag comes from the data version and the request, so no queryset
+    is built for a matching request. The version is kept in
+    view.data_version for get_or_compute().
+    """
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            view.data_version = None
+            return method(view, request, *args, **kwargs)
+
+        view.data_version = get_data_version(request.user)
+        etag = make_etag(request, view.data_version)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = method(view, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        return response
+    return wrapper
@@ -0,0 +1,127 @@
+import csv
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DecimalField, ExpressionWrapper, F, Func, OuterRef, Q,
+    Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce
+
+from accounts.validators import validate_currency
+from .models import DataVersion, ExchangeRate
+
+RATE_BATCH_SIZE = 1000
+
+
+class RoundCents(Func):
+    function = 'ROUND'
+    template = '%(function)s(%(expressions)s, 2)'
+
+
+def rate_of(currency, day):
+    """
+    Subquery of the latest rate of the currency on or before the day, an
+    index seek on (currency, day)
+    """
+    return Subquery(
+        ExchangeRate.objects.filter(currency=currency, day__lte=day).
+        order_by('-day').values('rate')[:1]
+    )
+
+
+def converted(amount, currency, day='day'):
+    """
+    Expression of the amount field converted from the currency of the row
+    into the currency, with the rates of the day field of the row, or of
+    the day when it is a date
+
+    Rows already in the currency are taken as they are, so totals of data
+    in one currency never look up a rate; others are rounded to cents.
+    Amounts of days before the first rate of their currency are NULL and
+    left out of sums.
+    """
+    reference = settings.EXPENSE_CURRENCY
+    output_field = DecimalField(max_digits=17, decimal_places=2)
+    if isinstance(day, str):
+        day = OuterRef(day)
+    # SQLite keeps integral decimals as INTEGER and divides them as
+    # integers, so the amount is made a float first
+    value = ExpressionWrapper(F(amount) * Value(1.0),
+                              output_field=output_field) * Case(
+        When(currency=reference, then=Value(Decimal(1))),
+        default=rate_of(OuterRef('currency'), day)
+    )
+    if currency != reference:
+        value = value / rate_of(currency, day)
+    return Case(When(currency=currency, then=F(amount)),
+                default=RoundCents(value, output_field=output_field),
+                output_field=output_field)
+
+
+def count_unconverted(count=None):
+    """
+    Aggregate of the number of expenses whose prices, annotated as _price
+    with converted(), are NULL for lack of a rate; count is the field of
+    the numbers of expenses of rollup rows
+    """
+    unconverted = Q(_price__isnull=True)
+    if count is None:
+        return Count('pk', filter=unconverted)
+    return Coalesce(Sum(count, filter=unconverted), 0)
+
+
+def parse_rate(day, currency, rate):
+    """
+    Return an ExchangeRate of the text values, raising ValueError with the
+    reason when any of them is invalid
+    """
+    try:
+        validate_currency(currency)
+        rate = Decimal(rate)
+        day = date.fromisoformat(day)
+    except (ValidationError, InvalidOperation, ValueError):
+        raise ValueError(f'Invalid rate: {day} {currency} {rate}')
+    if rate <= 0:
+        raise ValueError(f'Invalid rate: {day} {currency} {rate}')
+    return ExchangeRate(day=day, currency=currency, rate=rate)
+
+
+def read_rates(lines):
+    """
+    Return ExchangeRates of CSV lines with day, currency and rate columns,
+    skipping a header
+    """
+    rates = []
+    for row in csv.reader(lines):
+        if not row or row[0] == 'day':
+            continue
+        if len(row) != 3:
+            raise ValueError(f'Expected day, currency and rate: {row}')
+        rates.append(parse_rate(*row))
+    return rates
+
+
+def save_rates(rates):
+    """
+    Insert the rates, replacing those of the same currency and day, and
+    return the number of saved rates
+
+    Totals of every user may be converted with the rates, so the versions
+    of all users are bumped to invalidate their cached results.
+    """
+    # the last of rates of the same currency and day wins
+    rates = list({(rate.currency, rate.day): rate for rate in rates}.values())
+    days = defaultdict(list)
+    for rate in rates:
+        days[rate.currency].append(rate.day)
+    with transaction.atomic():
+        for currency, currency_days in days.items():
+            ExchangeRate.objects.filter(currency=currency,
+                                        day__in=currency_days).delete()
+        ExchangeRate.objects.bulk_create(rates, batch_size=RATE_BATCH_SIZE)
+        DataVersion.objects.update(version=F('version') + 1)
+    return len(rates)
@@ -0,0 +1,162 @@
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+from dateutil.relativedelta import relativedelta
+from rest_framework import exceptions
+
+# query params of the date range and the older ones it replaces
+DATE_RANGE_QUERY_PARAMS = ('from', 'to', 'range')
+LEGACY_DATE_QUERY_PARAMS = ('fyear', 'fmonth', 'fday', 'tyear', 'tmonth',
+                            'tday')
+MAX_RELATIVE_DAYS = 36600
+MAX_RELATIVE_MONTHS = 1200
+
+DAY_PATTERN = re.compile(r'(\d{4})-(\d{2})(?:-(\d{2}))?')
+RELATIVE_PATTERN = re.compile(r'last_(\d+)d|last_n_months:(\d+)')
+
+
+class DateRange(NamedTuple):
+    """
+    Days from start to end, both included
+    """
+    start: date
+    end: date
+
+    def as_list(self):
+        return [self.start.isoformat(), self.end.isoformat()]
+
+
+def invalid(message):
+    return exceptions.ValidationError({'detail': message})
+
+
+def month_range(day, months=1):
+    # the months ending with the month of the day
+    start = day.replace(day=1) - relativedelta(months=months - 1)
+    return DateRange(start, day + relativedelta(day=31))
+
+
+def parse_day(value, end=False):
+    """
+    Return the day of YYYY-MM-DD, or of YYYY-MM meaning the first or, for
+    the end, the last day of the month
+    """
+    match = DAY_PATTERN.fullmatch(value)
+    if match is None:
+        raise invalid(f'Invalid date: {value}')
+    year, month, day = match.groups()
+    try:
+        if day is not None:
+            return date(int(year), int(month), int(day))
+        first = date(int(year), int(month), 1)
+    except ValueError:
+        raise invalid(f'Invalid date: {value}')
+    return first + relativedelta(day=31) if end else first
+
+
+def parse_relative_range(value, today):
+    """
+    Return the range named by the range query param, like this_month, ytd,
+    last_30d or last_n_months:6, relative to today
+    """
+    if value == 'today':
+        return DateRange(today, today)
+    if value == 'this_month':
+        return month_range(today)
+    if value == 'last_month':
+        return month_range(today.replace(day=1) - timedelta(days=1))
+    if value == 'this_year':
+        return DateRange(date(today.year, 1, 1), date(today.year, 12, 31))
+    if value == 'ytd':
+        return DateRange(date(today.year, 1, 1), today)
+
+    match = RELATIVE_PATTERN.fullmatch(value)
+    if match is None:
+        raise invalid(f'Unknown range value: {value}')
+    days, months = match.groups()
+    if days is not None:
+        if not 0 < int(days) <= MAX_RELATIVE_DAYS:
+            raise invalid('Out of range')
+        return DateRange(today - timedelta(days=int(days) - 1), today)
+    if not 0 < int(months) <= MAX_RELATIVE_MONTHS:
+        raise invalid('Out of range')
+    return month_range(today, int(months))
+
+
+def parse_legacy_number(value, min_value, max_value, default):
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise invalid('Value must be numeric')
+    if not min_value <= number <= max_value:
+        raise invalid('Out of range')
+    return number
+
+
+def parse_legacy_range(fyear, fmonth, fday, tyear, tmonth, tday, today):
+    """
+    Return the range of the fyear, fmonth, fday, tyear, tmonth and tday
+    query params, each defaulting to the current month
+
+    A start day past the end of its month means the first day of the month
+    and an end day the last one.
+    """
+    years = (date.min.year, date.max.year, today.year)
+    months = (1, 12, today.month)
+    start_year = parse_legacy_number(fyear, *years)
+    start_month = parse_legacy_number(fmonth, *months)
+    start_day = parse_legacy_number(fday, 1, 31, 1)
+    end_year = parse_legacy_number(tyear, *years)
+    end_month = parse_legacy_number(tmonth, *months)
+    end_day = parse_legacy_number(tday, 1, 31, 31)
+
+    start = date(start_year, start_month, 1)
+    if start_day <= (start + relativedelta(day=31)).day:
+        start = start.replace(day=start_day)
+    end = date(end_year, end_month, 1) + relativedelta(day=end_day)
+    return DateRange(start, end)
+
+
+@lru_cache(maxsize=1024)
+def parse_date_range(start, end, relative, legacy, today):
+    """
+    Parse the date range query params, memoized by their values
+
+    start and end are the from and to params, relative the range param
+    and legacy a tuple of the six older params, each None when missing.
+    """
+    if relative is not None:
+        if start is not None or end is not None:
+            raise invalid('Select either range or from and to')
+        date_range = parse_relative_range(relative, today)
+    elif start is not None or end is not None:
+        default = month_range(today)
+        date_range = DateRange(
+            default.start if start is None else parse_day(start),
+            default.end if end is None else parse_day(end, end=True)
+        )
+    else:
+        date_range = parse_legacy_range(*legacy, today)
+
+    if date_range.start > date_range.end:
+        raise invalid('Start date is newer then end date')
+    return date_range
+
+
+def get_date_range(query_params, today=None):
+    """
+    Return the date range selected by the from and to, or range, query
+    params, or by the older fyear..tday ones, the current month by default
+    """
+    values = {param: query_params.get(param) or None
+              for param in DATE_RANGE_QUERY_PARAMS}
+    legacy = tuple(query_params.get(param)
+                   for param in LEGACY_DATE_QUERY_PARAMS)
+    if any(values.values()) and any(legacy):
+        raise invalid('Select either from, to and range or '
+                      'fyear..tday query params')
+    return parse_date_range(values['from'], values['to'], values['range'],
+                            legacy, today or date.today())
@@ -0,0 +1,160 @@
+import numpy as np
+from datetime import date
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import FloatField, Func, IntegerField, Value
+from django.db.models.functions import Cast, Coalesce
+
+from .currency import converted
+
+# trailing windows of the moving averages of daily spend, in days
+MOVING_AVERAGE_WINDOWS = (7, 30)
+PERCENTILES = (50, 90)
+# days of the date range, each one with its spend and moving averages
+MAX_DAYS = 3660
+
+
+class EpochDays(Func):
+    """
+    Number of days since 1970-01-01 of a date, on backends that have it
+    """
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, **extra_context,
+            template="CAST(julianday(%(expressions)s) - 2440587.5 AS integer)"
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, **extra_context,
+                           template="(%(expressions)s - DATE '1970-01-01')")
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, **extra_context,
+                           template='(TO_DAYS(%(expressions)s) - 719528)')
+
+
+EPOCH_DAYS_VENDORS = ('sqlite', 'postgresql', 'mysql')
+
+
+def load_columns(expenses, currency=None):
+    """
+    Read days, prices and category ids of the expenses with one query into
+    NumPy arrays, with prices converted into the currency when given
+
+    The rows are read with a plain cursor as numbers, so no date or Decimal
+    objects are created: days since the epoch, prices cast to floats and
+    0 for missing categories. Prices without a rate to convert them with
+    are NaN.
+    """
+    connection = connections[expenses.db]
+    day = 'day'
+    if connection.vendor in EPOCH_DAYS_VENDORS:
+        day = EpochDays('day')
+    price = 'price' if currency is None else converted('price', currency)
+    queryset = expenses.order_by().annotate(
+        _day=day,
+        _price=Cast(price, FloatField()),
+        _category=Coalesce('category_id', Value(0)),
+    ).values_list('_day', '_price', '_category')
+    day_type = 'datetime64[D]' if day == 'day' else np.int64
+    dtype = np.dtype([('day', day_type), ('price', np.float64),
+                      ('category', np.int64)])
+    try:
+        sql, params = queryset.query.get_compiler(expenses.db).as_sql()
+    except EmptyResultSet:
+        columns = np.array([], dtype=dtype)
+    else:
+        # rows are streamed from the cursor into one structured array, with
+        # no list of row tuples kept next to it
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            columns = np.fromiter(cursor, dtype=dtype)
+
+    return (columns['day'].astype('datetime64[D]'),
+            np.ascontiguousarray(columns['price']),
+            np.ascontiguousarray(columns['category']))
+
+
+def moving_averages(spend, window):
+    """
+    Return trailing averages of the daily spend, over fewer days at the
+    start of the range
+    """
+    sums = np.cumsum(np.concatenate(([0.0], spend)))
+    ends = np.arange(1, len(spend) + 1)
+    starts = np.maximum(ends - window, 0)
+    return (sums[ends] - sums[starts]) / (ends - starts)
+
+
+def rounded(values):
+    return np.round(values, 2).tolist()
+
+
+def describe(days, prices, categories, start, end):
+    """
+    Calculate the descriptive statistics of expense columns in the range
+    of days from start to end with vectorized operations
+    """
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    range_days = np.arange(start, end + 1)
+    result = {
+        'count': len(prices),
+        'price': {'mean': None, 'std': None, 'median': None, 'p90': None},
+        'daily': {
+            'days': [str(day) for day in range_days],
+            'spend': [0.0] * len(range_days),
+        },
+        'categories': [],
+    }
+    for window in MOVING_AVERAGE_WINDOWS:
+        result['daily'][f'ma{window}'] = [0.0] * len(range_days)
+    if not len(prices):
+        return result
+
+    median, p90 = np.percentile(prices, PERCENTILES)
+    result['price'] = {
+        'mean': round(float(prices.mean()), 2),
+        'std': round(float(prices.std()), 2),
+        'median': round(float(median), 2),
+        'p90': round(float(p90), 2),
+    }
+
+    spend = np.bincount((days - start).astype(np.int64), weights=prices,
+                        minlength=len(range_days))[:len(range_days)]
+    result['daily']['spend'] = rounded(spend)
+    for window in MOVING_AVERAGE_WINDOWS:
+        result['daily'][f'ma{window}'] = rounded(
+            moving_averages(spend, window)
+        )
+
+    ids, inverse = np.unique(categories, return_inverse=True)
+    counts = np.bincount(inverse)
+    means = np.bincount(inverse, weights=prices) / counts
+    squares = np.bincount(inverse, weights=prices * prices) / counts
+    stds = np.sqrt(np.maximum(squares - means * means, 0))
+    result['categories'] = [
+        {'category': int(pk) or None, 'count': int(count),
+         'mean': round(float(mean), 2), 'std': round(float(std), 2)}
+        for pk, count, mean, std in zip(ids, counts, means, stds)
+    ]
+    return result
+
+
+def get_descriptive_statistics(expenses, date_range, currency=None):
+    """
+    Return median and p90 prices, daily spend with its moving averages and
+    price deviation per category of the expenses in the date range, in the
+    currency when given
+
+    Expenses whose prices cannot be converted are left out and counted as
+    unconverted.
+    """
+    start, end = (date.fromisoformat(day) for day in date_range)
+    days, prices, categories = load_columns(expenses, currency)
+    converted = ~np.isnan(prices)
+    result = describe(days[converted], prices[converted],
+                      categories[converted], start, end)
+    result['unconverted'] = int(len(prices) - converted.sum())
+    return result
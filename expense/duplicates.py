@@ -0,0 +1,76 @@
+import hashlib
+from decimal import Decimal
+from django.db.models import CharField, Count, Func, Max
+
+# fields of an expense hashed into its fingerprint, besides the user
+FINGERPRINT_FIELDS = ('day', 'price', 'currency', 'place')
+CENTS = Decimal('0.01')
+
+
+def normalize_place(place):
+    """
+    Return the place with differences of case and whitespace removed
+    """
+    return ' '.join(place.split()).casefold()
+
+
+def fingerprint(user_id, day, price, currency, place):
+    """
+    Return the hash shared by likely duplicate expenses of the user: of the
+    same day, price and currency, at the same place
+    """
+    key = '\x1f'.join((
+        str(user_id), str(day), str(Decimal(str(price)).quantize(CENTS)),
+        currency, normalize_place(place)
+    ))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+class Fingerprint(Func):
+    """
+    fingerprint() of the user, day, price, currency and place expressions
+    computed by the database, where register_fingerprint() added it
+    """
+    function = 'expense_fingerprint'
+    arity = 5
+    output_field = CharField()
+
+
+def register_fingerprint(sender, connection, **kwargs):
+    """
+    Add fingerprint() to new SQLite connections, so UPDATEs of many rows
+    can set their fingerprints
+    """
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function(
+            Fingerprint.function, Fingerprint.arity, fingerprint,
+            deterministic=True
+        )
+
+
+def find_duplicate_clusters(expenses, limit):
+    """
+    Return the fingerprints, counts and last days of up to limit clusters
+    of duplicates among the expenses of a user, the latest first
+
+    It is a single GROUP BY fingerprint HAVING count > 1, read from the
+    (user, fingerprint) index.
+    """
+    return list(
+        expenses.order_by().values('fingerprint').
+        annotate(count=Count('pk'), last_day=Max('day')).
+        filter(count__gt=1).order_by('-last_day', 'fingerprint')[:limit]
+    )
+
+
+def find_duplicates(expenses, fingerprints):
+    """
+    Return a dict of the given fingerprints found among the expenses of a
+    user to the id of the first expense with each, an index seek for
+    every fingerprint instead of a scan of the expenses
+    """
+    duplicates = {}
+    for value, pk in expenses.filter(fingerprint__in=set(fingerprints)). \
+            order_by('-pk').values_list('fingerprint', 'pk'):
+        duplicates[value] = pk
+    return duplicates
@@ -0,0 +1,49 @@
+import csv
+import json
+
+# currency goes last to keep the columns of earlier exports in place
+EXPORT_FIELDS = ('id', 'day', 'price', 'place', 'category', 'priority',
+                 'currency')
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object returning written value instead of storing it
+    """
+    def write(self, value):
+        return value
+
+
+def iterate_rows(expenses, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate over expenses fields fetched in chunks from a server side cursor
+    """
+    return expenses.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def format_row(row):
+    """
+    Format values of the row the same way as ExpenseSerializer does
+    """
+    pk, day, price, place, category, priority, currency = row
+    return (pk, day.isoformat(), f'{price:f}', place, category, priority,
+            currency)
+
+
+def stream_csv(expenses):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in iterate_rows(expenses):
+        yield writer.writerow(format_row(row))
+
+
+def stream_ndjson(expenses):
+    for row in iterate_rows(expenses):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, format_row(row)))) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', stream_csv),
+    'ndjson': ('application/x-ndjson', stream_ndjson),
+}
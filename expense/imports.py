@@ -0,0 +1,188 @@
+import csv
+import json
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from accounts.validators import validate_currency
+from .bulk import create_expenses
+from .models import Category, Expense, Priority
+
+# expense fields which can be read from columns, and those which must be
+IMPORT_FIELDS = ('day', 'price', 'currency', 'place', 'category', 'priority')
+REQUIRED_FIELDS = ('day', 'price', 'place')
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+class InvalidImport(Exception):
+    pass
+
+
+def check_mapping(mapping):
+    unknown = [name for name in mapping if name not in IMPORT_FIELDS]
+    if unknown:
+        raise InvalidImport(f'Unknown field: {unknown[0]}')
+    missing = [name for name in REQUIRED_FIELDS if name not in mapping]
+    if missing:
+        raise InvalidImport(f'Missing column of field: {missing[0]}')
+
+
+class ExpenseImport:
+    """
+    Import of a user's expenses from CSV lines, read as a stream
+
+    mapping maps expense fields to the names of their columns, by default
+    the columns named after the fields. Rows are inserted in chunks with
+    create_expenses() in one transaction, so only a chunk of rows and the
+    first reported errors are kept in memory. Category and priority names
+    are resolved through dicts of the user's names loaded once per import;
+    missing ones are created.
+    """
+    def __init__(self, user, mapping=None, date_format='%Y-%m-%d',
+                 delimiter=',', decimal_separator='.', currency=None,
+                 chunk_size=IMPORT_CHUNK_SIZE):
+        if mapping:
+            check_mapping(mapping)
+        if len(delimiter) != 1:
+            raise InvalidImport('Delimiter must be one character')
+        if currency is not None:
+            try:
+                validate_currency(currency)
+            except ValidationError:
+                raise InvalidImport(f'Invalid currency: {currency}')
+
+        self.user = user
+        self.mapping = mapping or None
+        self.date_format = date_format
+        self.delimiter = delimiter
+        self.decimal_separator = decimal_separator
+        self.currency = currency or user.currency
+        self.chunk_size = chunk_size
+        self.names = {}
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def progress(self):
+        return {'rows': self.rows, 'created': self.created,
+                'errors': self.error_count}
+
+    def result(self):
+        return {'rows': self.rows, 'created': self.created,
+                'errors': self.errors, 'done': True}
+
+    def get_names(self, model):
+        """
+        Return the dict of names of the user's categories or priorities
+        """
+        if model not in self.names:
+            self.names[model] = {}
+            for pk, name in model.objects.filter(user=self.user). \
+                    order_by('-pk').values_list('pk', 'name'):
+                self.names[model][name] = pk
+        return self.names[model]
+
+    def resolve(self, model, name):
+        name = name.strip()
+        if not name:
+            return None
+        names = self.get_names(model)
+        if name not in names:
+            model._meta.get_field('name').clean(name, None)
+            names[name] = model.objects.create(user=self.user, name=name).pk
+        return names[name]
+
+    def parse_day(self, value):
+        try:
+            return datetime.strptime(value.strip(), self.date_format).date()
+        except ValueError:
+            raise ValidationError(f'Invalid day: {value}')
+
+    def parse_price(self, value):
+        value = value.strip().replace(' ', '').replace('\xa0', '')
+        if self.decimal_separator != '.':
+            value = value.replace('.', '').replace(self.decimal_separator,
+                                                   '.')
+        return Expense._meta.get_field('price').clean(value, None)
+
+    def parse_row(self, row):
+        """
+        Return an unsaved expense of the row, raising ValidationError when
+        any of its values is invalid
+        """
+        values = {name: row[column] or ''
+                  for name, column in self.mapping.items()}
+        return Expense(
+            user=self.user,
+            day=self.parse_day(values['day']),
+            price=self.parse_price(values['price']),
+            currency=Expense._meta.get_field('currency').clean(
+                values.get('currency', '').strip() or self.currency, None
+            ),
+            place=Expense._meta.get_field('place').clean(
+                values['place'].strip(), None
+            ),
+            category_id=self.resolve(Category, values.get('category', '')),
+            priority_id=self.resolve(Priority, values.get('priority', '')),
+        )
+
+    def add_error(self, line, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': error.messages})
+
+    def save(self, chunk):
+        create_expenses(chunk)
+        self.created += len(chunk)
+
+    def run(self, lines):
+        """
+        Return a generator importing the expenses of the lines, yielding
+        the progress after every chunk and the result at the end
+
+        The header is checked at once, raising InvalidImport when a mapped
+        column is missing. Nothing is saved unless the generator is run to
+        the end.
+        """
+        reader = csv.DictReader(lines, delimiter=self.delimiter)
+        columns = reader.fieldnames or []
+        if self.mapping is None:
+            self.mapping = {name: name for name in IMPORT_FIELDS
+                            if name in columns}
+            check_mapping(self.mapping)
+        missing = [column for column in self.mapping.values()
+                   if column not in columns]
+        if missing:
+            raise InvalidImport(f'Missing column: {missing[0]}')
+        return self.import_rows(reader)
+
+    def import_rows(self, reader):
+        with transaction.atomic():
+            chunk = []
+            for row in reader:
+                self.rows += 1
+                try:
+                    chunk.append(self.parse_row(row))
+                except ValidationError as error:
+                    self.add_error(reader.line_num, error)
+                if len(chunk) == self.chunk_size:
+                    self.save(chunk)
+                    chunk = []
+                    yield self.progress()
+            self.save(chunk)
+        yield self.result()
+
+
+def stream_progress(progress):
+    """
+    Stream the progress of an import as NDJSON, ending with the result or
+    with the reason of the file being unreadable, when nothing is saved
+    """
+    try:
+        for value in progress:
+            yield json.dumps(value) + '\n'
+    except (csv.Error, UnicodeDecodeError) as error:
+        yield json.dumps({'detail': f'Invalid file: {error}',
+                          'done': False}) + '\n'
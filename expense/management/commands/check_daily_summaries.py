@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from expense.rollups import (
+    find_inconsistent_daily_summaries, find_inconsistent_monthly_totals
+)
+
+
+class Command(BaseCommand):
+    help = ('Check that the daily expense summaries and the monthly '
+            'category totals match the expenses')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='emails', metavar='EMAIL',
+            help='Check only summaries of the user, may be repeated'
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options['emails']:
+            users = get_user_model().objects.filter(
+                email__in=options['emails']
+            )
+        inconsistent = find_inconsistent_daily_summaries(users) + \
+            find_inconsistent_monthly_totals(users)
+        for key, expected, actual in inconsistent:
+            self.stdout.write(
+                f'{key}: expected {expected}, found {actual}'
+            )
+        if inconsistent:
+            raise CommandError(
+                f'{len(inconsistent)} inconsistent rollups, '
+                'run rebuild_daily_summaries to fix them'
+            )
+        self.stdout.write(self.style.SUCCESS('Daily summaries are consistent'))
@@ -0,0 +1,77 @@
+import csv
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from expense.imports import IMPORT_CHUNK_SIZE, ExpenseImport, InvalidImport
+
+
+class Command(BaseCommand):
+    help = ('Import expenses of a user from a CSV file, e.g. a bank '
+            'statement, reading it row by row')
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV file of the expenses')
+        parser.add_argument('--user', required=True, metavar='EMAIL',
+                            help='Email of the owner of the expenses')
+        parser.add_argument(
+            '--map', action='append', default=[], metavar='FIELD=COLUMN',
+            help='Column of an expense field, may be repeated; by default '
+                 'the columns are named after the fields'
+        )
+        parser.add_argument('--date-format', default='%Y-%m-%d',
+                            help='strptime format of the days')
+        parser.add_argument('--delimiter', default=',')
+        parser.add_argument('--decimal-separator', default='.')
+        parser.add_argument('--encoding', default='utf-8-sig')
+        parser.add_argument(
+            '--currency',
+            help="Currency of rows without one, by default the user's"
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+            help='Number of expenses inserted at once'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'User {options["user"]} does not exist')
+        if options['chunk_size'] < 1:
+            raise CommandError('Chunk size must be positive')
+        mapping = {}
+        for item in options['map']:
+            field, separator, column = item.partition('=')
+            if not separator:
+                raise CommandError(f'Expected FIELD=COLUMN: {item}')
+            mapping[field] = column
+
+        try:
+            expense_import = ExpenseImport(
+                user, mapping, date_format=options['date_format'],
+                delimiter=options['delimiter'],
+                decimal_separator=options['decimal_separator'],
+                currency=options['currency'],
+                chunk_size=options['chunk_size']
+            )
+            with open(options['file'], encoding=options['encoding'],
+                      newline='') as lines:
+                for progress in expense_import.run(lines):
+                    if not progress.get('done'):
+                        self.stdout.write(
+                            f'{progress["rows"]} rows read, '
+                            f'{progress["created"]} expenses created'
+                        )
+        except InvalidImport as error:
+            raise CommandError(error)
+        except (OSError, LookupError, UnicodeDecodeError,
+                csv.Error) as error:
+            raise CommandError(f'Invalid file: {error}')
+
+        for error in progress['errors']:
+            self.stderr.write(f'Line {error["line"]}: '
+                              f'{" ".join(error["errors"])}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{progress["created"]} expenses created of {progress["rows"]} '
+            'rows'
+        ))
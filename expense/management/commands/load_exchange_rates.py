@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from expense.currency import parse_rate, read_rates, save_rates
+
+
+class Command(BaseCommand):
+    help = ('Load exchange rates, the values of currency units in '
+            f'{settings.EXPENSE_CURRENCY}, from a CSV file of day, currency '
+            'and rate rows or from the arguments')
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', nargs='?', help='CSV file of the rates')
+        parser.add_argument(
+            '--rate', action='append', nargs=3, default=[],
+            metavar=('DAY', 'CURRENCY', 'RATE'),
+            help='Rate of the currency on the day, may be repeated'
+        )
+
+    def handle(self, *args, **options):
+        if not options['file'] and not options['rate']:
+            raise CommandError('Give a file or rates to load')
+        try:
+            rates = [parse_rate(*rate) for rate in options['rate']]
+            if options['file']:
+                with open(options['file'], newline='') as lines:
+                    rates.extend(read_rates(lines))
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        saved = save_rates(rates)
+        self.stdout.write(self.style.SUCCESS(f'{saved} rates loaded'))
@@ -0,0 +1,59 @@
+from datetime import date
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from expense.recurring import (
+    MATERIALIZE_BATCH_SIZE, RecurringExpenseScheduler, materialize_due_expenses
+)
+
+
+class Command(BaseCommand):
+    help = 'Create the expenses of recurring expenses due by today'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date', dest='today', metavar='YYYY-MM-DD',
+            help='Create the expenses due by the date instead of today'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=MATERIALIZE_BATCH_SIZE,
+            help='Number of recurring expenses materialized per transaction'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep materializing the due expenses every interval until '
+                 'interrupted, instead of once'
+        )
+        parser.add_argument(
+            '--interval', type=int,
+            default=getattr(settings, 'EXPENSE_RECURRING_INTERVAL', 3600),
+            help='Seconds between runs of --loop'
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options['today']:
+            try:
+                today = date.fromisoformat(options['today'])
+            except ValueError:
+                raise CommandError('Date must be in the YYYY-MM-DD format')
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size must be positive')
+        if options['loop']:
+            if today is not None:
+                raise CommandError('--date cannot be used with --loop')
+            if options['interval'] < 1:
+                raise CommandError('Interval must be positive')
+            self.loop(options['interval'], options['batch_size'])
+            return
+        created = materialize_due_expenses(today, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{created} expenses created'))
+
+    def loop(self, interval, batch_size):
+        scheduler = RecurringExpenseScheduler(interval, batch_size)
+        self.stdout.write(f'Materializing recurring expenses every '
+                          f'{interval} seconds')
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            scheduler.stop()
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from expense.rollups import rebuild_daily_summaries
+
+
+class Command(BaseCommand):
+    help = ('Recalculate the daily expense summaries and the monthly '
+            'category totals from the expenses')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='emails', metavar='EMAIL',
+            help='Rebuild only summaries of the user, may be repeated'
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options['emails']:
+            users = get_user_model().objects.filter(
+                email__in=options['emails']
+            )
+        rebuild_daily_summaries(users)
+        self.stdout.write(self.style.SUCCESS('Daily summaries rebuilt'))
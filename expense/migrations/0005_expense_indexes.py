@@ -0,0 +1,41 @@
+# Generated by Django 3.2.12 on 2026-10-18 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0004_alter_expense_options'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='expense',
+            options={'ordering': ['-day', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['user', 'name'], name='category_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', '-day', '-id'], name='expense_user_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'category', 'day'], name='expense_user_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'priority', 'day'], name='expense_user_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'place', 'day'], name='expense_user_place_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='priority',
+            index=models.Index(fields=['user', 'name'], name='priority_user_name_idx'),
+        ),
+    ]
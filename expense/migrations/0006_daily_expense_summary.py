@@ -0,0 +1,45 @@
+# Generated by Django 3.2.12 on 2026-10-18 19:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_daily_summaries(apps, schema_editor):
+    Expense = apps.get_model('expense', 'Expense')
+    DailyExpenseSummary = apps.get_model('expense', 'DailyExpenseSummary')
+    groups = Expense.objects.order_by(). \
+        values('user_id', 'day', 'category_id', 'priority_id'). \
+        annotate(count=models.Count('pk'), price_sum=models.Sum('price'))
+    DailyExpenseSummary.objects.bulk_create(
+        (DailyExpenseSummary(**group) for group in groups.iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expense', '0005_expense_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyExpenseSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=17)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='expense.category')),
+                ('priority', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='expense.priority')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='dailyexpensesummary',
+            index=models.Index(fields=['user', 'day', 'category', 'priority'], name='daily_summary_key_idx'),
+        ),
+        migrations.RunPython(fill_daily_summaries, migrations.RunPython.noop),
+    ]
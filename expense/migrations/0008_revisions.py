@@ -0,0 +1,73 @@
+# Generated by Django 3.2.12 on 2026-10-18 19:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_data_versions(apps, schema_editor):
+    # deletes bump only existing versions, as they may be deleting the user
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    DataVersion = apps.get_model('expense', 'DataVersion')
+    DataVersion.objects.bulk_create(
+        (DataVersion(user_id=pk)
+         for pk in User.objects.values_list('pk', flat=True).iterator()),
+        batch_size=1000, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expense', '0007_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('revision', models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='revision',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='revision',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='priority',
+            name='revision',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['user', 'revision'], name='category_user_revision_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'revision'], name='expense_user_revision_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='priority',
+            index=models.Index(fields=['user', 'revision'], name='priority_user_revision_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'revision'], name='tombstone_user_revision_idx'),
+        ),
+        migrations.RunPython(create_data_versions, migrations.RunPython.noop),
+    ]
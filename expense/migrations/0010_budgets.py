@@ -0,0 +1,58 @@
+# Generated by Django 3.2.12 on 2026-10-18 19:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import TruncMonth
+
+
+def fill_monthly_category_totals(apps, schema_editor):
+    Expense = apps.get_model('expense', 'Expense')
+    MonthlyCategoryTotal = apps.get_model('expense', 'MonthlyCategoryTotal')
+    groups = Expense.objects.filter(category__isnull=False).order_by(). \
+        annotate(month=TruncMonth('day')). \
+        values('user_id', 'category_id', 'month'). \
+        annotate(count=models.Count('pk'), price_sum=models.Sum('price'))
+    MonthlyCategoryTotal.objects.bulk_create(
+        (MonthlyCategoryTotal(**group) for group in groups.iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expense', '0009_expense_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=17)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='expense.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_category_total', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Budget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='budget', to='expense.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlycategorytotal',
+            constraint=models.UniqueConstraint(fields=('category', 'month'), name='monthly_category_total_key'),
+        ),
+        migrations.RunPython(fill_monthly_category_totals, migrations.RunPython.noop),
+    ]
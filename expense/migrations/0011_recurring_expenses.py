@@ -0,0 +1,67 @@
+# Generated by Django 3.2.12 on 2026-10-18 20:02
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('expense', '0010_budgets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringExpense',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('place', models.CharField(max_length=200)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly')], max_length=10)),
+                ('interval', models.PositiveIntegerField(default=1)),
+                ('start', models.DateField()),
+                ('until', models.DateField(blank=True, null=True)),
+                ('occurrences', models.IntegerField(default=0)),
+                ('next_day', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='day',
+            field=models.DateField(default=datetime.date.today, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recurringexpense',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='expense.category'),
+        ),
+        migrations.AddField(
+            model_name='recurringexpense',
+            name='priority',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='expense.priority'),
+        ),
+        migrations.AddField(
+            model_name='recurringexpense',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_expense', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='recurring',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='expenses', to='expense.recurringexpense'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringexpense',
+            index=models.Index(fields=['next_day'], name='recurring_next_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='expense',
+            constraint=models.UniqueConstraint(condition=models.Q(('recurring__isnull', False)), fields=('recurring', 'day'), name='expense_recurring_day_key'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 3.2.12 on 2026-10-18 20:13
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0011_recurring_expenses'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}\\Z', 'Enter a three-letter ISO 4217 currency code.')])),
+                ('day', models.DateField()),
+                ('rate', models.DecimalField(decimal_places=10, max_digits=20)),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='monthlycategorytotal',
+            name='monthly_category_total_key',
+        ),
+        migrations.AddField(
+            model_name='dailyexpensesummary',
+            name='currency',
+            field=models.CharField(default='PLN', max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}\\Z', 'Enter a three-letter ISO 4217 currency code.')]),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='currency',
+            field=models.CharField(default='PLN', max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}\\Z', 'Enter a three-letter ISO 4217 currency code.')]),
+        ),
+        migrations.AddField(
+            model_name='monthlycategorytotal',
+            name='currency',
+            field=models.CharField(default='PLN', max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}\\Z', 'Enter a three-letter ISO 4217 currency code.')]),
+        ),
+        migrations.AddField(
+            model_name='recurringexpense',
+            name='currency',
+            field=models.CharField(default='PLN', max_length=3, validators=[django.core.validators.RegexValidator('^[A-Z]{3}\\Z', 'Enter a three-letter ISO 4217 currency code.')]),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlycategorytotal',
+            constraint=models.UniqueConstraint(fields=('category', 'month', 'currency'), name='monthly_category_total_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='exchangerate',
+            constraint=models.UniqueConstraint(fields=('currency', 'day'), name='exchange_rate_key'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.12 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+from expense.duplicates import FINGERPRINT_FIELDS, fingerprint
+
+
+def fill_fingerprints(apps, schema_editor):
+    Expense = apps.get_model('expense', 'Expense')
+    batch = []
+    for expense in Expense.objects.only('pk', 'user', *FINGERPRINT_FIELDS). \
+            iterator(chunk_size=1000):
+        expense.fingerprint = fingerprint(expense.user_id, expense.day,
+                                          expense.price, expense.currency,
+                                          expense.place)
+        batch.append(expense)
+        if len(batch) == 1000:
+            Expense.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    Expense.objects.bulk_update(batch, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expense', '0012_currencies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='fingerprint',
+            field=models.CharField(default='', editable=False, max_length=32),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'fingerprint'], name='expense_user_fingerprint_idx'),
+        ),
+    ]
@@ -1,22 +1,61 @@
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 
+from accounts.validators import validate_currency
+from .duplicates import fingerprint
 
-class Category(models.Model):
+
+def currency_field():
+    return models.CharField(max_length=3, default=settings.EXPENSE_CURRENCY,
+                            validators=[validate_currency])
+
+
+class AtomicSaveMixin:
+    """
+    Save in a transaction, so the data version bumped by the signals is
+    committed together with the row and never seen before it
+    """
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class Category(AtomicSaveMixin, models.Model):
     user = models.ForeignKey(
         get_user_model(), related_name='category', on_delete=models.CASCADE
     )
     name = models.CharField(max_length=20)
+    revision = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'name'],
+                         name='category_user_name_idx'),
+            models.Index(fields=['user', 'revision'],
+                         name='category_user_revision_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Priority(models.Model):
+class Priority(AtomicSaveMixin, models.Model):
     user = models.ForeignKey(
         get_user_model(), related_name='priority', on_delete=models.CASCADE
     )
     name = models.CharField(max_length=20)
+    revision = models.BigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'name'],
+                         name='priority_user_name_idx'),
+            models.Index(fields=['user', 'revision'],
+                         name='priority_user_revision_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -26,8 +65,11 @@ class Expense(models.Model):
     user = models.ForeignKey(
         get_user_model(), related_name='expense', on_delete=models.CASCADE
     )
-    day = models.DateField(auto_now_add=True)
+    # not editable like with auto_now_add, which would overwrite the day
+    # of materialized recurring expenses
+    day = models.DateField(default=date.today, editable=False)
     price = models.DecimalField(max_digits=15, decimal_places=2)
+    currency = currency_field()
     place = models.CharField(max_length=200)
     category = models.ForeignKey(
         Category, blank=True,
@@ -37,9 +79,278 @@ class Expense(models.Model):
         Priority, blank=True,
         null=True, on_delete=models.SET_NULL
     )
+    revision = models.BigIntegerField(default=0)
+    recurring = models.ForeignKey(
+        'RecurringExpense', related_name='expenses', blank=True,
+        null=True, on_delete=models.SET_NULL
+    )
+    # hash of the user, day, price, currency and place, see get_fingerprint()
+    fingerprint = models.CharField(max_length=32, editable=False)
 
     class Meta:
-        ordering = ['-day']
+        ordering = ['-day', '-id']
+        constraints = [
+            # an occurrence of a recurring expense is materialized only once
+            models.UniqueConstraint(
+                fields=['recurring', 'day'],
+                condition=models.Q(recurring__isnull=False),
+                name='expense_recurring_day_key'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-day', '-id'],
+                         name='expense_user_day_idx'),
+            models.Index(fields=['user', 'category', 'day'],
+                         name='expense_user_category_idx'),
+            models.Index(fields=['user', 'priority', 'day'],
+                         name='expense_user_priority_idx'),
+            models.Index(fields=['user', 'place', 'day'],
+                         name='expense_user_place_idx'),
+            models.Index(fields=['user', 'revision'],
+                         name='expense_user_revision_idx'),
+            models.Index(fields=['user', 'fingerprint'],
+                         name='expense_user_fingerprint_idx'),
+        ]
 
     def __str__(self):
         return f'{self.place} {str(self.price)}'
+
+    def get_fingerprint(self):
+        return fingerprint(self.user_id, self.day, self.price, self.currency,
+                           self.place)
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = self.get_fingerprint()
+        # keep the rollups updated by signals in the same transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class RecurringExpense(models.Model):
+    """
+    Expense repeated every interval of days, weeks, months or years from
+    the start day until the optional until day
+
+    Occurrences are counted from the start, so monthly ones starting on
+    the 31st fall on the last day of shorter months without drifting.
+    next_day is the first occurrence not materialized yet, or None when
+    there are no more.
+    """
+    DAILY = 'daily'
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+    YEARLY = 'yearly'
+    FREQUENCY_CHOICES = (
+        (DAILY, 'Daily'),
+        (WEEKLY, 'Weekly'),
+        (MONTHLY, 'Monthly'),
+        (YEARLY, 'Yearly'),
+    )
+    FREQUENCY_UNITS = {
+        DAILY: 'days', WEEKLY: 'weeks', MONTHLY: 'months', YEARLY: 'years'
+    }
+
+    user = models.ForeignKey(
+        get_user_model(), related_name='recurring_expense',
+        on_delete=models.CASCADE
+    )
+    price = models.DecimalField(max_digits=15, decimal_places=2)
+    currency = currency_field()
+    place = models.CharField(max_length=200)
+    category = models.ForeignKey(
+        Category, blank=True,
+        null=True, on_delete=models.SET_NULL
+    )
+    priority = models.ForeignKey(
+        Priority, blank=True,
+        null=True, on_delete=models.SET_NULL
+    )
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveIntegerField(default=1)
+    start = models.DateField()
+    until = models.DateField(blank=True, null=True)
+    # number of materialized occurrences
+    occurrences = models.IntegerField(default=0)
+    next_day = models.DateField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['next_day'],
+                         name='recurring_next_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.place} {str(self.price)} {self.frequency}'
+
+    def get_occurrence(self, number):
+        unit = self.FREQUENCY_UNITS[self.frequency]
+        return self.start + relativedelta(**{unit: number * self.interval})
+
+    def schedule(self):
+        """
+        Set next_day to the first occurrence not materialized yet
+        """
+        next_day = self.get_occurrence(self.occurrences)
+        if self.until is not None and next_day > self.until:
+            next_day = None
+        self.next_day = next_day
+
+    def advance(self, today):
+        """
+        Count the occurrences due by today as materialized and return their
+        days
+        """
+        days = []
+        while self.next_day is not None and self.next_day <= today:
+            days.append(self.next_day)
+            self.occurrences += 1
+            self.schedule()
+        return days
+
+
+class DailyExpenseSummary(models.Model):
+    """
+    Number and sum of prices of the user's expenses per day, category,
+    priority and currency, maintained on every expense write
+
+    The category and priority are nulled together with the expenses when
+    they are deleted, so several rows may share a key and readers always
+    sum them.
+    """
+    user = models.ForeignKey(
+        get_user_model(), related_name='daily_summary',
+        on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    category = models.ForeignKey(
+        Category, blank=True,
+        null=True, on_delete=models.SET_NULL
+    )
+    priority = models.ForeignKey(
+        Priority, blank=True,
+        null=True, on_delete=models.SET_NULL
+    )
+    currency = currency_field()
+    count = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=17, decimal_places=2,
+                                    default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'day', 'category', 'priority'],
+                         name='daily_summary_key_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.day} {self.count} {str(self.price_sum)}'
+
+
+class MonthlyCategoryTotal(models.Model):
+    """
+    Running number and sum of prices of the user's expenses of a category
+    in a month and a currency, maintained together with the daily summaries
+
+    Expenses without a category are not counted; the totals of a deleted
+    category go with it, as its expenses are nulled.
+    """
+    user = models.ForeignKey(
+        get_user_model(), related_name='monthly_category_total',
+        on_delete=models.CASCADE
+    )
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    # first day of the month
+    month = models.DateField()
+    currency = currency_field()
+    count = models.IntegerField(default=0)
+    price_sum = models.DecimalField(max_digits=17, decimal_places=2,
+                                    default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'month', 'currency'],
+                                    name='monthly_category_total_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.month} {self.count} {str(self.price_sum)}'
+
+
+class Budget(AtomicSaveMixin, models.Model):
+    """
+    Limit of the monthly sum of prices of a category's expenses
+    """
+    user = models.ForeignKey(
+        get_user_model(), related_name='budget', on_delete=models.CASCADE
+    )
+    category = models.OneToOneField(
+        Category, related_name='budget', on_delete=models.CASCADE
+    )
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f'{self.category_id} {str(self.amount)}'
+
+
+class DataVersion(models.Model):
+    """
+    Counter bumped on every write of the user's expenses, categories and
+    priorities, used to version cached results and as the revision of the
+    written objects
+    """
+    user = models.OneToOneField(
+        get_user_model(), primary_key=True, related_name='data_version',
+        on_delete=models.CASCADE
+    )
+    version = models.BigIntegerField(default=1)
+
+    def __str__(self):
+        return f'{self.user_id} {self.version}'
+
+
+class Tombstone(models.Model):
+    """
+    Deleted expense, category or priority, kept for the delta sync
+
+    The user is not constrained, as tombstones of a deleted user may be
+    written after the user's rows are collected for deletion.
+    """
+    user = models.ForeignKey(
+        get_user_model(), related_name='+', on_delete=models.DO_NOTHING,
+        db_constraint=False
+    )
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    revision = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'revision'],
+                         name='tombstone_user_revision_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
+
+
+class ExchangeRate(models.Model):
+    """
+    Value of a unit of the currency in EXPENSE_CURRENCY on a day, used for
+    the following days until there is a newer rate
+    """
+    currency = models.CharField(max_length=3,
+                                validators=[validate_currency])
+    day = models.DateField()
+    rate = models.DecimalField(max_digits=20, decimal_places=10)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['currency', 'day'],
+                                    name='exchange_rate_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.currency} {self.day} {str(self.rate)}'
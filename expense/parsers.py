@@ -0,0 +1,44 @@
+import math
+import ujson
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from .renderers import UJSONRenderer
+
+
+def has_constant(data):
+    """
+    Return True if the parsed data contains NaN or an infinity
+    """
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(has_constant(value) for value in data.values())
+    if isinstance(data, list):
+        return any(has_constant(value) for value in data)
+    return False
+
+
+class UJSONParser(parsers.JSONParser):
+    """
+    JSONParser decoding with ujson
+
+    ujson accepts NaN and Infinity, so in the strict mode they are looked
+    for in the parsed data.
+    """
+    renderer_class = UJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = ujson.loads(stream.read().decode(encoding))
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+        if self.strict and has_constant(data):
+            raise ParseError('JSON parse error - Out of range float values '
+                             'are not JSON compliant')
+        return data
@@ -0,0 +1,185 @@
+import heapq
+import sys
+import threading
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+from functools import partial
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Subquery
+
+from .models import DataVersion, Expense
+
+# memory of all place indexes of the process, in bytes
+PLACE_INDEX_MEMORY = getattr(settings, 'EXPENSE_PLACE_INDEX_MEMORY',
+                             16 * 1024 * 1024)
+# estimated memory of an index entry and its ranking besides the strings
+ENTRY_SIZE = 200
+
+
+def entry_size(place):
+    return ENTRY_SIZE + 2 * sys.getsizeof(place)
+
+
+def successor(prefix):
+    # the smallest string greater than every string with the prefix
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class PlaceIndex:
+    """
+    Places of one user's expenses with their number of expenses, sorted by
+    lowercase place for prefix lookups
+    """
+    def __init__(self, version, counts):
+        self.version = version
+        self.counts = dict(counts)
+        self.entries = sorted((place.lower(), place) for place in self.counts)
+        self.size = sum(entry_size(place) for place in self.counts)
+        # all places from the most frequent, sorted when first needed
+        self.ranking = None
+
+    def suggest(self, prefix, limit):
+        prefix = prefix.lower()
+        if not prefix:
+            if self.ranking is None:
+                self.ranking = sorted((-count, place)
+                                      for place, count in self.counts.items())
+            return self.ranking[:limit]
+
+        start = bisect_left(self.entries, (prefix,))
+        end = bisect_left(self.entries, (successor(prefix),), start)
+        matches = (place for _, place in self.entries[start:end])
+        return heapq.nsmallest(
+            limit, ((-self.counts[place], place) for place in matches)
+        )
+
+    def apply(self, delta):
+        self.ranking = None
+        for place, change in delta.items():
+            count = self.counts.get(place, 0) + change
+            if count > 0 and place not in self.counts:
+                insort(self.entries, (place.lower(), place))
+                self.size += entry_size(place)
+            elif count <= 0 and place in self.counts:
+                del self.entries[bisect_left(self.entries,
+                                             (place.lower(), place))]
+                self.size -= entry_size(place)
+            if count > 0:
+                self.counts[place] = count
+            else:
+                self.counts.pop(place, None)
+
+
+class PlaceIndexes:
+    """
+    Place indexes of users, the least recently used ones evicted when they
+    take more memory than the budget
+    """
+    def __init__(self, memory=PLACE_INDEX_MEMORY):
+        self.memory = memory
+        self.size = 0
+        self.indexes = OrderedDict()
+        self.lock = threading.Lock()
+
+    def suggest(self, user_id, version, prefix, limit):
+        """
+        Return suggestions of the user's index, or None if it is missing or
+        older than the version
+        """
+        with self.lock:
+            index = self.indexes.get(user_id)
+            if index is None or index.version < version:
+                return None
+            self.indexes.move_to_end(user_id)
+            return index.suggest(prefix, limit)
+
+    def set(self, user_id, index):
+        with self.lock:
+            self.discard(user_id)
+            self.indexes[user_id] = index
+            self.size += index.size
+            self.evict()
+
+    def update(self, user_id, revision, delta):
+        """
+        Apply the changes of the write giving the data the revision if the
+        index is of the previous one, otherwise forget the index
+        """
+        with self.lock:
+            index = self.indexes.get(user_id)
+            if index is None:
+                return
+            if index.version != revision - 1:
+                self.discard(user_id)
+                return
+            self.size -= index.size
+            index.apply(delta)
+            index.version = revision
+            self.size += index.size
+            self.evict()
+
+    def forget(self, user_id):
+        with self.lock:
+            self.discard(user_id)
+
+    def clear(self):
+        with self.lock:
+            self.indexes.clear()
+            self.size = 0
+
+    def discard(self, user_id):
+        index = self.indexes.pop(user_id, None)
+        if index is not None:
+            self.size -= index.size
+
+    def evict(self):
+        # the most recently used index is kept even if it is too big
+        while self.size > self.memory and len(self.indexes) > 1:
+            user_id, index = self.indexes.popitem(last=False)
+            self.size -= index.size
+
+
+place_indexes = PlaceIndexes()
+
+
+def build_place_index(user_id, version):
+    """
+    Load the numbers of expenses per place with the data version they are
+    of, in one statement, so both come from the same snapshot
+    """
+    rows = list(
+        Expense.objects.filter(user_id=user_id).order_by().values('place').
+        annotate(count=Count('id'), version=Subquery(
+            DataVersion.objects.filter(user_id=user_id).values('version')
+        )).values_list('place', 'count', 'version')
+    )
+    if rows and rows[0][2] is not None:
+        version = rows[0][2]
+    return PlaceIndex(version, {place: count for place, count, _ in rows})
+
+
+def suggest_places(user, version, prefix, limit):
+    """
+    Return (place, count) pairs of the user's most frequent places starting
+    with the prefix, building the index if it is missing or outdated
+    """
+    suggestions = place_indexes.suggest(user.pk, version, prefix, limit)
+    if suggestions is None:
+        index = build_place_index(user.pk, version)
+        suggestions = index.suggest(prefix, limit)
+        place_indexes.set(user.pk, index)
+    return [(place, -count) for count, place in suggestions]
+
+
+def places_changed(user_id, revision, delta):
+    """
+    Update the user's place index once the write giving the data the
+    revision commits; a revision of None forgets the index
+    """
+    if revision is None:
+        callback = partial(place_indexes.forget, user_id)
+    else:
+        callback = partial(place_indexes.update, user_id, revision,
+                           Counter(delta))
+    transaction.on_commit(callback)
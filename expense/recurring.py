@@ -0,0 +1,100 @@
+import logging
+import threading
+from datetime import date
+from django.db import close_old_connections, transaction
+
+from .bulk import create_expenses
+from .models import Expense, RecurringExpense
+
+logger = logging.getLogger(__name__)
+
+# recurring expenses locked and materialized in one transaction
+MATERIALIZE_BATCH_SIZE = 500
+
+
+def materialize_batch(today, batch_size=MATERIALIZE_BATCH_SIZE):
+    """
+    Create the expenses of due occurrences of a batch of recurring
+    expenses and advance them past today, in one transaction
+
+    Return the number of recurring expenses and of created expenses. The
+    rules are locked, skipping those locked by a concurrent run, and
+    advanced together with inserting their expenses, so a retry after a
+    failure or a commit never creates an occurrence twice; the unique
+    (recurring, day) constraint guards the rest.
+    """
+    with transaction.atomic():
+        rules = list(
+            RecurringExpense.objects.select_for_update(skip_locked=True).
+            filter(next_day__lte=today).order_by('next_day', 'pk')
+            [:batch_size]
+        )
+        expenses = [
+            Expense(user_id=rule.user_id, day=day, price=rule.price,
+                    currency=rule.currency, place=rule.place,
+                    category_id=rule.category_id,
+                    priority_id=rule.priority_id, recurring=rule)
+            for rule in rules for day in rule.advance(today)
+        ]
+        create_expenses(expenses)
+        RecurringExpense.objects.bulk_update(
+            rules, ['occurrences', 'next_day'], batch_size=batch_size
+        )
+    return len(rules), len(expenses)
+
+
+def materialize_due_expenses(today=None, batch_size=MATERIALIZE_BATCH_SIZE):
+    """
+    Create the expenses of all recurring expenses due by today, of all
+    users, batch by batch and return the number of created expenses
+    """
+    if today is None:
+        today = date.today()
+    created = 0
+    while True:
+        rules, expenses = materialize_batch(today, batch_size)
+        created += expenses
+        if rules < batch_size:
+            return created
+
+
+class RecurringExpenseScheduler:
+    """
+    Materializing of the due recurring expenses every interval of seconds,
+    run by materialize_recurring_expenses --loop or in a thread of another
+    long-lived process
+    """
+    def __init__(self, interval=3600, batch_size=MATERIALIZE_BATCH_SIZE):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.stopped.clear()
+            self.thread = threading.Thread(
+                target=self.run, name='recurring-expenses', daemon=True
+            )
+            self.thread.start()
+
+    def stop(self, timeout=None):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.run_once()
+            self.stopped.wait(self.interval)
+
+    def run_once(self):
+        close_old_connections()
+        try:
+            return materialize_due_expenses(batch_size=self.batch_size)
+        except Exception:
+            # the next run retries, as nothing of a failed batch is kept
+            logger.exception('Materializing recurring expenses failed')
+        finally:
+            close_old_connections()
@@ -0,0 +1,35 @@
+import ujson
+from rest_framework import renderers
+
+
+class UJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer encoding with ujson, giving the same output
+
+    Types unknown to ujson, like Decimal or date, are converted by the DRF
+    encoder. Indented output, and numbers too big for ujson, are left to
+    the stdlib json.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if not self.compact or \
+                self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+
+        try:
+            ret = ujson.dumps(
+                data, ensure_ascii=self.ensure_ascii,
+                escape_forward_slashes=False, allow_nan=not self.strict,
+                default=self.encoder_class().default
+            )
+        except OverflowError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+
+        # escaped like in JSONRenderer to keep the output a javascript subset
+        ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
@@ -0,0 +1,226 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Subquery, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import DailyExpenseSummary, Expense, MonthlyCategoryTotal
+
+# fields identifying the daily summary of an expense
+KEY_FIELDS = ('user_id', 'day', 'category_id', 'priority_id', 'currency')
+# fields identifying the monthly total of an expense with a category
+MONTHLY_KEY_FIELDS = ('user_id', 'category_id', 'month', 'currency')
+REBUILD_BATCH_SIZE = 1000
+
+
+def get_key(expense):
+    return tuple(getattr(expense, field) for field in KEY_FIELDS)
+
+
+def new_deltas():
+    """
+    Return an empty mapping of a daily summary key to [count, price sum]
+    """
+    return defaultdict(lambda: [0, Decimal(0)])
+
+
+def add_expenses(deltas, expenses, sign=1):
+    """
+    Add (or subtract with negative sign) expense instances to the deltas
+    """
+    price_field = Expense._meta.get_field('price')
+    for expense in expenses:
+        delta = deltas[get_key(expense)]
+        delta[0] += sign
+        delta[1] += sign * price_field.to_python(expense.price)
+    return deltas
+
+
+def group_expenses(expenses):
+    """
+    Return the expenses queryset grouped by the daily summary key
+    """
+    return expenses.order_by().values(*KEY_FIELDS). \
+        annotate(count=Count('pk'), price_sum=Sum('price'))
+
+
+def group_monthly_totals(expenses):
+    """
+    Return the expenses with a category grouped by the monthly total key
+    """
+    return expenses.filter(category__isnull=False).order_by(). \
+        annotate(month=TruncMonth('day')).values(*MONTHLY_KEY_FIELDS). \
+        annotate(count=Count('pk'), price_sum=Sum('price'))
+
+
+def add_queryset(deltas, expenses, sign=1):
+    """
+    Add (or subtract) the expenses of a queryset with one grouped query
+    """
+    for group in group_expenses(expenses):
+        delta = deltas[tuple(group[field] for field in KEY_FIELDS)]
+        delta[0] += sign * group['count']
+        delta[1] += sign * group['price_sum']
+    return deltas
+
+
+def month_of(day):
+    return day.replace(day=1)
+
+
+def monthly_deltas(deltas):
+    """
+    Sum the daily summary deltas of expenses with a category by user,
+    category, month and currency
+    """
+    monthly = new_deltas()
+    for (user_id, day, category_id, _, currency), (count, price_sum) in \
+            deltas.items():
+        if category_id is not None:
+            delta = monthly[(user_id, category_id, month_of(day), currency)]
+            delta[0] += count
+            delta[1] += price_sum
+    return monthly
+
+
+def apply_monthly_deltas(deltas):
+    """
+    Update the monthly category totals by the deltas, one row per key
+
+    A row created concurrently by another transaction is updated instead.
+    """
+    for key, (count, price_sum) in deltas.items():
+        if not count and not price_sum:
+            continue
+        lookup = dict(zip(MONTHLY_KEY_FIELDS, key))
+        totals = MonthlyCategoryTotal.objects.filter(**lookup)
+        changes = {'count': F('count') + count,
+                   'price_sum': F('price_sum') + price_sum}
+        if totals.update(**changes) or count <= 0:
+            continue
+        try:
+            with transaction.atomic():
+                MonthlyCategoryTotal.objects.create(
+                    count=count, price_sum=price_sum, **lookup
+                )
+        except IntegrityError:
+            totals.update(**changes)
+
+
+def apply_deltas(deltas):
+    """
+    Update the daily summaries and the monthly category totals by the deltas
+
+    Rows are created only for added expenses; subtracting from a missing
+    row means the owner is just being deleted together with the summaries.
+    Rows sharing a key after a category or priority delete are summed by
+    readers, so a delta is applied only to the one with the lowest pk, and
+    they are deleted together once their summed count drops to zero.
+    """
+    emptied = []
+    for key, (count, price_sum) in deltas.items():
+        if not count and not price_sum:
+            continue
+        lookup = dict(zip(KEY_FIELDS, key))
+        first = DailyExpenseSummary.objects.filter(**lookup). \
+            order_by('pk').values('pk')[:1]
+        updated = DailyExpenseSummary.objects.filter(pk=Subquery(first)). \
+            update(count=F('count') + count,
+                   price_sum=F('price_sum') + price_sum)
+        if not updated and count > 0:
+            DailyExpenseSummary.objects.create(
+                count=count, price_sum=price_sum, **lookup
+            )
+        if count < 0:
+            emptied.append(lookup)
+
+    for lookup in emptied:
+        summaries = DailyExpenseSummary.objects.filter(**lookup)
+        left = summaries.aggregate(count=Sum('count'))['count']
+        if left is not None and left <= 0:
+            summaries.delete()
+
+    apply_monthly_deltas(monthly_deltas(deltas))
+
+
+def rebuild_daily_summaries(users=None):
+    """
+    Recalculate the daily summaries of the users (or everyone) from scratch
+    """
+    expenses = Expense.objects.all()
+    summaries = DailyExpenseSummary.objects.all()
+    totals = MonthlyCategoryTotal.objects.all()
+    if users is not None:
+        expenses = expenses.filter(user__in=users)
+        summaries = summaries.filter(user__in=users)
+        totals = totals.filter(user__in=users)
+
+    with transaction.atomic():
+        summaries.delete()
+        batch = []
+        for group in group_expenses(expenses).iterator():
+            batch.append(DailyExpenseSummary(**group))
+            if len(batch) == REBUILD_BATCH_SIZE:
+                DailyExpenseSummary.objects.bulk_create(batch)
+                batch = []
+        DailyExpenseSummary.objects.bulk_create(batch)
+
+        totals.delete()
+        MonthlyCategoryTotal.objects.bulk_create(
+            (MonthlyCategoryTotal(**group)
+             for group in group_monthly_totals(expenses).iterator()),
+            batch_size=REBUILD_BATCH_SIZE
+        )
+
+
+def find_inconsistent_daily_summaries(users=None):
+    """
+    Compare the daily summaries with the expenses
+
+    Return a list of (key, expected, actual) tuples for every key whose
+    summed count and price differ from the expenses.
+    """
+    expenses = Expense.objects.all()
+    summaries = DailyExpenseSummary.objects.all()
+    if users is not None:
+        expenses = expenses.filter(user__in=users)
+        summaries = summaries.filter(user__in=users)
+
+    expected = add_queryset(new_deltas(), expenses)
+    actual = new_deltas()
+    for group in summaries.order_by().values(*KEY_FIELDS). \
+            annotate(count_sum=Sum('count'), price_sum_sum=Sum('price_sum')):
+        actual[tuple(group[field] for field in KEY_FIELDS)] = \
+            [group['count_sum'], group['price_sum_sum']]
+
+    return [
+        (key, tuple(expected.get(key, (0, 0))), tuple(actual.get(key, (0, 0))))
+        for key in sorted(set(expected) | set(actual), key=str)
+        if list(expected.get(key, (0, 0))) != list(actual.get(key, (0, 0)))
+    ]
+
+
+def find_inconsistent_monthly_totals(users=None):
+    """
+    Compare the monthly category totals with the expenses, like
+    find_inconsistent_daily_summaries()
+    """
+    expenses = Expense.objects.all()
+    totals = MonthlyCategoryTotal.objects.all()
+    if users is not None:
+        expenses = expenses.filter(user__in=users)
+        totals = totals.filter(user__in=users)
+
+    expected = new_deltas()
+    for group in group_monthly_totals(expenses):
+        expected[tuple(group[field] for field in MONTHLY_KEY_FIELDS)] = \
+            [group['count'], group['price_sum']]
+    actual = new_deltas()
+    for row in totals.values_list(*MONTHLY_KEY_FIELDS, 'count', 'price_sum'):
+        actual[row[:-2]] = list(row[-2:])
+
+    return [
+        (key, tuple(expected.get(key, (0, 0))), tuple(actual.get(key, (0, 0))))
+        for key in sorted(set(expected) | set(actual), key=str)
+        if list(expected.get(key, (0, 0))) != list(actual.get(key, (0, 0)))
+    ]
@@ -0,0 +1,83 @@
+from operator import itemgetter
+from rest_framework import serializers
+
+from .serializers import ExpenseSerializer
+
+# fields whose representation differs from the value read from database
+CONVERTED_FIELDS = (
+    serializers.DateField, serializers.DateTimeField, serializers.DecimalField
+)
+
+
+def value_getter(field, index):
+    """
+    Return a function reading the representation of the field from a row
+    """
+    if not isinstance(field, CONVERTED_FIELDS):
+        return itemgetter(index)
+
+    convert = field.to_representation
+
+    def get(row):
+        value = row[index]
+        return None if value is None else convert(value)
+    return get
+
+
+def object_getter(getters, index):
+    """
+    Return a function reading a nested object from a row, or None when
+    its id is None
+    """
+    def get(row):
+        if row[index] is None:
+            return None
+        return {name: get_value(row) for name, get_value in getters}
+    return get
+
+
+class ExpenseRowSerializer:
+    """
+    Read-only serializer of expenses loaded as values_list() rows
+
+    The columns and the functions reading every field are taken once from
+    ExpenseSerializer, so the output is the same, but no model instances
+    or serializers are created per row.
+    """
+    def __init__(self, fields=None, expand=()):
+        serializer = ExpenseSerializer(fields=fields, expand=expand)
+
+        # id and day are always loaded, as the pagination orders by them
+        self.columns = ['id', 'day']
+        self.getters = []
+        for name, field in serializer.fields.items():
+            if name in expand:
+                getters = [
+                    (nested_name, value_getter(
+                        nested_field, self.add_column(f'{name}__{nested_name}')
+                    ))
+                    for nested_name, nested_field in field.fields.items()
+                ]
+                getter = object_getter(getters,
+                                       self.add_column(f'{name}__id'))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                getter = itemgetter(self.add_column(f'{field.source}_id'))
+            else:
+                getter = value_getter(field, self.add_column(field.source))
+            self.getters.append((name, getter))
+
+    def add_column(self, lookup):
+        if lookup not in self.columns:
+            self.columns.append(lookup)
+        return self.columns.index(lookup)
+
+    def get_queryset(self, expenses):
+        # named rows keep the day and id attributes used by the pagination
+        return expenses.values_list(*self.columns, named=True)
+
+    def to_representation(self, row):
+        return {name: get(row) for name, get in self.getters}
+
+    def serialize(self, rows):
+        getters = self.getters
+        return [{name: get(row) for name, get in getters} for row in rows]
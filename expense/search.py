@@ -0,0 +1,122 @@
+import re
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+# FTS5 table indexing places of expense_expense, kept in sync by triggers
+FTS_TABLE = 'expense_expense_fts'
+MAX_SEARCH_TERMS = 8
+
+SQLITE_SEARCH_TABLE = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        place, content='expense_expense', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+SQLITE_SEARCH_TRIGGERS = {
+    f'{FTS_TABLE}_insert': f"""
+        CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON expense_expense
+        BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, place) VALUES (new.id, new.place);
+        END
+    """,
+    f'{FTS_TABLE}_delete': f"""
+        CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON expense_expense
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, place)
+            VALUES ('delete', old.id, old.place);
+        END
+    """,
+    f'{FTS_TABLE}_update': f"""
+        CREATE TRIGGER {FTS_TABLE}_update
+        AFTER UPDATE OF place ON expense_expense
+        BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, place)
+            VALUES ('delete', old.id, old.place);
+            INSERT INTO {FTS_TABLE}(rowid, place) VALUES (new.id, new.place);
+        END
+    """,
+}
+
+# icontains compares UPPER(place), which the trigram index covers
+POSTGRESQL_SEARCH_INDEX = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS expense_place_trgm_idx ON expense_expense '
+    'USING gin (UPPER(place::text) gin_trgm_ops)',
+]
+
+
+def install_search_index(connection):
+    """
+    Create the search index of expense places if it is missing
+
+    The SQLite index is rebuilt when any of its triggers had to be created.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(SQLITE_SEARCH_TABLE)
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+            )
+            existing = {name for name, in cursor.fetchall()}
+            missing = [sql for name, sql in SQLITE_SEARCH_TRIGGERS.items()
+                       if name not in existing]
+            for sql in missing:
+                cursor.execute(sql)
+            if missing:
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+                )
+        elif connection.vendor == 'postgresql':
+            for sql in POSTGRESQL_SEARCH_INDEX:
+                cursor.execute(sql)
+
+
+def uninstall_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name in SQLITE_SEARCH_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS expense_place_trgm_idx')
+
+
+def restore_search_triggers(using, **kwargs):
+    """
+    Recreate the SQLite triggers after a migration remade the expense table,
+    which drops them
+    """
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and \
+            FTS_TABLE in connection.introspection.table_names():
+        install_search_index(connection)
+
+
+def get_search_terms(query_params):
+    """
+    Return the lowercase words of the q query param
+    """
+    terms = re.findall(r'\w+', query_params.get('q', '').lower())
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def search_expenses(expenses, terms):
+    """
+    Narrow the expenses to those whose place has words starting with all
+    the terms, keeping their order from the newest
+
+    SQLite uses the FTS5 index; other backends look for every term in the
+    place, which PostgreSQL answers from the trigram index.
+    """
+    if not terms:
+        return expenses
+    if connections[expenses.db].vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return expenses.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [match]
+        ))
+    for term in terms:
+        expenses = expenses.filter(place__icontains=term)
+    return expenses
@@ -1,11 +1,235 @@
+from django.db.models import Value
 from rest_framework import serializers
-from .models import Expense, Category, Priority
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from .bulk import create_expenses
+from .duplicates import find_duplicates
+from .models import Budget, Expense, Category, Priority, RecurringExpense
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
+    """
+    Expense with optionally only some of the fields and the category and
+    priority expanded into objects instead of ids
+    """
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            self.fields[name] = EXPANDED_SERIALIZERS[name](read_only=True)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    class Meta:
+        model = Expense
+        fields = ('id', 'day', 'price', 'currency', 'place', 'category',
+                  'priority')
+
+    def validate(self, attrs):
+        user_id = self.context['request'].user.pk
+        if self.instance is not None:
+            user_id = self.instance.user_id
+        errors = not_owned_errors(attrs, user_id)
+        if errors:
+            raise ValidationError(errors)
+        return attrs
+
+
+def not_owned_errors(attrs, user_id):
+    """
+    Return errors for the category and priority objects in attrs not owned
+    by the user
+    """
+    errors = {}
+    for field in ('category', 'priority'):
+        value = attrs.get(field)
+        if value is not None and value.user_id != user_id:
+            errors[field] = [
+                f'Invalid pk "{value.pk}" - object does not exist.'
+            ]
+    return errors
+
+
+def get_owned(user, categories, priorities):
+    """
+    Return (field, pk) pairs of the categories and priorities owned by the
+    user, fetched with one query
+    """
+    categories = {pk for pk in categories if pk is not None}
+    priorities = {pk for pk in priorities if pk is not None}
+    if not categories and not priorities:
+        return set()
+    categories = Category.objects.filter(user=user, pk__in=categories). \
+        annotate(field=Value('category')).values_list('field', 'pk')
+    priorities = Priority.objects.filter(user=user, pk__in=priorities). \
+        annotate(field=Value('priority')).values_list('field', 'pk')
+    return set(categories.union(priorities))
+
+
+def does_not_exist_errors(attrs, owned):
+    """
+    Return errors for the category and priority in attrs not owned by user
+    """
+    errors = {}
+    for field in ('category', 'priority'):
+        pk = attrs.get(f'{field}_id')
+        if pk is not None and (field, pk) not in owned:
+            errors[field] = [
+                f'Invalid pk "{pk}" - object does not exist.'
+            ]
+    return errors
+
+
+class BulkExpenseListSerializer(serializers.ListSerializer):
+    """
+    Validate every expense separately, so valid ones can be created even
+    if others fail, and create them with one bulk insert
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(
+                input_type=type(data).__name__
+            )
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code='not_a_list')
+
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages['max_length'].format(
+                max_length=self.max_length
+            )
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code='max_length')
+
+        # invalid items are kept as None to report errors by their position
+        ret = []
+        self.item_errors = []
+        for item in data:
+            try:
+                ret.append(self.child.run_validation(item))
+                self.item_errors.append({})
+            except ValidationError as exc:
+                ret.append(None)
+                self.item_errors.append(exc.detail)
+        return ret
+
+    def validate(self, attrs):
+        """
+        Check the categories and priorities belong to the user with one query
+        """
+        items = [item for item in attrs if item is not None]
+        owned = get_owned(self.context['request'].user,
+                          [item.get('category_id') for item in items],
+                          [item.get('priority_id') for item in items])
+
+        for index, item in enumerate(attrs):
+            if item is None:
+                continue
+            errors = does_not_exist_errors(item, owned)
+            if errors:
+                attrs[index] = None
+                self.item_errors[index] = errors
+        if self.context.get('reject_duplicates'):
+            self.reject_duplicates(attrs)
+        return attrs
+
+    def reject_duplicates(self, attrs):
+        """
+        Leave out items duplicating existing expenses or earlier items,
+        looking their fingerprints up with one query
+        """
+        user = self.context['request'].user
+        fingerprints = [
+            None if item is None else
+            Expense(user=user, **item).get_fingerprint() for item in attrs
+        ]
+        duplicates = find_duplicates(Expense.objects.filter(user=user),
+                                     fingerprints)
+        for index, fingerprint in enumerate(fingerprints):
+            if fingerprint is None:
+                continue
+            if fingerprint in duplicates:
+                attrs[index] = None
+                self.item_errors[index] = {
+                    'detail': 'Duplicate expense',
+                    'duplicate': duplicates[fingerprint]
+                }
+            else:
+                # the id of an item's expense is not known yet
+                duplicates[fingerprint] = None
+
+    def save(self, **kwargs):
+        validated_data = [
+            {**attrs, **kwargs}
+            for attrs in self.validated_data if attrs is not None
+        ]
+        self.instance = self.create(validated_data)
+        return self.instance
+
+    def create(self, validated_data):
+        return create_expenses([Expense(**attrs) for attrs in validated_data])
+
+    def get_results(self):
+        """
+        Return the status of every item, with the created expense or errors
+        """
+        created = iter(self.instance)
+        results = []
+        for attrs, errors in zip(self.validated_data, self.item_errors):
+            if attrs is None:
+                results.append({
+                    'status': 409 if 'duplicate' in errors else 400,
+                    'errors': errors
+                })
+            else:
+                results.append({
+                    'status': 201,
+                    'data': ExpenseSerializer(next(created)).data
+                })
+        return results
+
+
+class BulkExpenseSerializer(serializers.ModelSerializer):
+    category = serializers.IntegerField(
+        source='category_id', required=False, allow_null=True
+    )
+    priority = serializers.IntegerField(
+        source='priority_id', required=False, allow_null=True
+    )
+
     class Meta:
         model = Expense
-        fields = ('id', 'day', 'price', 'place', 'category', 'priority')
+        fields = ('id', 'day', 'price', 'currency', 'place', 'category',
+                  'priority')
+        list_serializer_class = BulkExpenseListSerializer
+
+
+class BulkExpenseUpdateSerializer(serializers.ModelSerializer):
+    """
+    Values set on all selected expenses by a bulk update
+    """
+    category = serializers.IntegerField(
+        source='category_id', required=False, allow_null=True
+    )
+    priority = serializers.IntegerField(
+        source='priority_id', required=False, allow_null=True
+    )
+
+    class Meta:
+        model = Expense
+        fields = ('price', 'currency', 'place', 'category', 'priority')
+
+    def validate(self, attrs):
+        if not attrs:
+            raise ValidationError('No values to update')
+        owned = get_owned(self.context['request'].user,
+                          [attrs.get('category_id')],
+                          [attrs.get('priority_id')])
+        errors = does_not_exist_errors(attrs, owned)
+        if errors:
+            raise ValidationError(errors)
+        return attrs
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -18,3 +242,90 @@ class PrioritySerializer(serializers.ModelSerializer):
     class Meta:
         model = Priority
         fields = ('id', 'name')
+
+
+class BudgetSerializer(serializers.ModelSerializer):
+    """
+    Budget of a category, with its spending when the budget is annotated
+    by with_spending()
+    """
+    month = serializers.DateField(format='%Y-%m', read_only=True)
+    spent = serializers.DecimalField(max_digits=17, decimal_places=2,
+                                     read_only=True)
+    remaining = serializers.DecimalField(max_digits=17, decimal_places=2,
+                                         read_only=True)
+    utilization = serializers.SerializerMethodField()
+    unconverted = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Budget
+        fields = ('id', 'category', 'amount', 'month', 'spent', 'remaining',
+                  'utilization', 'unconverted')
+
+    def validate_category(self, value):
+        if value.user_id != self.context['request'].user.pk:
+            raise ValidationError(
+                f'Invalid pk "{value.pk}" - object does not exist.'
+            )
+        return value
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise ValidationError('Ensure this value is greater than 0.')
+        return value
+
+    def get_utilization(self, budget):
+        # fraction of the amount spent in the month
+        spent = getattr(budget, 'spent', None)
+        if spent is None:
+            return None
+        return round(float(spent / budget.amount), 4)
+
+
+class RecurringExpenseSerializer(serializers.ModelSerializer):
+    """
+    Recurring expense whose schedule is fixed once created; only the until
+    day can be moved
+    """
+    schedule_fields = ('frequency', 'interval', 'start')
+
+    class Meta:
+        model = RecurringExpense
+        fields = ('id', 'price', 'currency', 'place', 'category', 'priority',
+                  'frequency', 'interval', 'start', 'until', 'next_day')
+        read_only_fields = ('next_day',)
+        extra_kwargs = {'interval': {'min_value': 1}}
+
+    def validate(self, attrs):
+        errors = not_owned_errors(attrs, self.context['request'].user.pk)
+        if self.instance is not None:
+            for field in self.schedule_fields:
+                if field in attrs and \
+                        attrs[field] != getattr(self.instance, field):
+                    errors[field] = ['The schedule cannot be changed.']
+        start = attrs.get('start', getattr(self.instance, 'start', None))
+        until = attrs.get('until')
+        if until is not None and start is not None and until < start:
+            errors['until'] = ['Ensure this day is not before the start.']
+        if errors:
+            raise ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        recurring = RecurringExpense(**validated_data)
+        recurring.schedule()
+        recurring.save()
+        return recurring
+
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.schedule()
+        instance.save()
+        return instance
+
+
+EXPANDED_SERIALIZERS = {
+    'category': CategorySerializer,
+    'priority': PrioritySerializer,
+}
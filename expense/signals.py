@@ -0,0 +1,128 @@
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+
+from .cache import bump_data_version
+from .models import Budget, Category, Expense, Priority, Tombstone
+from .places import places_changed
+from .rollups import add_expenses, apply_deltas, new_deltas
+
+
+@receiver(pre_save, sender=Expense)
+def remember_previous_expense(sender, instance, raw=False, **kwargs):
+    """
+    Load the stored version of an updated expense to reverse its rollups.
+    """
+    instance._previous_expense = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._previous_expense = \
+        Expense.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Expense)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Move the expense from its previous daily summary to the current one.
+    """
+    if raw:
+        return
+    deltas = new_deltas()
+    previous = getattr(instance, '_previous_expense', None)
+    if previous is not None:
+        add_expenses(deltas, [previous], sign=-1)
+    add_expenses(deltas, [instance])
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Expense)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    """
+    Subtract the deleted expense from its daily summary.
+    """
+    apply_deltas(add_expenses(new_deltas(), [instance], sign=-1))
+
+
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Priority)
+def set_revision(sender, instance, raw=False, **kwargs):
+    """
+    Invalidate cached results of the owner and mark the object with the
+    new version of the owner's data.
+    """
+    if not raw:
+        instance.revision = bump_data_version(instance.user_id)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Priority)
+def set_revision_of_nulled_expenses(sender, instance, **kwargs):
+    """
+    Mark expenses whose category or priority is going to be nulled.
+    """
+    revision = bump_data_version(instance.user_id, create=False)
+    if revision is not None:
+        Expense.objects.filter(**{sender._meta.model_name: instance}). \
+            update(revision=revision)
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def bump_version_on_budget_change(sender, instance, raw=False, **kwargs):
+    """
+    Invalidate cached results of the owner, as budgets are not synced.
+    """
+    if not raw:
+        # only post_save passes created; deletes may be of the user
+        bump_data_version(instance.user_id, create='created' in kwargs)
+
+
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Priority)
+def add_tombstone(sender, instance, **kwargs):
+    """
+    Invalidate cached results of the owner and remember the deleted object.
+    """
+    revision = bump_data_version(instance.user_id, create=False)
+    instance.revision = revision
+    if revision is not None:
+        Tombstone.objects.create(
+            user_id=instance.user_id, model=sender._meta.model_name,
+            object_id=instance.pk, revision=revision
+        )
+
+
+@receiver(post_save, sender=Expense)
+def update_places_on_save(sender, instance, raw=False, **kwargs):
+    """
+    Count the place of the expense instead of its previous place.
+    """
+    if raw:
+        return
+    delta = {instance.place: 1}
+    previous = getattr(instance, '_previous_expense', None)
+    if previous is not None:
+        delta[previous.place] = delta.get(previous.place, 0) - 1
+    places_changed(instance.user_id, instance.revision, delta)
+
+
+@receiver(post_delete, sender=Expense)
+def update_places_on_delete(sender, instance, **kwargs):
+    """
+    Stop counting the place of the deleted expense; it is registered after
+    add_tombstone, which sets the revision of the delete.
+    """
+    places_changed(instance.user_id, instance.revision,
+                   {instance.place: -1})
+
+
+@receiver(post_delete, sender=get_user_model())
+def delete_tombstones(sender, instance, **kwargs):
+    """
+    Remove tombstones of a deleted user, which are not deleted in cascade.
+    """
+    Tombstone.objects.filter(user_id=instance.pk).delete()
@@ -0,0 +1,175 @@
+from django.db import connections
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .currency import converted, count_unconverted
+
+# fields for which the most chosen value is reported, in response order
+MOSTLY_CHOSEN_FIELDS = ('place', 'category', 'priority')
+MAX_TOP = 50
+
+
+def scalar_query(queryset, expression):
+    """
+    Turn a filtered queryset into a query returning one aggregated value
+    """
+    return queryset.order_by().annotate(_group=Value(1)).values('_group'). \
+        annotate(value=expression).values('value')
+
+
+def mostly_chosen_queries(queryset, field, count=None):
+    """
+    Return queries selecting the most chosen value of the field and its count
+    """
+    count_name = f'{field}__count'
+    if count is None:
+        count = Count(field)
+    groups = queryset.order_by().values(field). \
+        annotate(**{count_name: count}).order_by(f'-{count_name}', field)
+    return groups.values(field)[:1], groups.values(count_name)[:1]
+
+
+def evaluate_scalar_queries(queries, using='default'):
+    """
+    Evaluate single value querysets as subqueries of one SELECT statement
+
+    Every query is compiled separately and the results are converted with the
+    converters of its selected column, so the values have the same types as
+    if the querysets were evaluated one by one.
+    """
+    connection = connections[using]
+    columns, params, converters = [], [], []
+    for queryset in queries.values():
+        compiler = queryset.query.get_compiler(using)
+        sql, sql_params = compiler.as_sql()
+        columns.append(f'({sql})')
+        params.extend(sql_params)
+        expression = compiler.select[0][0]
+        converters.append(
+            compiler.get_converters([expression]).get(0, ((), expression))
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT ' + ', '.join(columns), params)
+        row = cursor.fetchone()
+
+    result = {}
+    for name, value, (functions, expression) in zip(queries, row, converters):
+        for function in functions:
+            value = function(value, expression, connection)
+        result[name] = value
+    return result
+
+
+def price_sum(field, currency=None):
+    """
+    Sum prices of the field, converted into the currency when given
+    """
+    if currency is None:
+        return Sum(field)
+    return Sum(converted(field, currency))
+
+
+def summary_count(field):
+    """
+    Count expenses with the field set, like Count(field), from daily summaries
+    """
+    return Coalesce(
+        Sum('count', filter=Q(**{f'{field}__isnull': False})), 0
+    )
+
+
+def top_values(groups, field, metric, name, top):
+    """
+    Return the top values of the field by the metric, with one LIMIT query
+    """
+    return list(
+        groups.filter(**{f'{field}__isnull': False}).order_by().
+        values(field).annotate(**{name: metric}).
+        order_by(f'-{name}', field)[:top]
+    )
+
+
+def get_top_values(queryset, summaries, top, currency=None):
+    """
+    Return the top most frequent and most expensive places, categories and
+    priorities of the filtered expenses, with sums in the currency if given
+
+    Every list is read with its own LIMIT query, ties broken by the value,
+    so the cost does not depend on the number of distinct values.
+    Categories and priorities are read from the daily summaries if given.
+    """
+    result = {}
+    for field in MOSTLY_CHOSEN_FIELDS:
+        if summaries is None or field == 'place':
+            groups, count, prices = \
+                queryset, Count('pk'), price_sum('price', currency)
+        else:
+            groups, count, prices = \
+                summaries, Sum('count'), price_sum('price_sum', currency)
+        result[field] = {
+            'most_frequent': top_values(groups, field, count, 'count', top),
+            'most_expensive': top_values(groups, field, prices,
+                                         'price__sum', top),
+        }
+    return result
+
+
+def get_statistics(queryset, summaries=None, top=None, currency=None):
+    """
+    Calculate the statistics of the filtered expenses with a single query,
+    and one more query for each list of top values
+
+    Return the number of expenses and a dict in the shape of the statistics
+    block of the expenses list: the sum of prices and the most chosen place,
+    category and priority with their counts, and the top values when top
+    is given. When the daily summaries filtered the same way are given,
+    everything except the place is read from them instead of the expenses.
+    Prices are summed in the currency when given, converted in the query,
+    and the number of expenses left out for lack of rates is reported.
+    """
+    if summaries is None:
+        queries = {
+            'count': scalar_query(queryset, Count('pk')),
+            'price__sum': scalar_query(queryset,
+                                       price_sum('price', currency)),
+        }
+        for field in MOSTLY_CHOSEN_FIELDS:
+            queries[field], queries[f'{field}__count'] = \
+                mostly_chosen_queries(queryset, field)
+    else:
+        queries = {
+            'count': scalar_query(summaries, Coalesce(Sum('count'), 0)),
+            'price__sum': scalar_query(summaries,
+                                       price_sum('price_sum', currency)),
+        }
+        queries['place'], queries['place__count'] = \
+            mostly_chosen_queries(queryset, 'place')
+        for field in ('category', 'priority'):
+            queries[field], queries[f'{field}__count'] = \
+                mostly_chosen_queries(summaries, field, summary_count(field))
+
+    if currency is not None:
+        if summaries is None:
+            rows, price, count = queryset, 'price', None
+        else:
+            rows, price, count = summaries, 'price_sum', 'count'
+        queries['unconverted'] = scalar_query(
+            rows.annotate(_price=converted(price, currency)),
+            count_unconverted(count)
+        )
+
+    values = evaluate_scalar_queries(queries, using=queryset.db)
+
+    statistics = {'price__sum': values['price__sum']}
+    if currency is not None:
+        statistics['unconverted'] = values['unconverted']
+    # there is no most chosen value when there are no expenses
+    if values['count']:
+        for field in MOSTLY_CHOSEN_FIELDS:
+            statistics[field] = values[field]
+            statistics[f'{field}__count'] = values[f'{field}__count']
+    if top:
+        statistics['top'] = get_top_values(queryset, summaries, top,
+                                           currency)
+    return values['count'], statistics
@@ -0,0 +1,86 @@
+from datetime import timedelta
+from dateutil.relativedelta import relativedelta
+from django.db.models import F, Sum
+from django.db.models.functions import (
+    TruncMonth, TruncQuarter, TruncWeek, TruncYear
+)
+
+from .currency import converted, count_unconverted
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def quarter_start(day):
+    return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+
+
+def year_start(day):
+    return day.replace(month=1, day=1)
+
+
+def week_key(day):
+    year, week, _ = day.isocalendar()
+    return f'{year}-W{week}'
+
+
+def month_key(day):
+    return f'{day.year}-{day.month}'
+
+
+def quarter_key(day):
+    return f'{day.year}-Q{(day.month - 1) // 3 + 1}'
+
+
+def year_key(day):
+    return f'{day.year}'
+
+
+# group name -> (database truncation, period start, period length, key)
+SUMMARY_GROUPS = {
+    'week': (TruncWeek, week_start, relativedelta(weeks=1), week_key),
+    'month': (TruncMonth, month_start, relativedelta(months=1), month_key),
+    'quarter': (
+        TruncQuarter, quarter_start, relativedelta(months=3), quarter_key
+    ),
+    'year': (TruncYear, year_start, relativedelta(years=1), year_key),
+}
+
+
+def summarize_periods(summaries, group, periods, today, currency=None):
+    """
+    Sum prices of the daily summaries in the last periods with one query,
+    converted into the currency when given
+
+    Return a list of {'date': key, 'sum_of_prices': sum, 'unconverted':
+    number} dicts from the current period back, with None sums for periods
+    without expenses; unconverted expenses have no rate of their day.
+    """
+    trunc, period_start, period, key = SUMMARY_GROUPS[group]
+    current = period_start(today)
+    starts = [current - period * i for i in range(periods)]
+    end = current + period - timedelta(days=1)
+    prices = F('price_sum') if currency is None else \
+        converted('price_sum', currency)
+
+    sums = {
+        period: (sum_of_prices, unconverted)
+        for period, sum_of_prices, unconverted in
+        summaries.filter(day__range=[starts[-1], end]).order_by().
+        annotate(_price=prices, period=trunc('day')).values('period').
+        annotate(sum_of_prices=Sum('_price'),
+                 unconverted=count_unconverted('count')).
+        values_list('period', 'sum_of_prices', 'unconverted')
+    }
+
+    result = []
+    for start in starts:
+        sum_of_prices, unconverted = sums.get(start, (None, 0))
+        result.append({'date': key(start), 'sum_of_prices': sum_of_prices,
+                       'unconverted': unconverted})
+    return result
@@ -0,0 +1,107 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+from unittest import mock
+
+from expense.analytics import pivot
+from expense.models import Category, DailyExpenseSummary, Expense
+from expense.views import ExpenseAnalytics
+
+
+class TestAnalytics(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com',
+                                           is_active=True)
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+        cls.home = Category.objects.create(user=cls.user, name='Home')
+
+        for day, price, place, category in (
+                (date(2026, 9, 3), 10, 'Lidl', cls.food),
+                (date(2026, 9, 20), 20, 'Ikea', cls.home),
+                (date(2026, 10, 1), 5, 'Lidl', cls.food),
+                (date(2026, 10, 2), 7, 'Lidl', None)):
+            expense = Expense.objects.create(user=cls.user, price=price,
+                                             place=place, category=category)
+            expense.day = day
+            expense.save()
+        other = cls.User.objects.create(email='other@user.com')
+        Expense.objects.create(user=other, price=99, place='Lidl')
+
+    def get(self, query):
+        request = APIRequestFactory().get(
+            reverse('expense-expense-analytics') +
+            '?fyear=2026&fmonth=1&tyear=2026&tmonth=12&' + query
+        )
+        force_authenticate(request, user=self.user)
+        return ExpenseAnalytics.as_view()(request)
+
+    def test_group_by_one_dimension(self):
+        response = self.get('group_by=month&metrics=sum,count')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['rows'], ['2026-09-01', '2026-10-01'])
+        self.assertIsNone(response.data['columns'])
+        self.assertEqual(response.data['values'], {
+            'sum': [Decimal('30'), Decimal('12')],
+            'count': [2, 2],
+        })
+
+    def test_pivot_of_two_dimensions(self):
+        response = self.get('group_by=month,category&metrics=max')
+
+        self.assertEqual(response.data['columns'],
+                         [self.food.id, self.home.id, None])
+        self.assertEqual(response.data['values'], {'max': [
+            [Decimal('10'), Decimal('20'), None],
+            [Decimal('5'), None, Decimal('7')],
+        ]})
+
+    def test_summaries_and_expenses_give_same_results(self):
+        expenses = Expense.objects.filter(user=self.user)
+        summaries = DailyExpenseSummary.objects.filter(user=self.user)
+        for group_by in (['week'], ['year', 'priority'], ['day', 'category']):
+            with self.subTest(group_by=group_by):
+                self.assertEqual(
+                    pivot(expenses, summaries, group_by, ['sum', 'count']),
+                    pivot(expenses, None, group_by, ['sum', 'count'])
+                )
+
+    def test_single_query(self):
+        # the data version and the grouped query
+        with self.assertNumQueries(2):
+            response = self.get('group_by=place,year&metrics=avg,min,count')
+
+        self.assertEqual(response.data['rows'], ['Ikea', 'Lidl'])
+        self.assertEqual(response.data['values']['count'], [[1], [3]])
+
+    def test_filters_and_search(self):
+        response = self.get(f'group_by=place&cat={self.food.id}')
+        self.assertEqual(response.data['rows'], ['Lidl'])
+        self.assertEqual(response.data['values'], {'sum': [Decimal('15')]})
+
+        response = self.get('group_by=category&q=ike')
+        self.assertEqual(response.data['rows'], [self.home.id])
+
+    def test_invalid_params(self):
+        for query in ('', 'group_by=user', 'group_by=day&metrics=median',
+                      'group_by=day,month,year', 'group_by=day,day'):
+            with self.subTest(query=query):
+                response = self.get(query)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.data)
+
+    def test_too_many_groups(self):
+        with mock.patch('expense.analytics.MAX_ROWS', 1):
+            response = self.get('group_by=place')
+
+        self.assertEqual(response.status_code, 400)
+
+        with mock.patch('expense.analytics.MAX_CELLS', 3):
+            response = self.get('group_by=month,category')
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,256 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from decimal import Decimal
+from datetime import date
+from io import StringIO
+
+from expense.budgets import get_budget_status
+from expense.bulk import create_expenses, delete_expenses, update_expenses
+from expense.models import Budget, Category, Expense, MonthlyCategoryTotal
+from expense.rollups import find_inconsistent_monthly_totals
+
+
+class TestMonthlyCategoryTotal(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(email='user@user.com')
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+        cls.drink = Category.objects.create(user=cls.user, name='Drink')
+        cls.month = date.today().replace(day=1)
+
+    def create_expense(self, price=10, **kwargs):
+        return Expense.objects.create(
+            user=self.user, price=price, place='Shop', **kwargs
+        )
+
+    def totals(self):
+        return list(MonthlyCategoryTotal.objects.values_list(
+            'category', 'month', 'count', 'price_sum'
+        ).order_by('category', 'month'))
+
+    def assertConsistent(self):
+        self.assertEqual(find_inconsistent_monthly_totals(), [])
+
+    def test_expenses_of_category_are_totalled_per_month(self):
+        self.create_expense(10, category=self.food)
+        self.create_expense(15, category=self.food)
+        self.create_expense(99)
+
+        self.assertEqual(self.totals(), [
+            (self.food.id, self.month, 2, Decimal('25.00'))
+        ])
+
+    def test_update_and_delete_move_expense_between_totals(self):
+        expense = self.create_expense(10, category=self.food)
+        expense.category = self.drink
+        expense.price = 20
+        expense.save()
+        self.assertEqual(self.totals(), [
+            (self.food.id, self.month, 0, Decimal('0.00')),
+            (self.drink.id, self.month, 1, Decimal('20.00')),
+        ])
+
+        expense.day = date(2022, 1, 15)
+        expense.save()
+        self.assertConsistent()
+
+        expense.delete()
+        self.assertConsistent()
+
+    def test_bulk_writes_keep_totals_consistent(self):
+        create_expenses([
+            Expense(user=self.user, price=price, place='Shop',
+                    category=self.food)
+            for price in (1, 2, 3)
+        ])
+        self.assertEqual(self.totals(), [
+            (self.food.id, self.month, 3, Decimal('6.00'))
+        ])
+
+        update_expenses(Expense.objects.filter(price__lt=3),
+                        {'category_id': self.drink.id, 'price': 5})
+        self.assertConsistent()
+
+        delete_expenses(Expense.objects.filter(category=self.drink))
+        self.assertConsistent()
+
+    def test_deleted_category_takes_its_totals(self):
+        self.create_expense(10, category=self.food)
+
+        self.food.delete()
+
+        self.assertEqual(self.totals(), [])
+        self.assertConsistent()
+
+    def test_rebuild_command_fixes_totals(self):
+        expense = self.create_expense(10, category=self.food)
+        Expense.objects.filter(pk=expense.pk).update(price=30)
+        self.assertEqual(len(find_inconsistent_monthly_totals()), 1)
+
+        call_command('rebuild_daily_summaries', stdout=StringIO())
+
+        self.assertConsistent()
+
+
+class TestBudgetViews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com')
+        cls.user.set_password('foo')
+        cls.user.is_active = True
+        cls.user.save()
+        cls.other = cls.User.objects.create(email='other@user.com')
+
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+        cls.drink = Category.objects.create(user=cls.user, name='Drink')
+        cls.budget = Budget.objects.create(user=cls.user, category=cls.food,
+                                           amount=100)
+        Expense.objects.create(user=cls.user, price=30, place='Shop',
+                               category=cls.food)
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Bearer ' + response.json()['access_token']
+        }
+        self.month = date.today().strftime('%Y-%m')
+
+    def post_expense(self, category):
+        return self.client.post(
+            reverse('expense-expense-list'), content_type='application/json',
+            data={'price': '45.50', 'place': 'Shop', 'category': category},
+            **self.headers
+        )
+
+    def test_created_expense_has_budget_status(self):
+        response = self.post_expense(self.food.id)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['budget'], {
+            'id': self.budget.id, 'category': self.food.id,
+            'amount': '100.00', 'month': self.month, 'spent': '75.50',
+            'remaining': '24.50', 'utilization': 0.755, 'unconverted': 0,
+        })
+
+    def test_budget_status_is_one_query(self):
+        expense = Expense.objects.get()
+
+        with self.assertNumQueries(1):
+            budget = get_budget_status(expense, 'PLN')
+
+        self.assertEqual((budget.spent, budget.remaining),
+                         (Decimal('30.00'), Decimal('70.00')))
+
+    def test_not_owned_category_is_rejected(self):
+        other_food = Category.objects.create(user=self.other, name='Food')
+
+        response = self.post_expense(other_food.id)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.json())
+        expense = Expense.objects.get(user=self.user)
+        response = self.client.put(
+            reverse('expense-expense-detail', args=[expense.pk]),
+            content_type='application/json',
+            data={'price': '1', 'place': 'Shop', 'category': other_food.id},
+            **self.headers
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(find_inconsistent_monthly_totals(), [])
+
+    def test_budget_status_is_of_the_owner(self):
+        # an expense of another user in the category, made before its owner
+        # was checked
+        expense = Expense(user=self.other, price=1, place='Shop',
+                          category=self.food)
+
+        self.assertIsNone(get_budget_status(expense, 'PLN'))
+
+    def test_created_expense_without_budget(self):
+        response = self.post_expense(self.drink.id)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(response.json()['budget'])
+
+    def test_list_budgets_with_utilization(self):
+        Budget.objects.create(user=self.user, category=self.drink, amount=20)
+        Budget.objects.create(
+            user=self.other, amount=5,
+            category=Category.objects.create(user=self.other, name='Food')
+        )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('expense-budget-list'),
+                                       **self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['month'], self.month)
+        self.assertEqual(
+            [(budget['category'], budget['spent'], budget['utilization'])
+             for budget in response.json()['budgets']],
+            [(self.food.id, '30.00', 0.3), (self.drink.id, '0.00', 0.0)]
+        )
+
+    def test_list_budgets_of_other_month(self):
+        response = self.client.get(reverse('expense-budget-list'),
+                                   {'month': '2020-02'}, **self.headers)
+
+        self.assertEqual(response.json()['month'], '2020-02')
+        self.assertEqual(response.json()['budgets'][0]['spent'], '0.00')
+
+        response = self.client.get(reverse('expense-budget-list'),
+                                   {'month': 'february'}, **self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_budget(self):
+        response = self.client.post(
+            reverse('expense-budget-list'), content_type='application/json',
+            data={'category': self.drink.id, 'amount': '50'}, **self.headers
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['spent'], '0.00')
+        self.assertEqual(Budget.objects.get(category=self.drink).user,
+                         self.user)
+
+    def test_create_invalid_budget(self):
+        other_category = Category.objects.create(user=self.other, name='X')
+        for data in ({'category': self.food.id, 'amount': '50'},
+                     {'category': other_category.id, 'amount': '50'},
+                     {'category': self.drink.id, 'amount': '0'}):
+            response = self.client.post(
+                reverse('expense-budget-list'),
+                content_type='application/json', data=data, **self.headers
+            )
+            self.assertEqual(response.status_code, 400, data)
+
+    def test_update_and_delete_budget(self):
+        url = reverse('expense-budget-detail', args=[self.budget.pk])
+
+        response = self.client.put(
+            url, content_type='application/json',
+            data={'category': self.food.id, 'amount': '60'}, **self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['utilization'], 0.5)
+
+        response = self.client.delete(url, **self.headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Budget.objects.exists())
+
+    def test_budget_change_invalidates_etag(self):
+        url = reverse('expense-budget-list')
+        etag = self.client.get(url, **self.headers)['ETag']
+
+        Budget.objects.filter(pk=self.budget.pk).get().save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag,
+                                   **self.headers)
+        self.assertEqual(response.status_code, 200)
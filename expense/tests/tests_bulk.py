@@ -0,0 +1,258 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from expense.models import Category, Expense, Priority
+from expense.rollups import find_inconsistent_daily_summaries
+
+
+class TestBulkCreate(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        user = cls.User.objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        cls.user = user
+
+        cls.category = Category.objects.create(user=cls.user, name='Food')
+        cls.priority = Priority.objects.create(user=cls.user, name='High')
+        other = cls.User.objects.create(email='other@user.com')
+        cls.other_category = Category.objects.create(user=other, name='Car')
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+
+        self.token = response.json()['access_token']
+        self.csrftoken = response.cookies['csrftoken'].value
+
+    def post(self, data):
+        return self.client.post(
+            reverse('expense-expense-bulk'),
+            data=data,
+            content_type='application/json',
+            **{
+                'HTTP_AUTHORIZATION': 'Bearer ' + self.token,
+                'X-CSRFToken': self.csrftoken
+            }
+        )
+
+    def expenses(self, number):
+        return [
+            {'price': 10 + i, 'place': f'Shop{i}',
+             'category': self.category.id, 'priority': self.priority.id}
+            for i in range(number)
+        ]
+
+    def test_bulk_create_expenses(self):
+        response = self.post(self.expenses(3))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['status'] for item in response.json()],
+                         [201, 201, 201])
+        self.assertEqual(response.json()[1]['data']['place'], 'Shop1')
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 3)
+        # the ids map every item to its row
+        self.assertEqual(
+            [(item['data']['id'], item['data']['place'])
+             for item in response.json()],
+            list(Expense.objects.order_by('pk').values_list('pk', 'place'))
+        )
+        self.assertEqual(find_inconsistent_daily_summaries(), [])
+
+    def test_bulk_create_reports_every_item(self):
+        data = self.expenses(1) + [
+            {'place': 'Shop'},
+            {'price': 5, 'place': 'Shop', 'category': self.other_category.id},
+            {'price': 5, 'place': 'Shop', 'priority': 1000},
+        ]
+
+        response = self.post(data)
+
+        self.assertEqual(response.status_code, 207)
+        results = response.json()
+        self.assertEqual([item['status'] for item in results],
+                         [201, 400, 400, 400])
+        self.assertIn('price', results[1]['errors'])
+        self.assertIn('category', results[2]['errors'])
+        self.assertIn('priority', results[3]['errors'])
+        self.assertEqual(Expense.objects.count(), 1)
+        self.assertEqual(results[0]['data']['id'], Expense.objects.get().pk)
+
+    def test_bulk_create_query_count_does_not_grow(self):
+        # the first expense of a day creates its daily summary
+        self.post(self.expenses(1))
+
+        with CaptureQueriesContext(connection) as few:
+            self.post(self.expenses(2))
+        with CaptureQueriesContext(connection) as many:
+            self.post(self.expenses(50))
+
+        self.assertEqual(len(few), len(many))
+
+    def test_bulk_create_not_a_list(self):
+        response = self.post({'price': 10, 'place': 'Shop'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Expense.objects.count(), 0)
+
+    def test_bulk_create_too_many_items(self):
+        response = self.post(self.expenses(1001))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Expense.objects.count(), 0)
+
+
+class TestBulkUpdateDelete(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        user = cls.User.objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        cls.user = user
+
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+        cls.home = Category.objects.create(user=cls.user, name='Home')
+        cls.ids = [
+            Expense.objects.create(
+                user=cls.user, price=10 + i, place=f'Shop{i}',
+                category=cls.food if i % 2 else cls.home
+            ).pk
+            for i in range(6)
+        ]
+
+        cls.other = cls.User.objects.create(email='other@user.com')
+        cls.other_category = Category.objects.create(user=cls.other,
+                                                     name='Car')
+        cls.other_expense = Expense.objects.create(
+            user=cls.other, price=99, place='Other'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+
+        self.token = response.json()['access_token']
+        self.csrftoken = response.cookies['csrftoken'].value
+
+    def request(self, method, params, data=None):
+        return getattr(self.client, method)(
+            reverse('expense-expense-bulk') + '?' + params,
+            data=data,
+            content_type='application/json',
+            **{
+                'HTTP_AUTHORIZATION': 'Bearer ' + self.token,
+                'X-CSRFToken': self.csrftoken
+            }
+        )
+
+    def ids_param(self, ids):
+        return 'ids=' + ','.join(str(pk) for pk in ids)
+
+    def assertConsistent(self):
+        self.assertEqual(find_inconsistent_daily_summaries(), [])
+
+    def test_bulk_update_by_ids(self):
+        ids = self.ids[:3] + [self.other_expense.pk]
+        response = self.request('patch', self.ids_param(ids),
+                                {'category': self.food.id, 'price': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'updated': 3})
+        self.assertEqual(
+            Expense.objects.filter(category=self.food, price=1).count(), 3
+        )
+        self.other_expense.refresh_from_db()
+        self.assertEqual(self.other_expense.price, 99)
+        self.assertConsistent()
+
+    def test_bulk_update_by_filter(self):
+        response = self.request('patch', f'cat={self.home.id}',
+                                {'category': None, 'place': 'Moved'})
+
+        self.assertEqual(response.json(), {'updated': 3})
+        self.assertEqual(Expense.objects.filter(place='Moved').count(), 3)
+        self.assertFalse(Expense.objects.filter(category=self.home).exists())
+        self.assertConsistent()
+
+    def test_bulk_update_uses_one_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.request('patch', self.ids_param(self.ids), {'place': 'X'})
+
+        updates = [query for query in queries
+                   if query['sql'].startswith('UPDATE "expense_expense"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_user_is_locked_before_groups_are_read(self):
+        for method, data in (('patch', {'place': 'X'}), ('delete', None)):
+            with CaptureQueriesContext(connection) as queries:
+                self.request(method, self.ids_param(self.ids), data)
+
+            sql = [query['sql'] for query in queries]
+            lock = next(index for index, query in enumerate(sql)
+                        if query.startswith('UPDATE "expense_dataversion"'))
+            groups = next(index for index, query in enumerate(sql)
+                          if 'GROUP BY' in query)
+            self.assertLess(lock, groups, msg=method)
+            self.assertEqual(sum(query.startswith(
+                'UPDATE "expense_dataversion"'
+            ) for query in sql), 1, msg=method)
+        self.assertConsistent()
+
+    def test_bulk_update_with_not_owned_category(self):
+        response = self.request('patch', self.ids_param(self.ids),
+                                {'category': self.other_category.id})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.json())
+
+    def test_bulk_update_without_values(self):
+        response = self.request('patch', self.ids_param(self.ids), {})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_delete_by_ids(self):
+        ids = self.ids[:2] + [self.other_expense.pk]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.request('delete', self.ids_param(ids))
+
+        self.assertEqual(response.json(), {'deleted': 2})
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 4)
+        self.assertTrue(
+            Expense.objects.filter(pk=self.other_expense.pk).exists()
+        )
+        deletes = [query for query in queries
+                   if query['sql'].startswith('DELETE FROM "expense_expense"')]
+        self.assertEqual(len(deletes), 1)
+        self.assertConsistent()
+
+    def test_bulk_delete_by_filter(self):
+        response = self.request('delete', f'pri=&cat={self.food.id}')
+
+        self.assertEqual(response.json(), {'deleted': 3})
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 3)
+        self.assertConsistent()
+
+    def test_bulk_delete_without_selection(self):
+        response = self.request('delete', '')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 6)
+
+    def test_bulk_delete_with_invalid_ids(self):
+        response = self.request('delete', 'ids=1,foo')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('detail', response.json())
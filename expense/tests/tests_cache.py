@@ -0,0 +1,83 @@
+from django.test import TransactionTestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from expense.cache import (
+    cache_stats, get_cache, get_data_version, reset_cache_stats
+)
+from expense.models import Category, DataVersion, Expense
+from expense.views import ExpensesList, SummaryMonthlyExpenses
+
+
+class TestCache(TransactionTestCase):
+    def setUp(self):
+        get_cache().clear()
+        reset_cache_stats()
+        self.User = get_user_model()
+        self.user = self.User.objects.create(
+            email='user@user.com', is_active=True
+        )
+        self.category = Category.objects.create(user=self.user, name='Food')
+        Expense.objects.create(user=self.user, price=10, place='Shop',
+                               category=self.category)
+
+    def get(self, view, url):
+        request = APIRequestFactory().get(url)
+        force_authenticate(request, user=self.user)
+        return view.as_view()(request)
+
+    def get_statistics(self):
+        return self.get(ExpensesList, reverse('expense-expense-list')). \
+            data['statistics']
+
+    def test_statistics_are_cached(self):
+        self.get_statistics()
+        self.assertEqual(cache_stats(), {'hits': 0, 'misses': 1})
+
+        # only the data version and the page are fetched
+        with self.assertNumQueries(2):
+            self.get_statistics()
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_summary_is_cached(self):
+        url = reverse('expense-monthly-summary')
+        self.get(SummaryMonthlyExpenses, url)
+
+        with self.assertNumQueries(1):
+            response = self.get(SummaryMonthlyExpenses, url)
+        self.assertEqual(response.data['month_summary'][0]['sum_of_prices'],
+                         10)
+
+    def test_expense_write_invalidates_cache(self):
+        self.assertEqual(self.get_statistics()['price__sum'], 10)
+
+        Expense.objects.create(user=self.user, price=5, place='Shop')
+
+        self.assertEqual(self.get_statistics()['price__sum'], 15)
+        self.assertEqual(cache_stats(), {'hits': 0, 'misses': 2})
+
+    def test_category_delete_invalidates_cache(self):
+        self.assertEqual(self.get_statistics()['category'], self.category.id)
+
+        self.category.delete()
+
+        self.assertIsNone(self.get_statistics()['category'])
+
+    def test_other_user_write_keeps_cache(self):
+        other = self.User.objects.create(email='other@user.com')
+        self.get_statistics()
+        version = get_data_version(self.user)
+
+        Expense.objects.create(user=other, price=5, place='Shop')
+
+        self.assertEqual(get_data_version(self.user), version)
+        self.get_statistics()
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_user_delete_removes_data_version(self):
+        user_id = self.user.pk
+
+        self.user.delete()
+
+        self.assertFalse(DataVersion.objects.filter(user_id=user_id).exists())
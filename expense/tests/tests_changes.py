@@ -0,0 +1,147 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.urls import reverse
+
+from expense.cache import get_data_version
+from expense.models import Budget, Category, Expense, Priority, Tombstone
+
+
+class TestChanges(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        user = cls.User.objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        cls.user = user
+
+        cls.category = Category.objects.create(user=cls.user, name='Food')
+        cls.priority = Priority.objects.create(user=cls.user, name='High')
+        cls.expense = Expense.objects.create(
+            user=cls.user, price=10, place='Shop', category=cls.category
+        )
+        other = cls.User.objects.create(email='other@user.com')
+        Expense.objects.create(user=other, price=99, place='Other')
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+
+        self.token = response.json()['access_token']
+        self.csrftoken = response.cookies['csrftoken'].value
+
+    def request(self, method, url, data=None):
+        return getattr(self.client, method)(
+            url,
+            data=data,
+            content_type='application/json',
+            **{
+                'HTTP_AUTHORIZATION': 'Bearer ' + self.token,
+                'X-CSRFToken': self.csrftoken
+            }
+        )
+
+    def changes(self, since=None):
+        url = reverse('expense-expense-changes')
+        if since is not None:
+            url += f'?since={since}'
+        return self.request('get', url)
+
+    def test_changes_without_token_return_everything(self):
+        response = self.changes()
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([item['id'] for item in data['expenses']],
+                         [self.expense.id])
+        self.assertEqual(len(data['categories']), 1)
+        self.assertEqual(len(data['priorities']), 1)
+        self.assertEqual(data['deleted'],
+                         {'expenses': [], 'categories': [], 'priorities': []})
+
+    def test_changes_after_token(self):
+        token = self.changes().json()['token']
+        expense = Expense.objects.create(user=self.user, price=5,
+                                         place='Market')
+
+        data = self.changes(token).json()
+
+        self.assertEqual([item['id'] for item in data['expenses']],
+                         [expense.id])
+        self.assertEqual(data['categories'], [])
+        self.assertGreater(data['token'], token)
+        self.assertEqual(self.changes(data['token']).json()['expenses'], [])
+
+    def test_deleted_expense_is_reported(self):
+        token = self.changes().json()['token']
+        pk = self.expense.pk
+
+        self.request('delete', reverse('expense-expense-detail',
+                                       kwargs={'pk': pk}))
+
+        data = self.changes(token).json()
+        self.assertEqual(data['expenses'], [])
+        self.assertEqual(data['deleted']['expenses'], [pk])
+
+    def test_deleted_category_marks_its_expenses(self):
+        token = self.changes().json()['token']
+        pk = self.category.pk
+
+        self.category.delete()
+
+        data = self.changes(token).json()
+        self.assertEqual(data['deleted']['categories'], [pk])
+        self.assertEqual(len(data['expenses']), 1)
+        self.assertIsNone(data['expenses'][0]['category'])
+
+    def test_bulk_changes_are_reported(self):
+        token = self.changes().json()['token']
+
+        self.request('post', reverse('expense-expense-bulk'),
+                     [{'price': 1, 'place': 'A'}, {'price': 2, 'place': 'B'}])
+        data = self.changes(token).json()
+        self.assertEqual(len(data['expenses']), 2)
+
+        token = data['token']
+        self.request('delete', reverse('expense-expense-bulk') +
+                     f'?ids={self.expense.pk}')
+        data = self.changes(token).json()
+        self.assertEqual(data['deleted']['expenses'], [self.expense.pk])
+
+    def test_changes_with_invalid_token(self):
+        response = self.changes('foo')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_user_delete_removes_tombstones(self):
+        self.expense.delete()
+        self.assertTrue(Tombstone.objects.filter(user=self.user).exists())
+
+        user_id = self.user.pk
+        self.user.delete()
+
+        self.assertFalse(Tombstone.objects.filter(user_id=user_id).exists())
+
+    def test_version_is_bumped_in_the_transaction_of_the_save(self):
+        def fail(**kwargs):
+            raise RuntimeError('failed write')
+
+        version = get_data_version(self.user)
+        for model, values in (
+                (Category, {'name': 'Car'}), (Priority, {'name': 'Low'}),
+                (Budget, {'category': self.category, 'amount': 10})):
+            post_save.connect(fail, sender=model)
+            try:
+                with self.assertRaises(RuntimeError):
+                    model.objects.create(user=self.user, **values)
+            finally:
+                post_save.disconnect(fail, sender=model)
+
+            # the bump of a failed write is rolled back with the row
+            self.assertEqual(get_data_version(self.user), version)
+            self.assertFalse(model.objects.filter(**values).exists())
@@ -0,0 +1,243 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from decimal import Decimal
+from datetime import date, timedelta
+from io import StringIO
+from tempfile import NamedTemporaryFile
+
+from expense.budgets import with_spending
+from expense.cache import get_data_version
+from expense.models import (
+    Budget, Category, DailyExpenseSummary, ExchangeRate, Expense
+)
+from expense.rollups import (
+    find_inconsistent_daily_summaries, find_inconsistent_monthly_totals
+)
+from expense.analytics import pivot
+from expense.descriptive import get_descriptive_statistics
+from expense.statistics import get_statistics
+from expense.summary import summarize_periods
+
+
+class TestCurrencyConversion(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create(email='user@user.com')
+        cls.user.set_password('foo')
+        cls.user.is_active = True
+        cls.user.save()
+        cls.category = Category.objects.create(user=cls.user, name='Travel')
+        cls.today = date.today()
+
+        # the EUR rate of a week ago is used until today
+        ExchangeRate.objects.create(currency='EUR', rate=Decimal('4.3'),
+                                    day=cls.today - timedelta(days=7))
+        ExchangeRate.objects.create(currency='USD', rate=Decimal('4'),
+                                    day=cls.today)
+        for price, currency in (('100', 'PLN'), ('10', 'EUR'), ('5', 'USD')):
+            Expense.objects.create(user=cls.user, price=price,
+                                   currency=currency, place='Hotel',
+                                   category=cls.category)
+
+    def statistics(self, currency):
+        filters = {'user': self.user}
+        return get_statistics(Expense.objects.filter(**filters),
+                              DailyExpenseSummary.objects.filter(**filters),
+                              top=1, currency=currency)
+
+    def test_rollups_are_kept_per_currency(self):
+        self.assertEqual(
+            sorted(DailyExpenseSummary.objects.values_list('currency',
+                                                           'price_sum')),
+            [('EUR', Decimal('10.00')), ('PLN', Decimal('100.00')),
+             ('USD', Decimal('5.00'))]
+        )
+        self.assertEqual(find_inconsistent_daily_summaries(), [])
+        self.assertEqual(find_inconsistent_monthly_totals(), [])
+
+    def test_statistics_are_converted_in_the_query(self):
+        # one query for the totals and one for each list of top values,
+        # the same as for expenses in one currency
+        with self.assertNumQueries(7):
+            count, statistics = self.statistics('PLN')
+
+        self.assertEqual(count, 3)
+        self.assertEqual(statistics['price__sum'], Decimal('163.00'))
+        self.assertEqual(
+            statistics['top']['place']['most_expensive'],
+            [{'place': 'Hotel', 'price__sum': Decimal('163.00')}]
+        )
+
+    def test_statistics_in_other_currency(self):
+        count, statistics = self.statistics('EUR')
+
+        # 10 EUR and 120 PLN worth 4.3 PLN per euro
+        self.assertEqual(statistics['price__sum'], Decimal('37.91'))
+
+    def test_unconverted_currency_is_left_out(self):
+        Expense.objects.create(user=self.user, price=1, currency='GBP',
+                               place='Pub')
+
+        count, statistics = self.statistics('PLN')
+
+        self.assertEqual(count, 4)
+        self.assertEqual(statistics['price__sum'], Decimal('163.00'))
+        self.assertEqual(statistics['unconverted'], 1)
+        expenses = Expense.objects.filter(user=self.user)
+        summaries = DailyExpenseSummary.objects.filter(user=self.user)
+        self.assertEqual(
+            pivot(expenses, summaries, ['month'], ['sum'], 'PLN')
+            ['unconverted'], 1
+        )
+        self.assertEqual(
+            summarize_periods(summaries, 'month', 1, self.today, 'PLN')
+            [0]['unconverted'], 1
+        )
+        date_range = (str(self.today), str(self.today))
+        self.assertEqual(
+            get_descriptive_statistics(expenses, date_range, 'PLN')
+            ['unconverted'], 1
+        )
+
+    def test_analytics_are_converted(self):
+        expenses = Expense.objects.filter(user=self.user)
+        summaries = DailyExpenseSummary.objects.filter(user=self.user)
+
+        for rows in (summaries, None):
+            result = pivot(expenses, rows, ['category'], ['sum'], 'PLN')
+            self.assertEqual(result['values']['sum'], [Decimal('163.00')])
+            self.assertEqual(result['unconverted'], 0)
+        result = pivot(expenses, summaries, ['place'],
+                       ['avg', 'min', 'max'], 'PLN')
+        self.assertEqual(
+            [round(result['values'][name][0], 2)
+             for name in ('avg', 'min', 'max')],
+            [Decimal('54.33'), Decimal('20.00'), Decimal('100.00')]
+        )
+
+    def test_descriptive_statistics_are_converted(self):
+        date_range = (str(self.today), str(self.today))
+
+        result = get_descriptive_statistics(
+            Expense.objects.filter(user=self.user), date_range, 'PLN'
+        )
+
+        self.assertEqual(result['count'], 3)
+        self.assertEqual(result['price']['mean'], 54.33)
+        self.assertEqual(result['daily']['spend'], [163.0])
+
+    def test_summary_is_converted(self):
+        summaries = DailyExpenseSummary.objects.filter(user=self.user)
+
+        summary = summarize_periods(summaries, 'month', 1, self.today, 'PLN')
+
+        self.assertEqual(summary[0]['sum_of_prices'], Decimal('163.00'))
+
+    def test_views_use_users_currency(self):
+        client = Client()
+        token = client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        ).json()['access_token']
+        headers = {'HTTP_AUTHORIZATION': 'Bearer ' + token}
+        Budget.objects.create(user=self.user, category=self.category,
+                              amount=200)
+
+        response = client.get(reverse('expense-expense-list'), **headers)
+        self.assertEqual(response.json()['statistics']['price__sum'], 163.0)
+        response = client.get(reverse('expense-monthly-summary'), **headers)
+        self.assertEqual(
+            response.json()['month_summary'][0]['sum_of_prices'], 163.0
+        )
+        response = client.get(reverse('expense-budget-list'), **headers)
+        self.assertEqual(response.json()['budgets'][0]['spent'], '163.00')
+
+        self.user.currency = 'USD'
+        self.user.save()
+        response = client.get(reverse('expense-expense-list'), **headers)
+        self.assertEqual(response.json()['statistics']['price__sum'], 40.75)
+
+
+class TestIntegralConversion(TestCase):
+    """
+    SQLite stores integral prices and rates as integers, which must not be
+    divided as integers
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(email='user@user.com')
+        cls.category = Category.objects.create(user=cls.user, name='Food')
+        cls.today = date.today()
+        ExchangeRate.objects.create(currency='EUR', rate=3, day=cls.today)
+        Expense.objects.create(user=cls.user, price=10, place='Shop',
+                               category=cls.category)
+
+    def test_integral_price_and_rate(self):
+        filters = {'user': self.user}
+        expenses = Expense.objects.filter(**filters)
+        summaries = DailyExpenseSummary.objects.filter(**filters)
+
+        count, statistics = get_statistics(expenses, summaries,
+                                           currency='EUR')
+        self.assertEqual(statistics['price__sum'], Decimal('3.33'))
+        count, statistics = get_statistics(expenses, currency='EUR')
+        self.assertEqual(statistics['price__sum'], Decimal('3.33'))
+        summary = summarize_periods(summaries, 'month', 1, self.today, 'EUR')
+        self.assertEqual(summary[0]['sum_of_prices'], Decimal('3.33'))
+        Budget.objects.create(user=self.user, category=self.category,
+                              amount=100)
+        budget = with_spending(Budget.objects.all(),
+                               self.today.replace(day=1), 'EUR').get()
+        self.assertEqual(budget.spent, Decimal('3.33'))
+
+    def test_integral_mixed_currencies(self):
+        ExchangeRate.objects.create(currency='EUR', rate=4,
+                                    day=self.today - timedelta(days=1))
+        ExchangeRate.objects.filter(day=self.today).update(rate=4)
+        Expense.objects.create(user=self.user, price=10, currency='EUR',
+                               place='Shop')
+
+        count, statistics = get_statistics(
+            Expense.objects.filter(user=self.user), currency='EUR'
+        )
+
+        self.assertEqual(statistics['price__sum'], Decimal('12.50'))
+
+
+class TestLoadExchangeRates(TestCase):
+    def test_load_from_file_and_arguments(self):
+        user = get_user_model().objects.create(email='user@user.com')
+        Expense.objects.create(user=user, price=1, place='Shop')
+        version = get_data_version(user)
+        ExchangeRate.objects.create(currency='EUR', day=date(2026, 1, 2),
+                                    rate=1)
+        with NamedTemporaryFile('w', suffix='.csv') as rates:
+            rates.write('day,currency,rate\n2026-01-02,EUR,4.25\n'
+                        '2026-01-02,USD,3.9\n')
+            rates.flush()
+
+            call_command('load_exchange_rates', rates.name,
+                         '--rate', '2026-01-05', 'EUR', '4.3',
+                         stdout=StringIO())
+
+        self.assertEqual(
+            list(ExchangeRate.objects.order_by('currency', 'day').
+                 values_list('currency', 'day', 'rate')),
+            [('EUR', date(2026, 1, 2), Decimal('4.25')),
+             ('EUR', date(2026, 1, 5), Decimal('4.3')),
+             ('USD', date(2026, 1, 2), Decimal('3.9'))]
+        )
+        self.assertGreater(get_data_version(user), version)
+
+    def test_invalid_rates(self):
+        for rate in (('2026-01-02', 'eur', '4'), ('2026-13-02', 'EUR', '4'),
+                     ('2026-01-02', 'EUR', '-1'),
+                     ('2026-01-02', 'EUR', 'x')):
+            with self.assertRaises(CommandError, msg=rate):
+                call_command('load_exchange_rates', '--rate', *rate,
+                             stdout=StringIO())
+        self.assertFalse(ExchangeRate.objects.exists())
@@ -0,0 +1,121 @@
+from django.test import Client, SimpleTestCase, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from datetime import date
+
+from expense.dates import DateRange, get_date_range, parse_date_range
+from expense.models import Expense
+
+
+class TestDateRange(SimpleTestCase):
+    today = date(2026, 2, 14)
+
+    def date_range(self, **params):
+        return get_date_range(params, today=self.today)
+
+    def test_default_is_current_month(self):
+        self.assertEqual(self.date_range(),
+                         DateRange(date(2026, 2, 1), date(2026, 2, 28)))
+
+    def test_from_and_to(self):
+        self.assertEqual(
+            self.date_range(**{'from': '2026-01-01', 'to': '2026-03-31'}),
+            DateRange(date(2026, 1, 1), date(2026, 3, 31))
+        )
+        self.assertEqual(
+            self.date_range(**{'from': '2025-11', 'to': '2026-01'}),
+            DateRange(date(2025, 11, 1), date(2026, 1, 31))
+        )
+        self.assertEqual(self.date_range(to='2026-02-10'),
+                         DateRange(date(2026, 2, 1), date(2026, 2, 10)))
+
+    def test_relative_ranges(self):
+        expected = {
+            'today': (date(2026, 2, 14), date(2026, 2, 14)),
+            'this_month': (date(2026, 2, 1), date(2026, 2, 28)),
+            'last_month': (date(2026, 1, 1), date(2026, 1, 31)),
+            'this_year': (date(2026, 1, 1), date(2026, 12, 31)),
+            'ytd': (date(2026, 1, 1), date(2026, 2, 14)),
+            'last_30d': (date(2026, 1, 16), date(2026, 2, 14)),
+            'last_n_months:6': (date(2025, 9, 1), date(2026, 2, 28)),
+        }
+        for value, (start, end) in expected.items():
+            self.assertEqual(self.date_range(range=value),
+                             DateRange(start, end), value)
+
+    def test_invalid_ranges(self):
+        for params in ({'from': '2026-13-01'}, {'from': 'yesterday'},
+                       {'from': '2026-03-01', 'to': '2026-02-01'},
+                       {'range': 'forever'}, {'range': 'last_0d'},
+                       {'range': 'ytd', 'from': '2026-01-01'},
+                       {'range': 'ytd', 'fyear': '2026'},
+                       {'fmonth': 'x'}, {'fmonth': '0'}, {'tday': '32'}):
+            with self.assertRaises(ValidationError, msg=params):
+                self.date_range(**params)
+
+    def test_legacy_params(self):
+        self.assertEqual(
+            self.date_range(fyear='2025', fmonth='12', fday='5', tmonth='1'),
+            DateRange(date(2025, 12, 5), date(2026, 1, 31))
+        )
+
+    def test_legacy_end_day_is_clamped_to_its_month(self):
+        self.assertEqual(
+            self.date_range(fmonth='1', tmonth='2'),
+            DateRange(date(2026, 1, 1), date(2026, 2, 28))
+        )
+        self.assertEqual(
+            self.date_range(fmonth='2', tmonth='3', tday='31'),
+            DateRange(date(2026, 2, 1), date(2026, 3, 31))
+        )
+
+    def test_parsed_once_per_input(self):
+        parse_date_range.cache_clear()
+        for _ in range(3):
+            self.date_range(range='ytd')
+
+        self.assertEqual(parse_date_range.cache_info().hits, 2)
+
+
+class TestDateRangeViews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        for day in (date(2025, 12, 31), date(2026, 1, 15), date(2026, 3, 1)):
+            Expense.objects.create(user=user, price=10, place='Shop',
+                                   day=day)
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Bearer ' + response.json()['access_token']
+        }
+
+    def test_expenses_list_accepts_from_and_to(self):
+        response = self.client.get(
+            reverse('expense-expense-list'),
+            {'from': '2026-01-01', 'to': '2026-03-31'}, **self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['date_range'],
+                         ['2026-01-01', '2026-03-31'])
+        self.assertEqual([expense['day'] for expense in
+                          response.json()['results']],
+                         ['2026-03-01', '2026-01-15'])
+
+    def test_bulk_delete_selects_by_range(self):
+        response = self.client.delete(
+            reverse('expense-expense-bulk') + '?from=2025-12&to=2025-12',
+            **self.headers
+        )
+
+        self.assertEqual(response.json(), {'deleted': 1})
@@ -0,0 +1,118 @@
+from datetime import date, timedelta
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+import statistics
+
+from expense.descriptive import (
+    MAX_DAYS, get_descriptive_statistics, load_columns
+)
+from expense.models import Category, Expense
+from expense.views import ExpenseStatistics
+
+
+class TestDescriptiveStatistics(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com',
+                                           is_active=True)
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+
+        cls.prices = [10, 20, 30, 40, 100, 5.5]
+        for day, price, category in zip(
+                (1, 1, 2, 5, 9, 9), cls.prices,
+                (cls.food, cls.food, None, cls.food, None, None)):
+            expense = Expense.objects.create(user=cls.user, price=price,
+                                             place='Shop', category=category)
+            expense.day = date(2026, 9, day)
+            expense.save()
+
+    def describe(self, expenses=None):
+        if expenses is None:
+            expenses = Expense.objects.filter(user=self.user)
+        return get_descriptive_statistics(expenses,
+                                          ['2026-09-01', '2026-09-10'])
+
+    def test_price_percentiles(self):
+        result = self.describe()
+
+        self.assertEqual(result['count'], 6)
+        self.assertEqual(result['price'], {
+            'mean': round(statistics.mean(self.prices), 2),
+            'std': round(statistics.pstdev(self.prices), 2),
+            'median': 25.0,
+            'p90': 70.0,
+        })
+
+    def test_moving_averages_of_daily_spend(self):
+        daily = self.describe()['daily']
+
+        self.assertEqual(daily['days'][0], '2026-09-01')
+        self.assertEqual(len(daily['days']), 10)
+        self.assertEqual(daily['spend'],
+                         [30, 30, 0, 0, 40, 0, 0, 0, 105.5, 0])
+        self.assertEqual(daily['ma7'][:2], [30, 30])
+        self.assertEqual(daily['ma7'][8], round((40 + 105.5) / 7, 2))
+        self.assertEqual(daily['ma30'][9], 20.55)
+
+    def test_deviation_per_category(self):
+        categories = self.describe()['categories']
+
+        self.assertEqual(categories, [
+            {'category': None, 'count': 3,
+             'mean': round(statistics.mean([30, 100, 5.5]), 2),
+             'std': round(statistics.pstdev([30, 100, 5.5]), 2)},
+            {'category': self.food.id, 'count': 3, 'mean': 23.33,
+             'std': round(statistics.pstdev([10, 20, 40]), 2)},
+        ])
+
+    def test_columns_are_loaded_with_one_query(self):
+        with self.assertNumQueries(1):
+            days, prices, categories = load_columns(Expense.objects.all())
+
+        self.assertEqual(len(days), 6)
+        self.assertEqual(prices.sum(), sum(self.prices))
+        self.assertEqual(sorted(set(categories)), [0, self.food.id])
+
+    def test_no_expenses(self):
+        result = self.describe(Expense.objects.none())
+
+        self.assertEqual(result['count'], 0)
+        self.assertIsNone(result['price']['median'])
+        self.assertEqual(result['daily']['ma30'], [0.0] * 10)
+        self.assertEqual(result['categories'], [])
+
+    def test_statistics_endpoint(self):
+        request = APIRequestFactory().get(
+            reverse('expense-expense-statistics') +
+            f'?fyear=2026&fmonth=9&tyear=2026&tmonth=9&cat={self.food.id}'
+        )
+        force_authenticate(request, user=self.user)
+        response = ExpenseStatistics.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['date_range'],
+                         ['2026-09-01', '2026-09-30'])
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['price']['median'], 20.0)
+        self.assertEqual(len(response.data['daily']['ma7']), 30)
+
+    def test_date_range_is_limited(self):
+        start = date(2020, 1, 1)
+        last = start + timedelta(days=MAX_DAYS - 1)
+        for query, status in (
+                ('?from=0001-01-01&to=9999-12-31', 400),
+                (f'?from={start}&to={last + timedelta(days=1)}', 400),
+                (f'?from={start}&to={last}', 200)):
+            request = APIRequestFactory().get(
+                reverse('expense-expense-statistics') + query
+            )
+            force_authenticate(request, user=self.user)
+            response = ExpenseStatistics.as_view()(request)
+
+            self.assertEqual(response.status_code, status, msg=query)
+            if status == 200:
+                self.assertEqual(len(response.data['daily']['ma7']),
+                                 MAX_DAYS)
@@ -0,0 +1,167 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from datetime import date
+
+from expense.bulk import create_expenses, update_expenses
+from expense.cache import get_data_version
+from expense.duplicates import find_duplicate_clusters, fingerprint
+from expense.models import Expense
+
+
+class TestFingerprint(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create(email='user@user.com')
+        cls.other = User.objects.create(email='other@user.com')
+
+    def test_place_is_normalized(self):
+        day = date(2026, 1, 3)
+        self.assertEqual(fingerprint(1, day, '12.5', 'PLN', ' Corner  Shop'),
+                         fingerprint(1, day, 12.50, 'PLN', 'corner shop'))
+        for other in ((2, day, '12.5', 'PLN', 'Corner Shop'),
+                      (1, date(2026, 1, 4), '12.5', 'PLN', 'Corner Shop'),
+                      (1, day, '12.51', 'PLN', 'Corner Shop'),
+                      (1, day, '12.5', 'EUR', 'Corner Shop'),
+                      (1, day, '12.5', 'PLN', 'Corner Shops')):
+            self.assertNotEqual(fingerprint(*other),
+                                fingerprint(1, day, '12.5', 'PLN',
+                                            'Corner Shop'))
+
+    def test_fingerprint_is_kept_on_every_write(self):
+        expense = Expense.objects.create(user=self.user, price=10,
+                                         place='Shop')
+        create_expenses([Expense(user=self.user, price=10, place='shop ')])
+        created = Expense.objects.latest('pk')
+        self.assertEqual(created.fingerprint,
+                         Expense.objects.get(pk=expense.pk).fingerprint)
+
+        update_expenses(Expense.objects.filter(pk=created.pk),
+                        {'price': 11})
+        created.refresh_from_db()
+        self.assertEqual(created.fingerprint, created.get_fingerprint())
+        self.assertNotEqual(created.fingerprint,
+                            Expense.objects.get(pk=expense.pk).fingerprint)
+
+        expense.price = 11
+        expense.save()
+        self.assertEqual(
+            Expense.objects.get(pk=expense.pk).fingerprint,
+            created.fingerprint
+        )
+
+    def test_clusters_are_grouped_on_the_index(self):
+        create_expenses([
+            Expense(user=self.user, day=date(2026, 1, day), price=5,
+                    place=place)
+            for day, place in ((3, 'Bakery'), (3, 'bakery'), (3, 'Kiosk'),
+                               (4, 'Kiosk'), (5, 'Bar'), (5, 'Bar'),
+                               (5, 'Bar'))
+        ])
+        Expense.objects.create(user=self.other, day=date(2026, 1, 3),
+                               price=5, place='Bakery')
+        expenses = Expense.objects.filter(user=self.user)
+
+        clusters = find_duplicate_clusters(expenses, 10)
+
+        self.assertEqual([(cluster['count'], cluster['last_day'])
+                          for cluster in clusters],
+                         [(3, date(2026, 1, 5)), (2, date(2026, 1, 3))])
+        query = expenses.order_by().values('fingerprint').query
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query}')
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('expense_user_fingerprint_idx', plan)
+
+
+class TestDuplicateViews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create(email='user@user.com')
+        cls.user.set_password('foo')
+        cls.user.is_active = True
+        cls.user.save()
+        cls.expense = Expense.objects.create(user=cls.user, price=10,
+                                             place='Shop')
+
+    def setUp(self):
+        self.client = Client()
+        token = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        ).json()['access_token']
+        self.headers = {'HTTP_AUTHORIZATION': 'Bearer ' + token}
+
+    def test_reject_duplicates_on_create(self):
+        url = reverse('expense-expense-list')
+        data = {'price': '10.00', 'place': 'shop'}
+
+        response = self.client.post(url + '?reject_duplicates=true', data,
+                                    **self.headers)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['duplicate'], self.expense.pk)
+
+        response = self.client.post(url, data, **self.headers)
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(url + '?reject_duplicates=maybe', data,
+                                    **self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_duplicates_are_looked_up_under_the_lock(self):
+        version = get_data_version(self.user)
+        for url, data in (
+                (reverse('expense-expense-list'),
+                 {'price': '10.00', 'place': 'shop'}),
+                (reverse('expense-expense-bulk'),
+                 [{'price': '10.00', 'place': 'shop'}])):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(url + '?reject_duplicates=1', data,
+                                 content_type='application/json',
+                                 **self.headers)
+            sql = [query['sql'] for query in queries.captured_queries]
+            lock = next(index for index, query in enumerate(sql)
+                        if query.startswith('UPDATE "expense_dataversion"'))
+            lookup = next(index for index, query in enumerate(sql)
+                          if '"fingerprint" IN' in query)
+            self.assertLess(lock, lookup, msg=url)
+
+        # the rejected single create is rolled back with its version bump
+        self.assertEqual(get_data_version(self.user), version + 1)
+
+    def test_reject_duplicates_on_bulk_create(self):
+        response = self.client.post(
+            reverse('expense-expense-bulk') + '?reject_duplicates=1',
+            [{'price': '10', 'place': 'Shop'},
+             {'price': '3', 'place': 'Kiosk'},
+             {'price': '3', 'place': 'Kiosk'}],
+            content_type='application/json', **self.headers
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['status'] for result in response.json()],
+                         [409, 201, 409])
+        self.assertEqual(response.json()[0]['errors']['duplicate'],
+                         self.expense.pk)
+        self.assertEqual(Expense.objects.count(), 2)
+
+    def test_list_duplicates(self):
+        duplicate = Expense.objects.create(user=self.user, price=10,
+                                           place='SHOP')
+        Expense.objects.create(user=self.user, price=1, place='Shop')
+
+        response = self.client.get(
+            reverse('expense-expense-duplicates') + '?fields=id,place',
+            **self.headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        clusters = response.json()['clusters']
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['count'], 2)
+        self.assertEqual(clusters[0]['expenses'],
+                         [{'id': duplicate.pk, 'place': 'SHOP'},
+                          {'id': self.expense.pk, 'place': 'Shop'}])
@@ -0,0 +1,97 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from expense.models import Category, Expense, Priority
+from expense.views import (
+    CategoryDetail, CategoryList, ExpenseDetail, ExpensesList, PriorityDetail,
+    PriorityList, SummaryMonthlyExpenses
+)
+
+
+class TestConditionalGet(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com',
+                                           is_active=True)
+        cls.category = Category.objects.create(user=cls.user, name='Food')
+        cls.priority = Priority.objects.create(user=cls.user, name='High')
+        cls.expense = Expense.objects.create(user=cls.user, price=10,
+                                             place='Shop',
+                                             category=cls.category)
+
+    def get(self, view, url, etag=None, user=None, **kwargs):
+        headers = {}
+        if etag is not None:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+        request = APIRequestFactory().get(url, **headers)
+        force_authenticate(request, user=user or self.user)
+        return view.as_view()(request, **kwargs)
+
+    def views(self):
+        return [
+            (ExpensesList, reverse('expense-expense-list'), {}),
+            (CategoryList, reverse('expense-category-list'), {}),
+            (PriorityList, reverse('expense-priority-list'), {}),
+            (SummaryMonthlyExpenses, reverse('expense-monthly-summary'), {}),
+            (CategoryDetail, reverse('expense-category-detail',
+                                     kwargs={'pk': self.category.pk}),
+             {'pk': self.category.pk}),
+            (PriorityDetail, reverse('expense-priority-detail',
+                                     kwargs={'pk': self.priority.pk}),
+             {'pk': self.priority.pk}),
+        ]
+
+    def test_not_modified_without_building_querysets(self):
+        for view, url, kwargs in self.views():
+            with self.subTest(url=url):
+                etag = self.get(view, url, **kwargs)['ETag']
+                self.assertFalse(etag.startswith('W/'))
+
+                # only the data version is read
+                with self.assertNumQueries(1):
+                    response = self.get(view, url, etag, **kwargs)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+
+    def test_write_changes_etag(self):
+        url = reverse('expense-expense-list')
+        etag = self.get(ExpensesList, url)['ETag']
+
+        Expense.objects.create(user=self.user, price=5, place='Shop')
+
+        response = self.get(ExpensesList, url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_query(self):
+        url = reverse('expense-expense-list')
+        etag = self.get(ExpensesList, url)['ETag']
+
+        response = self.get(ExpensesList, url + '?page=2', etag)
+
+        self.assertNotEqual(response.status_code, 304)
+
+    def test_etag_depends_on_user(self):
+        url = reverse('expense-category-list')
+        etag = self.get(CategoryList, url)['ETag']
+        other = self.User.objects.create(email='other@user.com')
+
+        response = self.get(CategoryList, url, etag, user=other)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [])
+
+    def test_objects_of_other_users_are_not_found(self):
+        other = self.User.objects.create(email='other@user.com')
+        for view, name, pk in (
+                (CategoryDetail, 'expense-category-detail', self.category.pk),
+                (PriorityDetail, 'expense-priority-detail', self.priority.pk),
+                (ExpenseDetail, 'expense-expense-detail', self.expense.pk)):
+            url = reverse(name, kwargs={'pk': pk})
+
+            response = self.get(view, url, user=other, pk=pk)
+
+            self.assertEqual(response.status_code, 404, msg=name)
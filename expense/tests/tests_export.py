@@ -0,0 +1,91 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from urllib.parse import urlencode
+import csv
+import io
+import json
+
+from expense.models import Expense, Category
+
+
+class TestExport(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        user = cls.User.objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        cls.user = user
+
+        cls.category = Category.objects.create(user=cls.user, name='Food')
+        for i in range(3):
+            Expense.objects.create(
+                user=cls.user, price=10 + i, place='Shop' + str(i),
+                category=cls.category if i else None
+            )
+
+        other = cls.User.objects.create(email='other@user.com')
+        Expense.objects.create(user=other, price=99, place='Other')
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+
+        self.token = response.json()['access_token']
+
+    def export(self, **params):
+        return self.client.get(
+            reverse('expense-expense-export') + '?' + urlencode(params),
+            **{'HTTP_AUTHORIZATION': 'Bearer ' + self.token}
+        )
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_csv(self):
+        response = self.export()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        self.assertEqual(
+            rows[0], ['id', 'day', 'price', 'place', 'category', 'priority',
+                      'currency']
+        )
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][2:4], ['12.00', 'Shop2'])
+
+    def test_export_ndjson(self):
+        response = self.export(type='ndjson')
+
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[-1]['price'], '10.00')
+        self.assertIsNone(rows[-1]['category'])
+
+    def test_export_ndjson_matches_expenses_list(self):
+        response = self.export(type='ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+
+        response = self.client.get(
+            reverse('expense-expense-list'),
+            **{'HTTP_AUTHORIZATION': 'Bearer ' + self.token}
+        )
+        self.assertEqual(rows, response.json()['results'])
+
+    def test_export_with_query_param_cat(self):
+        response = self.export(type='ndjson', cat=self.category.id)
+
+        self.assertEqual(len(self.read(response).splitlines()), 2)
+
+    def test_export_unsupported_type(self):
+        response = self.export(type='xml')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('detail', response.json())
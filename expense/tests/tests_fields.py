@@ -0,0 +1,87 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from expense.models import Category, Expense, Priority
+from expense.views import ExpenseDetail, ExpensesList
+
+
+class TestSparseFields(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com',
+                                           is_active=True)
+        cls.category = Category.objects.create(user=cls.user, name='Food')
+        cls.priority = Priority.objects.create(user=cls.user, name='High')
+        cls.expenses = [
+            Expense.objects.create(user=cls.user, price=10 + i,
+                                   place=f'Shop{i}', category=cls.category,
+                                   priority=cls.priority)
+            for i in range(4)
+        ]
+
+    def get(self, view, url, **kwargs):
+        request = APIRequestFactory().get(url)
+        force_authenticate(request, user=self.user)
+        return view.as_view()(request, **kwargs)
+
+    def get_list(self, query):
+        return self.get(ExpensesList,
+                        reverse('expense-expense-list') + '?' + query)
+
+    def test_fields_trim_results(self):
+        response = self.get_list('fields=id,day,price')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data['results'][0]),
+                         ['id', 'day', 'price'])
+
+    def test_expand_inlines_category_and_priority(self):
+        response = self.get_list('expand=category,priority')
+
+        result = response.data['results'][0]
+        self.assertEqual(result['category'],
+                         {'id': self.category.id, 'name': 'Food'})
+        self.assertEqual(result['priority'],
+                         {'id': self.priority.id, 'name': 'High'})
+
+    def test_expand_adds_no_queries(self):
+        url = reverse('expense-expense-list')
+        self.get(ExpensesList, url)
+
+        # the data version, the statistics and one page query
+        with self.assertNumQueries(3):
+            self.get(ExpensesList, url + '?expand=category,priority')
+
+    def test_only_selected_columns_are_loaded(self):
+        with self.assertNumQueries(3):
+            response = self.get_list('fields=id,price&cursor=')
+        self.assertEqual(list(response.data['results'][0]), ['id', 'price'])
+
+    def test_expand_of_not_selected_field_is_ignored(self):
+        response = self.get_list('fields=id&expand=category')
+
+        self.assertEqual(list(response.data['results'][0]), ['id'])
+
+    def test_unknown_field(self):
+        for query in ('fields=id,user', 'expand=place'):
+            with self.subTest(query=query):
+                response = self.get_list(query)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.data)
+
+    def test_detail_with_fields_and_expand(self):
+        pk = self.expenses[0].pk
+        url = reverse('expense-expense-detail', kwargs={'pk': pk})
+
+        request = APIRequestFactory().get(url + '?fields=place,category'
+                                                '&expand=category')
+        force_authenticate(request, user=self.user)
+        response = ExpenseDetail.as_view()(request, pk=pk)
+
+        self.assertEqual(response.data, {
+            'place': 'Shop0',
+            'category': {'id': self.category.id, 'name': 'Food'},
+        })
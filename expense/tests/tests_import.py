@@ -0,0 +1,151 @@
+import json
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from decimal import Decimal
+from datetime import date
+from io import StringIO
+from tempfile import NamedTemporaryFile
+
+from expense.imports import ExpenseImport, InvalidImport
+from expense.models import Category, Expense, Priority
+from expense.rollups import (
+    find_inconsistent_daily_summaries, find_inconsistent_monthly_totals
+)
+
+STATEMENT = ('Date;Amount;Description;Type\n'
+             '03.01.2026;12,50;Bakery;Food\n'
+             '04.01.2026;1.200,00;Rent;Home\n'
+             '05.01.2026;x;Broken;Food\n'
+             '06.01.2026;7,00;Kiosk;\n')
+MAPPING = {'day': 'Date', 'price': 'Amount', 'place': 'Description',
+           'category': 'Type'}
+
+
+class TestExpenseImport(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create(email='user@user.com')
+        cls.user.set_password('foo')
+        cls.user.is_active = True
+        cls.user.save()
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+
+    def run_import(self, lines, **options):
+        options = {'mapping': MAPPING, 'date_format': '%d.%m.%Y',
+                   'delimiter': ';', 'decimal_separator': ',', **options}
+        return list(ExpenseImport(self.user, **options).
+                    run(StringIO(lines)))
+
+    def test_import_in_chunks(self):
+        progress = self.run_import(STATEMENT, chunk_size=2)
+
+        self.assertEqual(progress[0], {'rows': 2, 'created': 2, 'errors': 0})
+        self.assertEqual(progress[1]['rows'], 4)
+        self.assertEqual(progress[1]['created'], 3)
+        self.assertEqual([error['line'] for error in progress[1]['errors']],
+                         [4])
+        home = Category.objects.get(user=self.user, name='Home')
+        self.assertEqual(
+            list(Expense.objects.order_by('day').
+                 values_list('day', 'price', 'place', 'category', 'currency')),
+            [(date(2026, 1, 3), Decimal('12.50'), 'Bakery', self.food.pk,
+              'PLN'),
+             (date(2026, 1, 4), Decimal('1200.00'), 'Rent', home.pk, 'PLN'),
+             (date(2026, 1, 6), Decimal('7.00'), 'Kiosk', None, 'PLN')]
+        )
+        self.assertEqual(find_inconsistent_daily_summaries(), [])
+        self.assertEqual(find_inconsistent_monthly_totals(), [])
+
+    def test_names_are_resolved_once(self):
+        lines = 'day,price,place,category,priority\n' + \
+            '2026-01-03,1,Shop,Food,High\n' * 5
+
+        progress = self.run_import(lines, mapping=None, date_format='%Y-%m-%d',
+                                   delimiter=',', decimal_separator='.')
+
+        self.assertEqual(progress[-1]['created'], 5)
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 1)
+        priority = Priority.objects.get(user=self.user)
+        self.assertEqual(priority.name, 'High')
+        self.assertEqual(
+            Expense.objects.filter(priority=priority).count(), 5
+        )
+
+    def test_invalid_mapping(self):
+        for mapping in ({'day': 'Date', 'price': 'Amount'},
+                        {**MAPPING, 'user': 'Owner'},
+                        {**MAPPING, 'priority': 'Priority'}):
+            with self.assertRaises(InvalidImport, msg=mapping):
+                self.run_import(STATEMENT, mapping=mapping)
+
+    def test_unfinished_import_is_rolled_back(self):
+        progress = ExpenseImport(self.user, chunk_size=1).run(StringIO(
+            'day,price,place\n' + '2026-01-03,1,Shop\n' * 3
+        ))
+        next(progress)
+        progress.close()
+
+        self.assertFalse(Expense.objects.exists())
+
+    def test_import_endpoint(self):
+        client = Client()
+        token = client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        ).json()['access_token']
+        headers = {'HTTP_AUTHORIZATION': 'Bearer ' + token}
+        upload = SimpleUploadedFile('statement.csv',
+                                    STATEMENT.encode('cp1250'))
+
+        response = client.post(
+            reverse('expense-expense-import'),
+            {'file': upload, 'mapping': json.dumps(MAPPING),
+             'date_format': '%d.%m.%Y', 'delimiter': ';',
+             'decimal_separator': ',', 'encoding': 'cp1250',
+             'currency': 'EUR'},
+            **headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        result = json.loads(lines[-1])
+        self.assertEqual((result['rows'], result['created']), (4, 3))
+        self.assertEqual(set(Expense.objects.values_list('currency',
+                                                         flat=True)),
+                         {'EUR'})
+
+        for data in ({}, {'file': upload, 'mapping': '["day"]'},
+                     {'file': upload, 'encoding': 'klingon'},
+                     {'file': upload, 'currency': 'euro'}):
+            response = client.post(reverse('expense-expense-import'), data,
+                                   **headers)
+            self.assertEqual(response.status_code, 400, msg=data)
+
+    def test_import_command(self):
+        with NamedTemporaryFile('w', suffix='.csv') as statement:
+            statement.write(STATEMENT)
+            statement.flush()
+            stdout = StringIO()
+            stderr = StringIO()
+
+            call_command('import_expenses', statement.name,
+                         '--user', 'user@user.com', '--map', 'day=Date',
+                         '--map', 'price=Amount', '--map', 'place=Description',
+                         '--date-format', '%d.%m.%Y', '--delimiter', ';',
+                         '--decimal-separator', ',', '--chunk-size', '2',
+                         stdout=stdout, stderr=stderr)
+
+            self.assertIn('2 rows read, 2 expenses created',
+                          stdout.getvalue())
+            self.assertIn('3 expenses created of 4 rows', stdout.getvalue())
+            self.assertIn('Line 4:', stderr.getvalue())
+
+            with self.assertRaises(CommandError):
+                call_command('import_expenses', statement.name,
+                             '--user', 'user@user.com', stdout=StringIO())
+        self.assertEqual(Expense.objects.count(), 3)
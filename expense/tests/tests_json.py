@@ -0,0 +1,122 @@
+from datetime import date, datetime
+from decimal import Decimal
+from io import BytesIO
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from expense.models import Expense
+from expense.parsers import UJSONParser
+from expense.renderers import UJSONRenderer
+
+
+class TestUJSONRenderer(TestCase):
+    def assertSameOutput(self, data, accepted_media_type=None):
+        self.assertEqual(
+            UJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type)
+        )
+
+    def test_output_matches_json_renderer(self):
+        data = ReturnDict([
+            ('price', Decimal('10.50')),
+            ('day', date(2026, 10, 18)),
+            ('time', datetime(2026, 10, 18, 12, 30)),
+            ('results', ReturnList([{'place': 'Żabka / 1', 'id': 1}],
+                                   serializer=None)),
+            ('separators', '\u2028\u2029'),
+            ('sum', 60.0),
+            ('empty', None),
+        ], serializer=None)
+
+        self.assertSameOutput(data)
+
+    def test_indent_and_big_numbers(self):
+        self.assertSameOutput({'a': [1, 2]}, 'application/json; indent=4')
+        self.assertSameOutput({'a': 2 ** 70})
+
+    def test_none_renders_nothing(self):
+        self.assertEqual(UJSONRenderer().render(None), b'')
+
+
+class TestUJSONParser(TestCase):
+    def parse(self, content):
+        return UJSONParser().parse(BytesIO(content))
+
+    def test_parse_matches_json_parser(self):
+        content = '{"price": 10.5, "place": "Żabka", "list": [1, null]}'. \
+            encode()
+
+        self.assertEqual(self.parse(content),
+                         JSONParser().parse(BytesIO(content)))
+
+    def test_invalid_json(self):
+        for content in (b'{"a": 1,}', b'[NaN]', b'{"a": [Infinity]}'):
+            with self.subTest(content=content):
+                with self.assertRaises(ParseError):
+                    self.parse(content)
+
+
+class TestContentNegotiation(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        user = cls.User.objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        cls.user = user
+        Expense.objects.create(user=cls.user, price=10, place='Shop')
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+
+        self.token = response.json()['access_token']
+        self.csrftoken = response.cookies['csrftoken'].value
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Bearer ' + self.token,
+            'X-CSRFToken': self.csrftoken
+        }
+
+    def test_json_is_rendered_by_ujson(self):
+        response = self.client.get(reverse('expense-expense-list'),
+                                   HTTP_ACCEPT='application/json',
+                                   **self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIsInstance(response.accepted_renderer, UJSONRenderer)
+        self.assertEqual(response.json()['results'][0]['price'], '10.00')
+
+    def test_unsupported_media_type_is_not_acceptable(self):
+        response = self.client.get(reverse('expense-expense-list'),
+                                   HTTP_ACCEPT='text/html', **self.headers)
+
+        self.assertEqual(response.status_code, 406)
+
+    def test_json_body_is_parsed_by_ujson(self):
+        response = self.client.post(
+            reverse('expense-expense-list'),
+            data='{"price": "5.25", "place": "Market"}',
+            content_type='application/json', **self.headers
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['price'], '5.25')
+
+    def test_invalid_json_body(self):
+        response = self.client.post(
+            reverse('expense-expense-list'), data='{"price": ',
+            content_type='application/json', **self.headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
@@ -0,0 +1,79 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from urllib.parse import urlencode
+from datetime import date, timedelta
+
+from expense.models import Expense
+
+
+class TestKeysetPagination(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        user = cls.User.objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        cls.user = user
+
+        # two expenses a day to check ties on the day are paginated by id
+        for i in range(7):
+            expense = Expense.objects.create(
+                user=cls.user, price=10 + i, place='Shop' + str(i)
+            )
+            expense.day = date.today().replace(day=1) + timedelta(days=i // 2)
+            expense.save()
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+
+        self.token = response.json()['access_token']
+
+    def get(self, url):
+        return self.client.get(
+            url, **{'HTTP_AUTHORIZATION': 'Bearer ' + self.token}
+        )
+
+    def test_get_expenses_with_cursor_walks_all_pages(self):
+        params = urlencode({'cursor': '', 'limit': 2})
+        url = reverse('expense-expense-list') + '?' + params
+        ids = []
+        while url:
+            response = self.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.json())
+            self.assertIn('statistics', response.json())
+            ids.extend(item['id'] for item in response.json()['results'])
+            url = response.json()['next']
+
+        expected = Expense.objects.order_by('-day', '-id'). \
+            values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+
+    def test_get_expenses_with_cursor_last_page_has_no_next(self):
+        params = urlencode({'cursor': '', 'limit': 7})
+        response = self.get(reverse('expense-expense-list') + '?' + params)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 7)
+        self.assertIsNone(response.json()['next'])
+
+    def test_get_expenses_with_invalid_cursor(self):
+        params = urlencode({'cursor': 'foo'})
+        response = self.get(reverse('expense-expense-list') + '?' + params)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', response.json())
+
+    def test_get_expenses_without_cursor_uses_page_numbers(self):
+        params = urlencode({'limit': 2, 'page': 2})
+        response = self.get(reverse('expense-expense-list') + '?' + params)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 7)
+        self.assertEqual(len(response.json()['results']), 2)
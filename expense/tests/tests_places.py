@@ -0,0 +1,145 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from expense.bulk import create_expenses, delete_expenses, update_expenses
+from expense.models import Expense
+from expense.places import PlaceIndex, PlaceIndexes, place_indexes
+
+
+class TestPlaceIndex(TestCase):
+    def test_suggest_by_prefix_and_frequency(self):
+        index = PlaceIndex(1, {'Lidl': 3, 'LIDL Warszawa': 5, 'Lewiatan': 1,
+                               'Biedronka': 9, 'Lidka': 3})
+
+        self.assertEqual(index.suggest('li', 10),
+                         [(-5, 'LIDL Warszawa'), (-3, 'Lidka'), (-3, 'Lidl')])
+        self.assertEqual(index.suggest('L', 1), [(-5, 'LIDL Warszawa')])
+        self.assertEqual(index.suggest('', 2),
+                         [(-9, 'Biedronka'), (-5, 'LIDL Warszawa')])
+        self.assertEqual(index.suggest('x', 10), [])
+
+    def test_apply_changes(self):
+        index = PlaceIndex(1, {'Lidl': 1, 'Aldi': 2})
+
+        index.apply({'Lidl': -1, 'Lewiatan': 1, 'Aldi': 1})
+
+        self.assertEqual(index.counts, {'Aldi': 3, 'Lewiatan': 1})
+        self.assertEqual(index.suggest('l', 10), [(-1, 'Lewiatan')])
+        self.assertEqual(index.size, PlaceIndex(1, index.counts).size)
+
+    def test_least_recently_used_index_is_evicted(self):
+        first = PlaceIndex(1, {'Lidl': 1})
+        indexes = PlaceIndexes(memory=first.size * 2 + 10)
+        indexes.set(1, first)
+        indexes.set(2, PlaceIndex(1, {'Aldi': 1}))
+        indexes.suggest(1, 1, '', 10)
+
+        indexes.set(3, PlaceIndex(1, {'Netto': 1}))
+
+        self.assertEqual(list(indexes.indexes), [1, 3])
+        self.assertLessEqual(indexes.size, indexes.memory)
+
+    def test_update_of_other_version_forgets_index(self):
+        indexes = PlaceIndexes()
+        indexes.set(1, PlaceIndex(5, {'Lidl': 1}))
+
+        indexes.update(1, 6, {'Lidl': 1})
+        self.assertEqual(indexes.suggest(1, 6, '', 10), [(-2, 'Lidl')])
+
+        indexes.update(1, 8, {'Lidl': 1})
+        self.assertIsNone(indexes.suggest(1, 0, '', 10))
+
+
+class TestPlaceSuggestions(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        user = cls.User.objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        cls.user = user
+
+        for place, number in (('Lidl', 3), ('Lewiatan', 1), ('Aldi', 2)):
+            for _ in range(number):
+                Expense.objects.create(user=cls.user, price=1, place=place)
+        other = cls.User.objects.create(email='other@user.com')
+        Expense.objects.create(user=other, price=1, place='Lukoil')
+
+    def setUp(self):
+        place_indexes.clear()
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+
+        self.token = response.json()['access_token']
+
+    def suggest(self, query='prefix=l'):
+        response = self.client.get(
+            reverse('expense-place-suggest') + '?' + query,
+            **{'HTTP_AUTHORIZATION': 'Bearer ' + self.token}
+        )
+        if response.status_code != 200:
+            return response
+        return [(item['place'], item['count'])
+                for item in response.json()['places']]
+
+    def test_suggest_places(self):
+        self.assertEqual(self.suggest(), [('Lidl', 3), ('Lewiatan', 1)])
+        self.assertEqual(self.suggest('prefix=&limit=1'), [('Lidl', 3)])
+
+    def test_index_is_updated_on_writes(self):
+        self.suggest()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            expense = Expense.objects.create(user=self.user, price=1,
+                                             place='Lewiatan')
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.objects.create(user=self.user, price=1, place='Lewiatan')
+        with self.captureOnCommitCallbacks(execute=True):
+            expense.place = 'Leclerc'
+            expense.save()
+
+        # authentication, the data version and no rebuild
+        with self.assertNumQueries(2):
+            places = self.suggest()
+        self.assertEqual(places,
+                         [('Lidl', 3), ('Lewiatan', 2), ('Leclerc', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Expense.objects.filter(place='Leclerc').get().delete()
+        self.assertEqual(self.suggest('prefix=le'), [('Lewiatan', 2)])
+
+    def test_index_is_updated_on_bulk_writes(self):
+        self.suggest()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_expenses([Expense(user=self.user, price=1, place='Lotos')
+                             for _ in range(4)])
+        self.assertEqual(self.suggest()[0], ('Lotos', 4))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_expenses(Expense.objects.filter(place='Lidl'))
+        self.assertEqual(self.suggest(), [('Lotos', 4), ('Lewiatan', 1)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_expenses(Expense.objects.filter(place='Lotos'),
+                            {'place': 'Aldi'})
+        self.assertEqual(self.suggest('prefix=a'), [('Aldi', 6)])
+
+    def test_outdated_index_is_rebuilt(self):
+        self.suggest()
+
+        # a write of another process
+        Expense.objects.filter(place='Lewiatan').update(place='Lidl')
+        Expense.objects.create(user=self.user, price=1, place='Aldi')
+
+        self.assertEqual(self.suggest(), [('Lidl', 4)])
+
+    def test_invalid_limit(self):
+        for query in ('limit=foo', 'limit=0', 'limit=51'):
+            with self.subTest(query=query):
+                self.assertEqual(self.suggest(query).status_code, 400)
@@ -0,0 +1,90 @@
+from unittest import skipUnless
+from django.db import connection
+from django.db.models import Q, Sum
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from datetime import date
+
+from expense.models import DailyExpenseSummary, Expense
+from expense.statistics import (
+    mostly_chosen_queries, scalar_query, summary_count
+)
+
+# ordering groups by an aggregate always needs a sort
+ORDER_BY_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+GROUP_BY_SORT = 'USE TEMP B-TREE FOR GROUP BY'
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite only')
+class TestQueryPlans(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com')
+        cls.expenses = Expense.objects.filter(
+            user=cls.user, day__range=['2022-01-01', '2022-01-31']
+        )
+
+    def get_query_plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertUsesIndex(self, queryset, allowed_sorts=()):
+        plan = self.get_query_plan(queryset)
+        for step in plan:
+            self.assertFalse(
+                step.startswith('SCAN'), f'Full scan in {plan}'
+            )
+            if step in allowed_sorts:
+                continue
+            self.assertNotIn('TEMP B-TREE', step, f'Sorting in {plan}')
+
+    def test_expenses_list_query_uses_index(self):
+        self.assertUsesIndex(self.expenses[:5])
+
+    def test_expenses_list_query_filtered_by_category_uses_index(self):
+        self.assertUsesIndex(self.expenses.filter(category_id=1)[:5])
+
+    def test_expenses_list_query_filtered_by_priority_uses_index(self):
+        self.assertUsesIndex(self.expenses.filter(priority_id=1)[:5])
+
+    def test_expenses_list_keyset_query_uses_index(self):
+        expenses = self.expenses.filter(day__lte=date(2022, 1, 15)). \
+            filter(Q(day__lt=date(2022, 1, 15)) | Q(id__lt=10))
+        self.assertUsesIndex(expenses[:5])
+
+    def test_statistics_sum_query_uses_index(self):
+        self.assertUsesIndex(scalar_query(self.expenses, Sum('price')))
+
+    def test_statistics_mostly_chosen_queries_use_index(self):
+        for field in ('place', 'category', 'priority'):
+            for query in mostly_chosen_queries(self.expenses, field):
+                self.assertUsesIndex(query, allowed_sorts=[ORDER_BY_SORT])
+
+    def test_statistics_daily_summaries_queries_use_index(self):
+        summaries = DailyExpenseSummary.objects.filter(
+            user=self.user, day__range=['2022-01-01', '2022-01-31']
+        )
+        self.assertUsesIndex(scalar_query(summaries, Sum('price_sum')))
+        for field in ('category', 'priority'):
+            queries = mostly_chosen_queries(summaries, field,
+                                            summary_count(field))
+            # there are only a few summaries a day, so grouping them is cheap
+            for query in queries:
+                self.assertUsesIndex(
+                    query, allowed_sorts=[GROUP_BY_SORT, ORDER_BY_SORT]
+                )
+
+    def test_summary_query_uses_index(self):
+        summaries = DailyExpenseSummary.objects.filter(
+            user=self.user, day__range=['2022-01-01', '2022-01-31']
+        )
+        self.assertUsesIndex(scalar_query(summaries, Sum('price_sum')))
+
+    def test_category_list_query_uses_index(self):
+        self.assertUsesIndex(self.user.category.all())
+
+    def test_priority_list_query_uses_index(self):
+        self.assertUsesIndex(self.user.priority.all())
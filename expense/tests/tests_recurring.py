@@ -0,0 +1,225 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.urls import reverse
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from expense.models import (
+    Category, DailyExpenseSummary, Expense, RecurringExpense
+)
+from expense.recurring import (
+    RecurringExpenseScheduler, materialize_due_expenses
+)
+from expense.rollups import find_inconsistent_daily_summaries
+
+
+class TestRecurringExpense(TestCase):
+    def recurring(self, frequency, start, interval=1, until=None):
+        recurring = RecurringExpense(frequency=frequency, start=start,
+                                     interval=interval, until=until)
+        recurring.schedule()
+        return recurring
+
+    def test_monthly_occurrences_do_not_drift(self):
+        recurring = self.recurring(RecurringExpense.MONTHLY,
+                                   date(2022, 1, 31))
+
+        self.assertEqual(recurring.advance(date(2022, 4, 30)), [
+            date(2022, 1, 31), date(2022, 2, 28), date(2022, 3, 31),
+            date(2022, 4, 30),
+        ])
+        self.assertEqual(recurring.next_day, date(2022, 5, 31))
+
+    def test_interval_and_until(self):
+        recurring = self.recurring(RecurringExpense.WEEKLY, date(2022, 1, 3),
+                                   interval=2, until=date(2022, 1, 31))
+
+        self.assertEqual(recurring.advance(date(2023, 1, 1)), [
+            date(2022, 1, 3), date(2022, 1, 17), date(2022, 1, 31),
+        ])
+        self.assertIsNone(recurring.next_day)
+        self.assertEqual(recurring.occurrences, 3)
+
+
+class TestMaterializeDueExpenses(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create(email='user@user.com')
+        cls.other = User.objects.create(email='other@user.com')
+        cls.category = Category.objects.create(user=cls.user, name='Home')
+
+    def create_recurring(self, user, start, **kwargs):
+        recurring = RecurringExpense(
+            user=user, price=100, place='Rent', start=start,
+            frequency=RecurringExpense.MONTHLY, **kwargs
+        )
+        recurring.schedule()
+        recurring.save()
+        return recurring
+
+    def test_due_occurrences_of_all_users_are_created_in_batches(self):
+        rent = self.create_recurring(self.user, date(2022, 1, 10),
+                                     category=self.category)
+        self.create_recurring(self.other, date(2022, 3, 1))
+        self.create_recurring(self.other, date(2023, 1, 1))
+
+        created = materialize_due_expenses(date(2022, 3, 10), batch_size=1)
+
+        self.assertEqual(created, 4)
+        self.assertEqual(
+            list(rent.expenses.order_by('day').values_list('day', 'price',
+                                                             'category')),
+            [(date(2022, month, 10), Decimal('100.00'), self.category.id)
+             for month in (1, 2, 3)]
+        )
+        self.assertEqual(Expense.objects.filter(user=self.other).count(), 1)
+        rent.refresh_from_db()
+        self.assertEqual(rent.next_day, date(2022, 4, 10))
+        self.assertEqual(find_inconsistent_daily_summaries(), [])
+        self.assertEqual(
+            DailyExpenseSummary.objects.filter(user=self.user).count(), 3
+        )
+
+    def test_retry_creates_no_duplicates(self):
+        self.create_recurring(self.user, date(2022, 1, 10))
+
+        self.assertEqual(materialize_due_expenses(date(2022, 2, 10)), 2)
+        self.assertEqual(materialize_due_expenses(date(2022, 2, 10)), 0)
+        self.assertEqual(materialize_due_expenses(date(2022, 3, 10)), 1)
+        self.assertEqual(Expense.objects.count(), 3)
+
+    def test_failed_batch_is_rolled_back(self):
+        recurring = self.create_recurring(self.user, date(2022, 1, 10))
+
+        with mock.patch('expense.recurring.create_expenses',
+                        side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                materialize_due_expenses(date(2022, 1, 10))
+
+        recurring.refresh_from_db()
+        self.assertEqual(recurring.next_day, date(2022, 1, 10))
+        self.assertEqual(materialize_due_expenses(date(2022, 1, 10)), 1)
+
+    def test_occurrence_is_unique(self):
+        recurring = self.create_recurring(self.user, date(2022, 1, 10))
+        materialize_due_expenses(date(2022, 1, 10))
+
+        with self.assertRaises(IntegrityError):
+            Expense.objects.create(user=self.user, price=1, place='Rent',
+                                   day=date(2022, 1, 10), recurring=recurring)
+
+    def test_command(self):
+        self.create_recurring(self.user, date(2022, 1, 10))
+        out = StringIO()
+
+        call_command('materialize_recurring_expenses', '--date=2022-02-10',
+                     stdout=out)
+
+        self.assertIn('2 expenses created', out.getvalue())
+
+    def test_command_loop(self):
+        self.create_recurring(self.user, date.today())
+        out = StringIO()
+
+        with mock.patch.object(RecurringExpenseScheduler, 'run_once',
+                               side_effect=KeyboardInterrupt) as run_once:
+            call_command('materialize_recurring_expenses', '--loop',
+                         '--interval=60', stdout=out)
+
+        run_once.assert_called_once_with()
+        self.assertIn('every 60 seconds', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('materialize_recurring_expenses', '--loop',
+                         '--date=2022-02-10', stdout=StringIO())
+
+    def test_scheduler_run(self):
+        self.create_recurring(self.user, date.today())
+
+        self.assertEqual(RecurringExpenseScheduler().run_once(), 1)
+
+
+class TestRecurringExpenseViews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create(email='user@user.com')
+        cls.user.set_password('foo')
+        cls.user.is_active = True
+        cls.user.save()
+        cls.other = User.objects.create(email='other@user.com')
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+        self.headers = {
+            'HTTP_AUTHORIZATION': 'Bearer ' + response.json()['access_token']
+        }
+
+    def post(self, **data):
+        return self.client.post(
+            reverse('expense-recurring-list'),
+            content_type='application/json',
+            data={'price': '1200', 'place': 'Rent', 'frequency': 'monthly',
+                  'start': '2022-01-31', **data},
+            **self.headers
+        )
+
+    def test_create_and_list(self):
+        response = self.post(interval=2)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['next_day'], '2022-01-31')
+        response = self.client.get(reverse('expense-recurring-list'),
+                                   **self.headers)
+        self.assertEqual([item['interval'] for item in response.json()], [2])
+
+    def test_create_invalid(self):
+        other_category = Category.objects.create(user=self.other, name='X')
+        for data in ({'frequency': 'hourly'}, {'interval': 0},
+                     {'until': '2021-12-31'},
+                     {'category': other_category.id}):
+            self.assertEqual(self.post(**data).status_code, 400, data)
+
+    def test_update_until_but_not_schedule(self):
+        pk = self.post().json()['id']
+        url = reverse('expense-recurring-detail', args=[pk])
+        data = {'price': '1300', 'place': 'Rent', 'frequency': 'monthly',
+                'start': '2022-01-31', 'until': '2022-01-01'}
+
+        response = self.client.put(url, content_type='application/json',
+                                   data=data, **self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        data['until'] = '2022-06-30'
+        response = self.client.put(url, content_type='application/json',
+                                   data=data, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['price'], '1300.00')
+
+        data['frequency'] = 'weekly'
+        response = self.client.put(url, content_type='application/json',
+                                   data=data, **self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete_keeps_expenses(self):
+        pk = self.post().json()['id']
+        materialize_due_expenses(date(2022, 1, 31))
+
+        response = self.client.delete(
+            reverse('expense-recurring-detail', args=[pk]), **self.headers
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            list(Expense.objects.values_list('day', 'recurring')),
+            [(date(2022, 1, 31), None)]
+        )
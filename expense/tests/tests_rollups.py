@@ -0,0 +1,124 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from decimal import Decimal
+from datetime import date
+from io import StringIO
+
+from expense.models import Category, DailyExpenseSummary, Expense, Priority
+from expense.rollups import find_inconsistent_daily_summaries
+
+
+class TestDailyExpenseSummary(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com')
+        cls.category = Category.objects.create(user=cls.user, name='Food')
+        cls.priority = Priority.objects.create(user=cls.user, name='High')
+
+    def create_expense(self, price=10, **kwargs):
+        return Expense.objects.create(
+            user=self.user, price=price, place='Shop', **kwargs
+        )
+
+    def summaries(self):
+        return list(DailyExpenseSummary.objects.values_list(
+            'day', 'category', 'priority', 'count', 'price_sum'
+        ).order_by('day', 'category', 'priority'))
+
+    def assertConsistent(self):
+        self.assertEqual(find_inconsistent_daily_summaries(), [])
+
+    def test_create_expense_updates_summary(self):
+        self.create_expense(10, category=self.category)
+        self.create_expense(15, category=self.category)
+
+        self.assertEqual(self.summaries(), [
+            (date.today(), self.category.id, None, 2, Decimal('25.00'))
+        ])
+
+    def test_update_expense_moves_it_between_summaries(self):
+        expense = self.create_expense(10)
+        self.create_expense(5)
+
+        expense.category = self.category
+        expense.price = 20
+        expense.save()
+
+        self.assertEqual(self.summaries(), [
+            (date.today(), None, None, 1, Decimal('5.00')),
+            (date.today(), self.category.id, None, 1, Decimal('20.00')),
+        ])
+        self.assertConsistent()
+
+    def test_update_expense_day(self):
+        expense = self.create_expense(10)
+
+        expense.day = date(2022, 1, 1)
+        expense.save()
+
+        self.assertEqual(self.summaries(), [
+            (date(2022, 1, 1), None, None, 1, Decimal('10.00'))
+        ])
+
+    def test_delete_expense_removes_empty_summary(self):
+        expense = self.create_expense(10)
+
+        expense.delete()
+
+        self.assertEqual(self.summaries(), [])
+
+    def test_delete_category_nulls_summaries(self):
+        self.create_expense(10, category=self.category,
+                            priority=self.priority)
+        self.create_expense(5, priority=self.priority)
+
+        self.category.delete()
+
+        self.assertConsistent()
+        self.assertEqual(
+            Expense.objects.filter(category__isnull=True).count(), 2
+        )
+
+    def test_write_after_category_delete_is_counted_once(self):
+        self.create_expense(10)
+        expense = self.create_expense(20, category=self.category)
+        self.category.delete()
+
+        self.create_expense(5)
+
+        self.assertConsistent()
+        self.assertEqual(
+            sum(row[-1] for row in self.summaries()), Decimal('35.00')
+        )
+
+        # the rows of the key are deleted only together, once emptied
+        Expense.objects.get(pk=expense.pk).delete()
+        self.assertConsistent()
+        Expense.objects.filter(user=self.user).delete()
+        self.assertEqual(self.summaries(), [])
+
+    def test_delete_user_deletes_summaries(self):
+        self.create_expense(10)
+
+        self.user.delete()
+
+        self.assertEqual(self.summaries(), [])
+
+    def test_check_command_reports_inconsistency(self):
+        expense = self.create_expense(10)
+        Expense.objects.filter(pk=expense.pk).update(price=30)
+
+        with self.assertRaises(CommandError):
+            call_command('check_daily_summaries', stdout=StringIO())
+
+    def test_rebuild_command_fixes_inconsistency(self):
+        expense = self.create_expense(10)
+        Expense.objects.filter(pk=expense.pk).update(price=30)
+
+        call_command('rebuild_daily_summaries', stdout=StringIO())
+
+        self.assertConsistent()
+        call_command('check_daily_summaries', stdout=StringIO())
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from expense.models import Category, Expense, Priority
+from expense.rows import ExpenseRowSerializer
+from expense.serializers import ExpenseSerializer
+from expense.views import ExpensesList
+
+
+class SerializerExpensesList(ExpensesList):
+    row_serializer_class = None
+
+
+class TestExpenseRowSerializer(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com',
+                                           is_active=True)
+        category = Category.objects.create(user=cls.user, name='Food')
+        priority = Priority.objects.create(user=cls.user, name='Żółć "x"')
+        prices = [Decimal('10'), Decimal('0.01'), Decimal('10.5'),
+                  Decimal('9999999999999.99')]
+        for i, price in enumerate(prices):
+            Expense.objects.create(
+                user=cls.user, price=price, place=f'Shop {i} ą',
+                category=category if i % 2 else None,
+                priority=priority if i % 3 else None
+            )
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_output_matches_expense_serializer(self):
+        options = [
+            (None, []),
+            (['id', 'day', 'price'], []),
+            (None, ['category']),
+            (None, ['category', 'priority']),
+            (['place', 'priority'], ['priority']),
+        ]
+        expenses = Expense.objects.filter(user=self.user)
+        for fields, expand in options:
+            with self.subTest(fields=fields, expand=expand):
+                serializer = ExpenseSerializer(expenses, many=True,
+                                               fields=fields, expand=expand)
+                rows = ExpenseRowSerializer(fields, expand)
+
+                self.assertEqual(
+                    self.render(rows.serialize(rows.get_queryset(expenses))),
+                    self.render(serializer.data)
+                )
+
+    def test_list_view_matches_serializer_path(self):
+        url = reverse('expense-expense-list')
+        for query in ('', '?expand=category,priority&limit=2',
+                      '?cursor=&fields=id,price&limit=2'):
+            with self.subTest(query=query):
+                responses = []
+                for view in (ExpensesList, SerializerExpensesList):
+                    request = APIRequestFactory().get(url + query)
+                    force_authenticate(request, user=self.user)
+                    response = view.as_view()(request)
+                    responses.append(response.render().content)
+
+                self.assertEqual(responses[0], responses[1])
@@ -0,0 +1,108 @@
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+import json
+
+from expense.bulk import delete_expenses, update_expenses
+from expense.models import Expense
+from expense.search import (
+    FTS_TABLE, get_search_terms, restore_search_triggers, search_expenses
+)
+from expense.views import ExportExpenses, ExpensesList
+
+
+class TestSearch(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(email='user@user.com',
+                                           is_active=True)
+        cls.expenses = {
+            place: Expense.objects.create(user=cls.user, price=price,
+                                          place=place)
+            for place, price in (('Lidl', 10), ('Biedronka', 20),
+                                 ('LIDL Warszawa', 30), ('Żabka', 5))
+        }
+        other = cls.User.objects.create(email='other@user.com')
+        Expense.objects.create(user=other, price=99, place='Lidl')
+
+    def search(self, q):
+        expenses = Expense.objects.filter(user=self.user)
+        return list(search_expenses(expenses, get_search_terms({'q': q})).
+                    values_list('place', flat=True))
+
+    def test_search_is_case_insensitive(self):
+        self.assertEqual(self.search('lidl'), ['LIDL Warszawa', 'Lidl'])
+
+    def test_search_by_prefix_and_many_terms(self):
+        self.assertEqual(self.search('lid'), ['LIDL Warszawa', 'Lidl'])
+        self.assertEqual(self.search('war lid'), ['LIDL Warszawa'])
+        self.assertEqual(self.search('lidl biedronka'), [])
+
+    def test_search_ignores_diacritics_and_punctuation(self):
+        self.assertEqual(self.search('zabka'), ['Żabka'])
+        self.assertEqual(self.search('"lidl" OR*'), [])
+        self.assertEqual(self.search('!!!'), self.search(''))
+
+    def test_index_follows_writes(self):
+        expense = self.expenses['Biedronka']
+        expense.place = 'Aldi'
+        expense.save()
+        self.assertEqual(self.search('biedronka'), [])
+        self.assertEqual(self.search('aldi'), ['Aldi'])
+
+        update_expenses(Expense.objects.filter(pk=expense.pk),
+                        {'place': 'Netto'})
+        self.assertEqual(self.search('netto'), ['Netto'])
+
+        delete_expenses(Expense.objects.filter(place='Lidl'))
+        self.assertEqual(self.search('lidl'), ['LIDL Warszawa'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 is SQLite only')
+    def test_search_uses_index(self):
+        expenses = search_expenses(Expense.objects.all(), ['lidl'])
+        sql, params = expenses.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+
+        self.assertIn(f'SCAN {FTS_TABLE} VIRTUAL TABLE INDEX', plan)
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 is SQLite only')
+    def test_missing_triggers_are_restored(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {FTS_TABLE}_insert')
+        Expense.objects.create(user=self.user, price=1, place='Kaufland')
+        self.assertEqual(self.search('kaufland'), [])
+
+        restore_search_triggers(connection.alias)
+
+        self.assertEqual(self.search('kaufland'), ['Kaufland'])
+
+    def test_list_and_export_filter_by_query(self):
+        request = APIRequestFactory().get(
+            reverse('expense-expense-list') + '?q=lidl'
+        )
+        force_authenticate(request, user=self.user)
+        response = ExpensesList.as_view()(request)
+
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['statistics']['price__sum'], 40)
+        self.assertEqual(
+            [item['place'] for item in response.data['results']],
+            ['LIDL Warszawa', 'Lidl']
+        )
+
+        request = APIRequestFactory().get(
+            reverse('expense-expense-export') + '?type=ndjson&q=lidl'
+        )
+        force_authenticate(request, user=self.user)
+        response = ExportExpenses.as_view()(request)
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['place'] for line in lines],
+                         ['LIDL Warszawa', 'Lidl'])
@@ -0,0 +1,126 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+from decimal import Decimal
+
+from expense.models import Category, DailyExpenseSummary, Expense, Priority
+from expense.statistics import get_statistics
+from expense.views import ExpensesList
+
+
+class TestStatistics(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        cls.user = cls.User.objects.create(
+            email='user@user.com', is_active=True
+        )
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+        cls.home = Category.objects.create(user=cls.user, name='Home')
+        cls.high = Priority.objects.create(user=cls.user, name='High')
+
+        for price, place, category in (
+                (10, 'Lidl', cls.food), (20, 'Lidl', cls.food),
+                (30, 'Ikea', cls.home), (5, 'Zabka', None)):
+            Expense.objects.create(
+                user=cls.user, price=price, place=place,
+                category=category, priority=cls.high
+            )
+
+    def test_get_statistics(self):
+        count, statistics = get_statistics(Expense.objects.all())
+
+        self.assertEqual(count, 4)
+        self.assertEqual(statistics, {
+            'price__sum': Decimal('65.00'),
+            'place': 'Lidl', 'place__count': 2,
+            'category': self.food.id, 'category__count': 2,
+            'priority': self.high.id, 'priority__count': 4,
+        })
+
+    def test_get_statistics_in_one_query(self):
+        with self.assertNumQueries(1):
+            get_statistics(Expense.objects.all())
+
+    def test_get_statistics_when_no_expenses(self):
+        count, statistics = get_statistics(Expense.objects.filter(price=0))
+
+        self.assertEqual(count, 0)
+        self.assertEqual(statistics, {'price__sum': None})
+
+    def test_get_statistics_ties_are_deterministic(self):
+        Expense.objects.create(user=self.user, price=1, place='Ikea')
+
+        _, statistics = get_statistics(Expense.objects.all())
+
+        self.assertEqual(statistics['place'], 'Ikea')
+
+    def test_expenses_list_uses_two_queries_besides_etag(self):
+        request = APIRequestFactory().get(reverse('expense-expense-list'))
+        force_authenticate(request, user=self.user)
+
+        # besides the data version read for the ETag
+        with self.assertNumQueries(3):
+            response = ExpensesList.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(response.data['statistics']['place'], 'Lidl')
+
+    def test_top_values(self):
+        expenses = Expense.objects.all()
+        summaries = DailyExpenseSummary.objects.all()
+        for summary in (None, summaries):
+            with self.subTest(summaries=summary is not None):
+                _, statistics = get_statistics(expenses, summary, top=2)
+                top = statistics['top']
+
+                self.assertEqual(top['place']['most_frequent'], [
+                    {'place': 'Lidl', 'count': 2},
+                    {'place': 'Ikea', 'count': 1},
+                ])
+                # ties are broken by the value
+                self.assertEqual(top['place']['most_expensive'], [
+                    {'place': 'Ikea', 'price__sum': Decimal('30.00')},
+                    {'place': 'Lidl', 'price__sum': Decimal('30.00')},
+                ])
+                self.assertEqual(top['category']['most_frequent'], [
+                    {'category': self.food.id, 'count': 2},
+                    {'category': self.home.id, 'count': 1},
+                ])
+                self.assertEqual(top['priority']['most_expensive'], [
+                    {'priority': self.high.id,
+                     'price__sum': Decimal('65.00')},
+                ])
+
+    def test_top_values_are_limited_in_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            get_statistics(Expense.objects.all(), top=3)
+
+        self.assertEqual(len(queries), 7)
+        for query in queries[1:]:
+            self.assertIn('LIMIT 3', query['sql'])
+
+    def test_expenses_list_with_top(self):
+        request = APIRequestFactory().get(
+            reverse('expense-expense-list') + '?top=1'
+        )
+        force_authenticate(request, user=self.user)
+        response = ExpensesList.as_view()(request)
+
+        self.assertEqual(
+            response.data['statistics']['top']['place']['most_frequent'],
+            [{'place': 'Lidl', 'count': 2}]
+        )
+
+        for top in ('0', '51', 'foo'):
+            with self.subTest(top=top):
+                request = APIRequestFactory().get(
+                    reverse('expense-expense-list') + '?top=' + top
+                )
+                force_authenticate(request, user=self.user)
+                response = ExpensesList.as_view()(request)
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,115 @@
+from django.test import Client, TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from urllib.parse import urlencode
+from datetime import date
+from dateutil.relativedelta import relativedelta
+
+from expense.models import Expense
+from expense.summary import summarize_periods
+
+
+class TestSummary(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.User = get_user_model()
+        user = cls.User.objects.create(email='user@user.com')
+        user.set_password('foo')
+        user.is_active = True
+        user.save()
+        cls.user = user
+
+        cls.today = date.today()
+        for months_ago, price in ((0, 10), (0, 5), (2, 7), (30, 100)):
+            expense = Expense.objects.create(
+                user=cls.user, price=price, place='Shop'
+            )
+            expense.day = cls.today - relativedelta(months=months_ago)
+            expense.save()
+
+    def setUp(self):
+        self.client = Client()
+        response = self.client.post(
+            reverse('accounts-get-token'),
+            {'email': 'user@user.com', 'password': 'foo'}
+        )
+
+        self.token = response.json()['access_token']
+
+    def get_summary(self, **params):
+        return self.client.get(
+            reverse('expense-monthly-summary') + '?' + urlencode(params),
+            **{'HTTP_AUTHORIZATION': 'Bearer ' + self.token}
+        )
+
+    def month_key(self, months_ago):
+        day = self.today - relativedelta(months=months_ago)
+        return f'{day.year}-{day.month}'
+
+    def test_get_summary(self):
+        response = self.get_summary()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['month_summary'], [
+            {'date': self.month_key(0), 'sum_of_prices': 15.0,
+             'unconverted': 0},
+            {'date': self.month_key(1), 'sum_of_prices': None,
+             'unconverted': 0},
+            {'date': self.month_key(2), 'sum_of_prices': 7.0,
+             'unconverted': 0},
+            {'date': self.month_key(3), 'sum_of_prices': None,
+             'unconverted': 0},
+            {'date': self.month_key(4), 'sum_of_prices': None,
+             'unconverted': 0},
+        ])
+
+    def test_get_summary_with_long_horizon(self):
+        response = self.get_summary(ma=60)
+
+        summary = response.json()['month_summary']
+        self.assertEqual(len(summary), 60)
+        self.assertEqual(summary[30], {
+            'date': self.month_key(30), 'sum_of_prices': 100.0,
+            'unconverted': 0
+        })
+
+    def test_get_summary_grouped_by_year(self):
+        response = self.get_summary(group='year', ma=4)
+
+        summary = response.json()['year_summary']
+        self.assertEqual(len(summary), 4)
+        self.assertEqual(summary[0]['date'], str(self.today.year))
+        self.assertEqual(
+            sum(period['sum_of_prices'] or 0 for period in summary), 122.0
+        )
+
+    def test_get_summary_uses_one_query(self):
+        summaries = self.user.daily_summary.all()
+
+        with self.assertNumQueries(1):
+            summarize_periods(summaries, 'week', 500, self.today)
+
+    def test_get_summary_grouped_by_quarter_and_week(self):
+        for group in ('quarter', 'week'):
+            response = self.get_summary(group=group)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()[f'{group}_summary']), 5)
+
+    def test_get_summary_unsupported_group(self):
+        response = self.get_summary(group='day')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('detail', response.json())
+
+    def test_get_summary_ma_out_of_range(self):
+        response = self.get_summary(ma=0)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('detail', response.json())
+
+    def test_get_summary_ma_not_numeric(self):
+        response = self.get_summary(ma='foo')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('detail', response.json())
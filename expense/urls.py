@@ -1,13 +1,20 @@
 from django.urls import path
 from .views import (
-    ExpensesList, ExpenseDetail,
+    ExpensesList, ExpenseDetail, ExpenseBulk, ExpenseChanges,
+    ExpenseDuplicates,
     CategoryList, CategoryDetail,
-    PriorityList, PriorityDetail,
-    SummaryMonthlyExpenses,
+    PriorityList, PriorityDetail, BudgetList, BudgetDetail,
+    RecurringExpenseList, RecurringExpenseDetail,
+    SummaryMonthlyExpenses, ExportExpenses, ImportExpenses, PlaceSuggestions,
+    ExpenseAnalytics, ExpenseStatistics,
 )
 
 urlpatterns = [
     path('', ExpensesList.as_view(), name='expense-expense-list'),
+    path('bulk', ExpenseBulk.as_view(), name='expense-expense-bulk'),
+    path('changes', ExpenseChanges.as_view(), name='expense-expense-changes'),
+    path('duplicates', ExpenseDuplicates.as_view(),
+         name='expense-expense-duplicates'),
     path('expense/<int:pk>', ExpenseDetail.as_view(),
          name='expense-expense-detail'),
     path('category', CategoryList.as_view(), name='expense-category-list'),
@@ -16,6 +23,21 @@ urlpatterns = [
     path('priority', PriorityList.as_view(), name='expense-priority-list'),
     path('priority/<int:pk>', PriorityDetail.as_view(),
          name='expense-priority-detail'),
+    path('budget', BudgetList.as_view(), name='expense-budget-list'),
+    path('budget/<int:pk>', BudgetDetail.as_view(),
+         name='expense-budget-detail'),
+    path('recurring', RecurringExpenseList.as_view(),
+         name='expense-recurring-list'),
+    path('recurring/<int:pk>', RecurringExpenseDetail.as_view(),
+         name='expense-recurring-detail'),
+    path('places/suggest', PlaceSuggestions.as_view(),
+         name='expense-place-suggest'),
+    path('analytics', ExpenseAnalytics.as_view(),
+         name='expense-expense-analytics'),
+    path('statistics', ExpenseStatistics.as_view(),
+         name='expense-expense-statistics'),
+    path('export', ExportExpenses.as_view(), name='expense-expense-export'),
+    path('import', ImportExpenses.as_view(), name='expense-expense-import'),
     path('summary', SummaryMonthlyExpenses.as_view(), name='expense-monthly-summary'),
 ]
 
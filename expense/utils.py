@@ -1,93 +1,136 @@
 from rest_framework import exceptions
 from datetime import datetime, date
-from dateutil.relativedelta import relativedelta
-
-MIN_YEAR = datetime.min.year
-MAX_YEAR = datetime.max.year
-MIN_MONTH = datetime.min.month
-MAX_MONTH = datetime.max.month
-MIN_DAY = datetime.min.day
-MAX_DAY = datetime.max.day
-
-
-def create_date_form_query_param(
-        min_value, max_value,
-        to_date=False, query_value=None
-):
-
-    if query_value:
-        try: 
-            query_value = int(query_value)
-        except ValueError:
-            raise esceptions.ValidationError(
-                {'detail': 'Value must be numeric'}
-            )
-
-    if query_value:
-        if min_value <= int(query_value) <= max_value:
-            return query_value
-        else:
-            raise exceptions.ValidationError(
-                {'detail': 'Out of range'}
-            )
-    else:
-        if max_value == MAX_YEAR:
-            return datetime.now().year
-        if max_value == MAX_MONTH:
-            return datetime.now().month
-        if max_value == MAX_DAY:
-            if to_date:
-                return max_value
-            else:
-                return min_value
+
+from .dates import (
+    DATE_RANGE_QUERY_PARAMS, LEGACY_DATE_QUERY_PARAMS, get_date_range
+)
+from .models import Expense
+from .search import get_search_terms, search_expenses
+
+# fields of serialized expenses and those which can be expanded
+EXPENSE_FIELDS = ('id', 'day', 'price', 'currency', 'place', 'category',
+                  'priority')
+EXPANDABLE_FIELDS = ('category', 'priority')
+
+# query params narrowing the expenses
+FILTER_QUERY_PARAMS = (
+    DATE_RANGE_QUERY_PARAMS + LEGACY_DATE_QUERY_PARAMS + ('cat', 'pri', 'q')
+)
 
 
 def create_date_range(query_params):
-    from_year = create_date_form_query_param(
-        MIN_YEAR, MAX_YEAR,
-        query_value=query_params.get('fyear')
-    )
+    """
+    Return the first and last day of the selected date range as ISO strings
+    """
+    return get_date_range(query_params).as_list()
 
-    from_month = create_date_form_query_param(
-        MIN_MONTH, MAX_MONTH,
-        query_value=query_params.get('fmonth')
-    )
 
-    from_day = create_date_form_query_param(
-        MIN_DAY, MAX_DAY,
-        query_value=query_params.get('fday')
-    )
+def get_expense_filters(user, query_params):
+    """
+    Return lookups narrowing the user's expenses (or their daily summaries)
+    by the date range, category and priority query params together with
+    the used date range
+    """
+    date_range = create_date_range(query_params)
+    filters = {'user': user, 'day__range': date_range}
 
-    to_year = create_date_form_query_param(
-        MIN_YEAR, MAX_YEAR, True,
-        query_value=query_params.get('tyear')
-    )
+    if query_params.get('cat'):
+        filters['category_id'] = query_params.get('cat')
 
-    to_month = create_date_form_query_param(
-        MIN_MONTH, MAX_MONTH, True,
-        query_value=query_params.get('tmonth')
-    )
+    if query_params.get('pri'):
+        filters['priority_id'] = query_params.get('pri')
 
-    to_day = create_date_form_query_param(
-        MIN_DAY, MAX_DAY, True,
-        query_value=query_params.get('tday')
-    )
+    return filters, date_range
 
+
+def filter_expenses(user, query_params):
+    """
+    Return the user's expenses narrowed by the query params, including the
+    search, together with the used date range
+    """
+    filters, date_range = get_expense_filters(user, query_params)
+    expenses = search_expenses(Expense.objects.filter(**filters),
+                               get_search_terms(query_params))
+    return expenses, date_range
+
+
+def parse_field_list(query_params, param, allowed):
+    value = query_params.get(param)
+    if value is None:
+        return None
+    names = [name for name in value.split(',') if name]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise exceptions.ValidationError(
+            {'detail': f'Unknown {param} value: {unknown[0]}'}
+        )
+    return names
+
+
+def get_expense_fields(query_params):
+    """
+    Return the fields to serialize (None for all) and the fields to expand
+    selected by the fields and expand query params
+    """
+    fields = parse_field_list(query_params, 'fields', EXPENSE_FIELDS)
+    expand = parse_field_list(query_params, 'expand', EXPANDABLE_FIELDS) or []
+    if fields is not None:
+        expand = [name for name in expand if name in fields]
+    return fields, expand
+
+
+def select_expense_fields(expenses, fields, expand):
+    """
+    Load only the columns of the serialized fields, joining the expanded
+    objects to the same query
+    """
+    # id and day are always loaded, as the pagination orders by them
+    columns = {'id', 'day'}.union(fields or EXPENSE_FIELDS)
+    columns.update(f'{name}__name' for name in expand)
+    return expenses.select_related(*expand).only(*columns)
+
+
+def get_number_param(query_params, param, default, max_value):
+    """
+    Return the positive number of the query param, not above max_value
+    """
+    if not query_params.get(param):
+        return default
     try:
-        from_date = datetime(int(from_year), int(from_month), int(from_day))
-    except ValueError:
-        from_date = datetime(int(from_year), int(from_month), 1)
-    
-    try:
-        to_date = datetime(int(to_year), int(to_month), int(to_day))
+        value = int(query_params.get(param))
     except ValueError:
-        max_day = (date(int(from_year), int(from_month), 5) + relativedelta(day=31)).day
-        to_date = datetime(int(to_year), int(to_month), max_day)
+        raise exceptions.ValidationError(
+            {'detail': 'Value must be numeric'}
+        )
+    if not 0 < value <= max_value:
+        raise exceptions.ValidationError({'detail': 'Out of range'})
+    return value
 
 
-    if from_date > to_date:
+def get_bool_param(query_params, param):
+    """
+    Return whether the query param is true, false when it is not given
+    """
+    value = query_params.get(param, '').lower()
+    if value in ('', '0', 'false'):
+        return False
+    if value in ('1', 'true'):
+        return True
+    raise exceptions.ValidationError(
+        {'detail': 'Value must be true or false'}
+    )
+
+
+def get_month_param(query_params, param='month'):
+    """
+    Return the first day of the YYYY-MM month of the query param, or of the
+    current month
+    """
+    if not query_params.get(param):
+        return date.today().replace(day=1)
+    try:
+        return datetime.strptime(query_params.get(param), '%Y-%m').date()
+    except ValueError:
         raise exceptions.ValidationError(
-            {'detail': 'Start date is newer then end date'}
+            {'detail': 'Month must be in the YYYY-MM format'}
         )
-    else:
-        return [str(from_date.date()), str(to_date.date())]
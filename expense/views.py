@@ -1,25 +1,144 @@
-from django.http import Http404
-from django.db.models import Count, Sum
-from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+import codecs
+import io
+import json
+from collections import OrderedDict, defaultdict
+from django.core.paginator import Paginator as DjangoPaginator
+from django.http import Http404, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import F, Q
+from rest_framework import exceptions, status
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
-from .models import Category, Expense, Priority
+from .models import (
+        Budget, Category, DailyExpenseSummary, Expense, Priority,
+        RecurringExpense, Tombstone
+)
 from .serializers import (
-        CategorySerializer, ExpenseSerializer, PrioritySerializer
+        BudgetSerializer, BulkExpenseSerializer, BulkExpenseUpdateSerializer,
+        CategorySerializer, ExpenseSerializer, PrioritySerializer,
+        RecurringExpenseSerializer
+)
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+from .analytics import (
+        GROUP_BY, MAX_DIMENSIONS, METRICS, TooManyGroups, pivot
+)
+from .budgets import get_budget_status, with_spending
+from .cache import (
+    bump_data_version, conditional_get, get_data_version, get_or_compute
+)
+from .descriptive import MAX_DAYS, get_descriptive_statistics
+from .duplicates import find_duplicate_clusters, find_duplicates
+from .export import EXPORT_FORMATS
+from .imports import ExpenseImport, InvalidImport, stream_progress
+from .places import suggest_places
+from .rows import ExpenseRowSerializer
+from .search import get_search_terms, search_expenses
+from .statistics import MAX_TOP, get_statistics
+from .summary import SUMMARY_GROUPS, summarize_periods
+from .bulk import delete_expenses, update_expenses
+from .utils import (
+    FILTER_QUERY_PARAMS, filter_expenses, get_bool_param, get_expense_fields,
+    get_expense_filters, get_month_param, get_number_param,
+    parse_field_list, select_expense_fields
 )
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
-from .utils import create_date_range
+
+
+class CountedPaginator(DjangoPaginator):
+    """
+    Paginator which can reuse an already calculated number of objects
+    """
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
 
 
 class BasicPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+    count = None
+
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        # skip the COUNT query when the number of objects is already known
+        self.count = count
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def django_paginator_class(self, object_list, per_page):
+        return CountedPaginator(object_list, per_page, count=self.count)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking past the last returned (day, id) pair
+
+    Unlike the page number pagination it needs neither COUNT nor OFFSET,
+    so every page costs the same no matter how deep it is.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return page_size if page_size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            day, pk = urlsafe_b64decode(encoded.encode('ascii')). \
+                decode('ascii').split('|')
+            return date.fromisoformat(day), int(pk)
+        except (TypeError, ValueError):
+            raise exceptions.NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, expense):
+        position = f'{expense.day.isoformat()}|{expense.id}'
+        return urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by('-day', '-id')
+        position = self.decode_cursor(request)
+        if position is not None:
+            day, pk = position
+            queryset = queryset.filter(day__lte=day). \
+                filter(Q(day__lt=day) | Q(id__lt=pk))
+
+        # fetch one more row to know whether there is a next page
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        self.page = page[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
 
 
 class CategoryList(APIView):
     # List all category or create a new one
+    @conditional_get
     def get(self, request, format=None):
         category = Category.objects.filter(user=request.user)
         serializer = CategorySerializer(category, many=True)
@@ -39,10 +158,11 @@ class CategoryDetail(APIView):
     """
     def get_object(self, pk):
         try:
-            return Category.objects.get(pk=pk)
+            return Category.objects.get(pk=pk, user=self.request.user)
         except Category.DoesNotExist:
             raise Http404
 
+    @conditional_get
     def get(self, request, pk, format=None):
         category = self.get_object(pk)
         serializer = CategorySerializer(category)
@@ -64,6 +184,7 @@ class CategoryDetail(APIView):
 
 class PriorityList(APIView):
     # List all priority or create a new one
+    @conditional_get
     def get(self, request, format=None):
         priority = Priority.objects.filter(user=request.user)
         serializer = PrioritySerializer(priority, many=True)
@@ -83,10 +204,11 @@ class PriorityDetail(APIView):
     """
     def get_object(self, pk):
         try:
-            return Priority.objects.get(pk=pk)
+            return Priority.objects.get(pk=pk, user=self.request.user)
         except Priority.DoesNotExist:
             raise Http404
 
+    @conditional_get
     def get(self, request, pk, format=None):
         priority = self.get_object(pk)
         serializer = PrioritySerializer(priority)
@@ -106,107 +228,346 @@ class PriorityDetail(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class BudgetList(APIView):
+    """
+    List all budgets with their spending in the month or create a new one
+    """
+    @conditional_get
+    def get(self, request, format=None):
+        month = get_month_param(self.request.query_params)
+        budgets = with_spending(Budget.objects.filter(user=request.user),
+                                month, request.user.currency)
+        return Response({
+            'month': month.strftime('%Y-%m'),
+            'budgets': BudgetSerializer(budgets, many=True).data,
+        })
+
+    def post(self, request, format=None):
+        serializer = BudgetSerializer(data=request.data,
+                                      context={'request': request})
+        if serializer.is_valid():
+            budget = serializer.save(user=self.request.user)
+            budget = with_spending(Budget.objects.filter(pk=budget.pk),
+                                   get_month_param(self.request.query_params),
+                                   request.user.currency)
+            return Response(BudgetSerializer(budget.get()).data,
+                            status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BudgetDetail(APIView):
+    """
+    Retrieve, update, or delete a budget instance, with its spending in
+    the month
+    """
+    def get_object(self, pk):
+        budgets = with_spending(
+            Budget.objects.filter(user=self.request.user),
+            get_month_param(self.request.query_params),
+            self.request.user.currency
+        )
+        try:
+            return budgets.get(pk=pk)
+        except Budget.DoesNotExist:
+            raise Http404
+
+    @conditional_get
+    def get(self, request, pk, format=None):
+        serializer = BudgetSerializer(self.get_object(pk))
+        return Response(serializer.data)
+
+    def put(self, request, pk, format=None):
+        budget = self.get_object(pk)
+        serializer = BudgetSerializer(budget, data=request.data,
+                                      context={'request': request})
+        if serializer.is_valid():
+            serializer.save()
+            return Response(BudgetSerializer(self.get_object(pk)).data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk, format=None):
+        budget = self.get_object(pk)
+        budget.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class RecurringExpenseList(APIView):
+    """
+    List all recurring expenses or create a new one, materialized by the
+    scheduler from its start day
+    """
+    def get(self, request, format=None):
+        recurring = RecurringExpense.objects.filter(user=request.user)
+        serializer = RecurringExpenseSerializer(recurring, many=True)
+        return Response(serializer.data)
+
+    def post(self, request, format=None):
+        serializer = RecurringExpenseSerializer(data=request.data,
+                                                context={'request': request})
+        if serializer.is_valid():
+            serializer.save(user=self.request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class RecurringExpenseDetail(APIView):
+    """
+    Retrieve, update, or delete a recurring expense instance; expenses
+    already created from it are kept
+    """
+    def get_object(self, pk):
+        try:
+            return RecurringExpense.objects.get(pk=pk,
+                                                user=self.request.user)
+        except RecurringExpense.DoesNotExist:
+            raise Http404
+
+    def get(self, request, pk, format=None):
+        serializer = RecurringExpenseSerializer(self.get_object(pk))
+        return Response(serializer.data)
+
+    def put(self, request, pk, format=None):
+        recurring = self.get_object(pk)
+        serializer = RecurringExpenseSerializer(recurring, data=request.data,
+                                                context={'request': request})
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk, format=None):
+        recurring = self.get_object(pk)
+        recurring.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class ExpensesList(APIView):
     """
     List all expenses or create a new one
     """
     pagination_class = BasicPagination
+    cursor_pagination_class = KeysetPagination
     serializer_class = ExpenseSerializer
+    row_serializer_class = ExpenseRowSerializer
+
+    def get_pagination_class(self):
+        # clients asking for a cursor switch to the keyset pagination
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        if cursor_query_param in self.request.query_params:
+            return self.cursor_pagination_class
+        return self.pagination_class
 
     @property
     def paginator(self):
         if not hasattr(self, '_paginator'):
-            if self.pagination_class is None:
+            pagination_class = self.get_pagination_class()
+            if pagination_class is None:
                 self._paginator = None
             else:
-                self._paginator = self.pagination_class()
+                self._paginator = pagination_class()
         else:
             pass
         return self._paginator
 
-    def paginate_queryset(self, queryset):
+    def paginate_queryset(self, queryset, count=None):
         if self.paginator is None:
             return None
         return self.paginator.paginate_queryset(queryset,
                                                 self.request,
-                                                view=self)
+                                                view=self,
+                                                count=count)
 
     def get_paginated_response(self, data):
         assert self.paginator is not None
         return self.paginator.get_paginated_response(data)
 
+    @conditional_get
     def get(self, request, format=None):
-        date_range = create_date_range(self.request.query_params)
-        expenses = Expense.objects.filter(day__range=date_range)
+        filters, date_range = get_expense_filters(
+            request.user, self.request.query_params
+        )
+        top = get_number_param(self.request.query_params, 'top', None,
+                               MAX_TOP)
+        terms = get_search_terms(self.request.query_params)
+        expenses = search_expenses(Expense.objects.filter(**filters), terms)
+        # daily summaries know nothing about places
+        summaries = None
+        if not terms:
+            summaries = DailyExpenseSummary.objects.filter(**filters)
 
-        if self.request.GET.get('cat'):
-            expenses = expenses.filter(category_id=self.request.GET.get('cat'))
+        # performing calculations for statistic
+        currency = request.user.currency
+        count, statistics = get_or_compute(
+            'statistics', request.user,
+            (date_range, filters.get('category_id'),
+             filters.get('priority_id'), terms, top, currency),
+            lambda: get_statistics(expenses, summaries, top, currency),
+            version=self.data_version
+        )
+
+        fields, expand = get_expense_fields(self.request.query_params)
+        if self.row_serializer_class is not None:
+            # read-only fast path giving the same output from plain rows
+            row_serializer = self.row_serializer_class(fields, expand)
+            selected = row_serializer.get_queryset(expenses)
+            serialize = row_serializer.serialize
+        else:
+            selected = select_expense_fields(expenses, fields, expand)
 
-        if self.request.GET.get('pri'):
-            expenses = expenses.filter(priority_id=self.request.GET.get('pri'))
+            def serialize(page):
+                return self.serializer_class(
+                    page, many=True, fields=fields, expand=expand
+                ).data
 
-        page = self.paginate_queryset(expenses)
+        page = self.paginate_queryset(selected, count=count)
         if page is not None:
-            serializer = self.get_paginated_response(self.serializer_class(
-                page, many=True).data
-            )
+            data = self.get_paginated_response(serialize(page)).data
         else:
-            serializer = self.serializer_class(expenses, many=True)
+            data = {'results': serialize(selected)}
 
-        # performing calculations for statistic
-        expenses_sum = expenses.aggregate(Sum('price'))
+        updated_serializer = {'date_range': date_range}
+        updated_serializer.update({'statistics': statistics})
+        updated_serializer.update(data)
 
-        mostly_chosen_category = expenses.values('category'). \
-            annotate(Count('category')).order_by('-category__count')
-        if mostly_chosen_category:
-            mostly_chosen_category = mostly_chosen_category[0]
+        return Response(updated_serializer)
 
-        mostly_chosen_priority = expenses.values('priority'). \
-            annotate(Count('priority')).order_by('-priority__count')
-        if mostly_chosen_priority:
-            mostly_chosen_priority = mostly_chosen_priority[0]
+    def find_duplicate(self, user, attrs):
+        """
+        Return the id of an expense of the user duplicating the new one, or
+        None
 
-        mostly_chosen_place = expenses.values('place'). \
-            annotate(Count('place')).order_by('-place__count')
-        if mostly_chosen_place:
-            mostly_chosen_place = mostly_chosen_place[0]
+        The user's data version is locked first, so a concurrent create of
+        the same expense waits until this one is committed and finds it.
+        """
+        bump_data_version(user.pk)
+        fingerprint = Expense(user=user, **attrs).get_fingerprint()
+        return find_duplicates(Expense.objects.filter(user=user),
+                               [fingerprint]).get(fingerprint)
 
-        updated_serializer = {'date_range': date_range}
-        updated_serializer.update({'statistics': {}})
-        updated_serializer['statistics'].update(expenses_sum)
-        updated_serializer['statistics'].update(mostly_chosen_place)
-        updated_serializer['statistics'].update(mostly_chosen_category)
-        updated_serializer['statistics'].update(mostly_chosen_priority)
-        updated_serializer.update(serializer.data)
+    def post(self, request, format=None):
+        reject_duplicates = get_bool_param(self.request.query_params,
+                                           'reject_duplicates')
+        serializer = ExpenseSerializer(data=request.data,
+                                       context={'request': request})
+        if serializer.is_valid():
+            with transaction.atomic():
+                if reject_duplicates:
+                    duplicate = self.find_duplicate(
+                        request.user, serializer.validated_data
+                    )
+                    if duplicate is not None:
+                        transaction.set_rollback(True)
+                        return Response({'detail': 'Duplicate expense',
+                                         'duplicate': duplicate},
+                                        status=status.HTTP_409_CONFLICT)
+                expense = serializer.save(user=self.request.user)
+            # the month's spending of the category including the new expense
+            budget = get_budget_status(expense, request.user.currency)
+            if budget is not None:
+                budget = BudgetSerializer(budget).data
+            return Response({**serializer.data, 'budget': budget},
+                            status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(updated_serializer)
+
+class ExpenseBulk(APIView):
+    """
+    Create many expenses at once, reporting the result of every item, or
+    update or delete expenses selected by ids or filters
+    """
+    max_items = 1000
+
+    def get_selected_expenses(self, request):
+        ids = self.request.query_params.get('ids')
+        if ids:
+            try:
+                ids = [int(pk) for pk in ids.split(',')]
+            except ValueError:
+                raise exceptions.ValidationError(
+                    {'detail': 'Value must be numeric'}
+                )
+            if len(ids) > self.max_items:
+                raise exceptions.ValidationError(
+                    {'detail': 'Too many ids'}
+                )
+            return Expense.objects.filter(user=request.user, pk__in=ids)
+
+        # never touch the default date range by accident
+        if not any(param in self.request.query_params
+                   for param in FILTER_QUERY_PARAMS):
+            raise exceptions.ValidationError(
+                {'detail': 'Select expenses by ids or filters'}
+            )
+        expenses, date_range = filter_expenses(
+            request.user, self.request.query_params
+        )
+        return expenses
 
     def post(self, request, format=None):
-        serializer = ExpenseSerializer(data=request.data)
-        if serializer.is_valid():
+        reject_duplicates = get_bool_param(self.request.query_params,
+                                           'reject_duplicates')
+        serializer = BulkExpenseSerializer(
+            data=request.data, many=True, max_length=self.max_items,
+            context={'request': request,
+                     'reject_duplicates': reject_duplicates}
+        )
+        with transaction.atomic():
+            if reject_duplicates:
+                # duplicates are looked up under the lock of the user's data
+                # version, like in ExpensesList.find_duplicate()
+                bump_data_version(request.user.pk)
+            if not serializer.is_valid():
+                transaction.set_rollback(True)
+                return Response(serializer.errors,
+                                status=status.HTTP_400_BAD_REQUEST)
             serializer.save(user=self.request.user)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        results = serializer.get_results()
+        if all(result['status'] == 201 for result in results):
+            return Response(results, status=status.HTTP_201_CREATED)
+        return Response(results, status=status.HTTP_207_MULTI_STATUS)
+
+    def patch(self, request, format=None):
+        expenses = self.get_selected_expenses(request)
+        serializer = BulkExpenseUpdateSerializer(
+            data=request.data, context={'request': request}, partial=True
+        )
+        if serializer.is_valid():
+            updated = update_expenses(expenses, serializer.validated_data,
+                                      users=[request.user.pk])
+            return Response({'updated': updated})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def delete(self, request, format=None):
+        expenses = self.get_selected_expenses(request)
+        return Response({'deleted': delete_expenses(
+            expenses, users=[request.user.pk]
+        )})
+
 
 class ExpenseDetail(APIView):
     """
     Retrieve, update, or delete a expense instance
     """
-    def get_object(self, pk):
+    def get_object(self, pk, expenses=Expense.objects):
         try:
-            return Expense.objects.get(pk=pk)
+            return expenses.get(pk=pk, user=self.request.user)
         except Expense.DoesNotExist:
             raise Http404
 
+    @conditional_get
     def get(self, request, pk, format=None):
-        expense = self.get_object(pk)
-        serializer = ExpenseSerializer(expense)
+        fields, expand = get_expense_fields(self.request.query_params)
+        expense = self.get_object(
+            pk, select_expense_fields(Expense.objects, fields, expand)
+        )
+        serializer = ExpenseSerializer(expense, fields=fields, expand=expand)
         return Response(serializer.data)
 
     def put(self, request, pk, format=None):
         expense = self.get_object(pk)
-        serializer = ExpenseSerializer(expense, data=request.data)
+        serializer = ExpenseSerializer(expense, data=request.data,
+                                       context={'request': request})
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -218,35 +579,278 @@ class ExpenseDetail(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class ExpenseChanges(APIView):
+    """
+    Expenses, categories and priorities changed or deleted after the token
+    of a previous sync, with the token to use for the next one
+    """
+    def get(self, request, format=None):
+        try:
+            since = int(self.request.query_params.get('since') or 0)
+        except ValueError:
+            raise exceptions.ValidationError(
+                {'detail': 'Value must be numeric'}
+            )
+
+        # rows written after reading the token are left for the next sync
+        token = get_data_version(request.user)
+        changed = {'user': request.user, 'revision__gt': since,
+                   'revision__lte': token}
+
+        deleted = {'expenses': [], 'categories': [], 'priorities': []}
+        keys = {'expense': 'expenses', 'category': 'categories',
+                'priority': 'priorities'}
+        for model, object_id in Tombstone.objects.filter(**changed). \
+                order_by('revision').values_list('model', 'object_id'):
+            deleted[keys[model]].append(object_id)
+
+        return Response({
+            'token': token,
+            'expenses': ExpenseSerializer(
+                Expense.objects.filter(**changed), many=True
+            ).data,
+            'categories': CategorySerializer(
+                Category.objects.filter(**changed), many=True
+            ).data,
+            'priorities': PrioritySerializer(
+                Priority.objects.filter(**changed), many=True
+            ).data,
+            'deleted': deleted,
+        })
+
+
+class ExpenseDuplicates(APIView):
+    """
+    List clusters of likely duplicate expenses, of the same day, price and
+    currency at the same place, the latest first
+    """
+    default_clusters = 20
+    max_clusters = 100
+
+    @conditional_get
+    def get(self, request, format=None):
+        limit = get_number_param(self.request.query_params, 'limit',
+                                 self.default_clusters, self.max_clusters)
+        expenses = Expense.objects.filter(user=request.user)
+        clusters = find_duplicate_clusters(expenses, limit)
+
+        fields, expand = get_expense_fields(self.request.query_params)
+        duplicates = defaultdict(list)
+        selected = select_expense_fields(
+            expenses.filter(fingerprint__in=[cluster['fingerprint']
+                                             for cluster in clusters]),
+            fields, expand
+        ).annotate(cluster=F('fingerprint'))
+        for expense in selected:
+            duplicates[expense.cluster].append(expense)
+
+        return Response({'clusters': [
+            {'fingerprint': cluster['fingerprint'],
+             'count': cluster['count'],
+             'expenses': ExpenseSerializer(
+                 duplicates[cluster['fingerprint']], many=True,
+                 fields=fields, expand=expand
+             ).data}
+            for cluster in clusters
+        ]})
+
+
+class ExpenseAnalytics(APIView):
+    """
+    Metrics of the filtered expenses grouped by one or two dimensions, as
+    a pivot of row keys, column keys and value matrices
+    """
+    @conditional_get
+    def get(self, request, format=None):
+        group_by = parse_field_list(self.request.query_params, 'group_by',
+                                    GROUP_BY)
+        if not group_by:
+            raise exceptions.ValidationError({'detail': 'Select group_by'})
+        if len(group_by) > MAX_DIMENSIONS or \
+                len(set(group_by)) < len(group_by):
+            raise exceptions.ValidationError(
+                {'detail': f'Select up to {MAX_DIMENSIONS} distinct group_by'}
+            )
+        metrics = parse_field_list(self.request.query_params, 'metrics',
+                                   METRICS) or ['sum']
+        metrics = list(dict.fromkeys(metrics))
+
+        filters, date_range = get_expense_filters(
+            request.user, self.request.query_params
+        )
+        terms = get_search_terms(self.request.query_params)
+        expenses = search_expenses(Expense.objects.filter(**filters), terms)
+        summaries = None
+        if not terms:
+            summaries = DailyExpenseSummary.objects.filter(**filters)
+
+        currency = request.user.currency
+        try:
+            result = get_or_compute(
+                'analytics', request.user,
+                (date_range, filters.get('category_id'),
+                 filters.get('priority_id'), terms, group_by, metrics,
+                 currency),
+                lambda: pivot(expenses, summaries, group_by, metrics,
+                              currency),
+                version=self.data_version
+            )
+        except TooManyGroups:
+            raise exceptions.ValidationError(
+                {'detail': 'Too many groups, narrow the filters'}
+            )
+        return Response({'date_range': date_range, **result})
+
+
+class ExpenseStatistics(APIView):
+    """
+    Percentiles of prices, moving averages of daily spend and deviation of
+    prices per category of the filtered expenses
+    """
+    @conditional_get
+    def get(self, request, format=None):
+        expenses, date_range = filter_expenses(
+            request.user, self.request.query_params
+        )
+        start, end = (date.fromisoformat(day) for day in date_range)
+        if (end - start).days >= MAX_DAYS:
+            raise exceptions.ValidationError(
+                {'detail': f'Select a date range of up to {MAX_DAYS} days'}
+            )
+        currency = request.user.currency
+        return Response({
+            'date_range': date_range,
+            **get_or_compute(
+                'descriptive', request.user,
+                (date_range, self.request.query_params.get('cat'),
+                 self.request.query_params.get('pri'),
+                 get_search_terms(self.request.query_params), currency),
+                lambda: get_descriptive_statistics(expenses, date_range,
+                                                   currency),
+                version=self.data_version
+            )
+        })
+
+
+class PlaceSuggestions(APIView):
+    """
+    Most frequent places of the user's expenses starting with the prefix
+    """
+    default_limit = 10
+    max_limit = 50
+
+    @conditional_get
+    def get(self, request, format=None):
+        prefix = self.request.query_params.get('prefix', '')
+
+        limit = get_number_param(self.request.query_params, 'limit',
+                                 self.default_limit, self.max_limit)
+
+        places = suggest_places(request.user, self.data_version, prefix,
+                                limit)
+        return Response({'places': [
+            {'place': place, 'count': count} for place, count in places
+        ]})
+
+
+class ExportExpenses(APIView):
+    """
+    Stream all filtered expenses as CSV or NDJSON
+    """
+    def get(self, request, format=None):
+        export_type = self.request.query_params.get('type', 'csv')
+        if export_type not in EXPORT_FORMATS:
+            raise exceptions.ValidationError(
+                {'detail': 'Unsupported export type'}
+            )
+        content_type, stream = EXPORT_FORMATS[export_type]
+
+        expenses, date_range = filter_expenses(
+            request.user, self.request.query_params
+        )
+        response = StreamingHttpResponse(stream(expenses),
+                                         content_type=content_type)
+        response['Content-Disposition'] = \
+            f'attachment; filename="expenses.{export_type}"'
+        return response
+
+
+class ImportExpenses(APIView):
+    """
+    Import expenses from an uploaded CSV file, streaming the progress
+
+    The file is read row by row and its expenses are inserted in chunks
+    in one transaction, with the options of ExpenseImport.
+    """
+    def post(self, request, format=None):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise exceptions.ValidationError({'detail': 'File is required'})
+        try:
+            mapping = json.loads(request.data.get('mapping') or 'null')
+        except ValueError:
+            mapping = []
+        if mapping is not None and not (
+                isinstance(mapping, dict) and
+                all(isinstance(column, str) for column in mapping.values())):
+            raise exceptions.ValidationError(
+                {'detail': 'Mapping must be an object of column names'}
+            )
+        encoding = request.data.get('encoding', 'utf-8-sig')
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise exceptions.ValidationError(
+                {'detail': 'Unsupported encoding'}
+            )
+
+        try:
+            expense_import = ExpenseImport(
+                request.user, mapping,
+                date_format=request.data.get('date_format', '%Y-%m-%d'),
+                delimiter=request.data.get('delimiter', ','),
+                decimal_separator=request.data.get('decimal_separator', '.'),
+                currency=request.data.get('currency')
+            )
+            lines = io.TextIOWrapper(upload.file, encoding=encoding,
+                                     newline='')
+            progress = expense_import.run(lines)
+        except InvalidImport as error:
+            raise exceptions.ValidationError({'detail': str(error)})
+        except UnicodeDecodeError:
+            raise exceptions.ValidationError(
+                {'detail': 'File does not match the encoding'}
+            )
+        return StreamingHttpResponse(stream_progress(progress),
+                                     content_type='application/x-ndjson')
+
+
 class SummaryMonthlyExpenses(APIView):
     """
-    Summary of the last months
+    Summary of the last months, or weeks, quarters or years when grouped
     """
+    default_periods = 5
+    max_periods = 240
+
+    @conditional_get
     def get(self, request, format=None):
-        months_ago = 5
-        DATE_NOW = datetime.now().date()
-        if self.request.query_params.get('ma'):
-            if 0 < int(self.request.query_params.get('ma')) <= 10:
-                months_ago = self.request.query_params.get('ma')
-
-        summary = {"month_summary": []}
-        for month in range(months_ago):
-            date = DATE_NOW - relativedelta(months=month)
-            year = date.year
-            month = date.month
-            key = f'{year}-{month}'
-            query_params = {
-                'fyear': year,
-                'fmonth': month,
-                'tyear': year,
-                'tmonth': month
-            }
-            date_range = create_date_range(query_params)
-
-            expense = Expense.objects.filter(day__range=date_range)
-            summary['month_summary'].append({
-                'date': key,
-                'sum_of_prices': expense.aggregate(Sum('price'))['price__sum']
-            })
-
-        return Response(summary)
+        group = self.request.query_params.get('group', 'month')
+        if group not in SUMMARY_GROUPS:
+            raise exceptions.ValidationError(
+                {'detail': 'Unsupported group'}
+            )
+
+        periods = get_number_param(self.request.query_params, 'ma',
+                                   self.default_periods, self.max_periods)
+
+        today = datetime.now().date()
+        currency = request.user.currency
+        summaries = DailyExpenseSummary.objects.filter(user=request.user)
+        return Response({
+            f'{group}_summary': get_or_compute(
+                'summary', request.user, (group, periods, today, currency),
+                lambda: summarize_periods(summaries, group, periods, today,
+                                          currency),
+                version=self.data_version
+            )
+        })
@@ -84,7 +84,12 @@ REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         # comment BrowsableAPIRenderer on production
         # 'rest_framework.renderers.BrowsableAPIRenderer',
-        'rest_framework.renderers.JSONRenderer',
+        'expense.renderers.UJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'expense.parsers.UJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5 
@@ -134,6 +139,39 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # statistics and summaries, the local memory backend evicts the least
+    # recently used entries once MAX_ENTRIES is reached
+    'expense': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'expense',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+# memory in bytes of the in-process place autocomplete indexes of all users,
+# the least recently used ones are evicted above it
+EXPENSE_PLACE_INDEX_MEMORY = 16 * 1024 * 1024
+
+# currency of expenses and users by default, and the one exchange rates
+# are given in
+EXPENSE_CURRENCY = 'PLN'
+
+# seconds between runs of materialize_recurring_expenses --loop, which
+# materializes recurring expenses in a dedicated process instead of cron
+EXPENSE_RECURRING_INTERVAL = 3600
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 